@@ -4,7 +4,7 @@ Django settings for backend project.
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 import cloudinary
 import cloudinary.uploader
@@ -107,8 +107,11 @@ DATABASE_URL = config("DATABASE_URL", default=None)
 
 if DATABASE_URL:
     import dj_database_url
+    # Served over ASGI, where each request runs its sync code on a different
+    # thread; persistent connections would pile up one per thread and are
+    # never closed, so open a fresh connection per request instead
     DATABASES = {
-        "default": dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+        "default": dj_database_url.parse(DATABASE_URL, conn_max_age=0, ssl_require=True)
     }
 else:
     DATABASES = {
@@ -119,6 +122,55 @@ else:
     }
 
 
+# -------------------------------------------------
+# CACHE
+# -------------------------------------------------
+# Local memory is per process, so the default only suits a single development
+# server. Deployments run several workers plus cron jobs that invalidate cached
+# responses, so render.yaml selects the database backend, which they all share
+# (CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache with the table name
+# as CACHE_LOCATION; build.sh creates the table).
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default="radhirra-dashboard"),
+    }
+}
+
+# Catalog API responses; the timeout bounds staleness from storefront writes, which fire no signals here
+RESPONSE_CACHE_ALIAS = config("RESPONSE_CACHE_ALIAS", default="default")
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+DASHBOARD_SUMMARY_TTL = config("DASHBOARD_SUMMARY_TTL", default=15, cast=int)
+
+# Live dashboard event stream (served over ASGI)
+LIVE_EVENTS_POLL_INTERVAL = config("LIVE_EVENTS_POLL_INTERVAL", default=5.0, cast=float)
+LIVE_EVENTS_KEEPALIVE = config("LIVE_EVENTS_KEEPALIVE", default=15.0, cast=float)
+LIVE_EVENTS_RETRY_MS = config("LIVE_EVENTS_RETRY_MS", default=5000, cast=int)
+
+# Order exports: orders read per database round trip, and rows per network write
+ORDER_EXPORT_CHUNK_SIZE = config("ORDER_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+ORDER_EXPORT_ROWS_PER_WRITE = config("ORDER_EXPORT_ROWS_PER_WRITE", default=200, cast=int)
+
+# Product imports: rows validated and upserted per transaction
+PRODUCT_IMPORT_CHUNK_SIZE = config("PRODUCT_IMPORT_CHUNK_SIZE", default=1000, cast=int)
+
+# refresh_best_sellers: how many top sellers by units over how many days get is_best_seller
+BEST_SELLER_DAYS = config("BEST_SELLER_DAYS", default=30, cast=int)
+BEST_SELLER_COUNT = config("BEST_SELLER_COUNT", default=12, cast=int)
+
+# catch_up_rollups: how far back to look for changed orders; scheduled every
+# 10 minutes in render.yaml, so consecutive runs overlap
+ROLLUP_CATCH_UP_MINUTES = config("ROLLUP_CATCH_UP_MINUTES", default=30, cast=int)
+
+# score_customers: lifetime value projects current order rates this many
+# years ahead, fading out for customers who have not ordered for
+# CUSTOMER_LAPSE_DAYS; tenures shorter than CUSTOMER_MIN_TENURE_DAYS are
+# rounded up so a single recent order does not imply a huge yearly rate
+CUSTOMER_LTV_YEARS = config("CUSTOMER_LTV_YEARS", default=3, cast=float)
+CUSTOMER_LAPSE_DAYS = config("CUSTOMER_LAPSE_DAYS", default=365, cast=int)
+CUSTOMER_MIN_TENURE_DAYS = config("CUSTOMER_MIN_TENURE_DAYS", default=90, cast=int)
+
+
 # -------------------------------------------------
 # PASSWORDS
 # -------------------------------------------------
@@ -158,6 +210,22 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Where product images end up; dashboard.image_store.LocalImageStore keeps them in MEDIA_ROOT
+IMAGE_STORE = config("IMAGE_STORE", default="dashboard.image_store.CloudinaryImageStore")
+
+# Background upload workers; set IMAGE_UPLOAD_ASYNC=False to upload inside the request
+IMAGE_UPLOAD_ASYNC = config("IMAGE_UPLOAD_ASYNC", default=True, cast=bool)
+IMAGE_UPLOAD_WORKERS = config("IMAGE_UPLOAD_WORKERS", default=4, cast=int)
+# Upper bound on the threads one batch upload uses for its first attempt at each file
+IMAGE_UPLOAD_BATCH_WORKERS = config("IMAGE_UPLOAD_BATCH_WORKERS", default=16, cast=int)
+IMAGE_UPLOAD_MAX_ATTEMPTS = config("IMAGE_UPLOAD_MAX_ATTEMPTS", default=3, cast=int)
+IMAGE_UPLOAD_RETRY_DELAY = config("IMAGE_UPLOAD_RETRY_DELAY", default=2.0, cast=float)
+
+# Responsive variants rendered for images stored under MEDIA_ROOT; formats Pillow cannot encode are skipped
+IMAGE_VARIANT_WIDTHS = config("IMAGE_VARIANT_WIDTHS", default="160,320,480,640", cast=Csv(int))
+IMAGE_VARIANT_FORMATS = config("IMAGE_VARIANT_FORMATS", default="webp,avif", cast=Csv())
+IMAGE_VARIANT_WORKERS = config("IMAGE_VARIANT_WORKERS", default=2, cast=int)
+
 
 # -------------------------------------------------
 # AUTH
@@ -176,7 +244,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "dashboard.pagination.StandardPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
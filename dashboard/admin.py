@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     CustomUser, UserProfile, Category, Product, ProductImage,
-    Order, OrderItem, ShippingAddress, Cart, CartItem, Review
+    Order, OrderItem, ShippingAddress, Cart, CartItem, Review, DailyOrderMetrics, DailyProductSales,
+    CustomerStats,
 )
 
 @admin.register(CustomUser)
@@ -54,3 +55,23 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ['product', 'user', 'rating', 'created_at']
     list_filter = ['rating', 'created_at']
     search_fields = ['product__name', 'user__email']
+
+@admin.register(DailyOrderMetrics)
+class DailyOrderMetricsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'order_type', 'order_status', 'order_count', 'revenue']
+    list_filter = ['order_type', 'order_status', 'date']
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'product', 'units', 'revenue', 'order_count']
+    list_filter = ['date']
+    search_fields = ['product__name', 'product__sku']
+    raw_id_fields = ['product']
+
+
+@admin.register(CustomerStats)
+class CustomerStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'segment', 'lifetime_value', 'order_count', 'total_spent', 'last_order_at']
+    list_filter = ['segment']
+    search_fields = ['user__email', 'user__first_name', 'user__last_name']
+    raw_id_fields = ['user']
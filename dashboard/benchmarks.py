@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+import time
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Category, CustomUser, Order, Product, Review
+
+
+BUDGETS_PATH = Path(__file__).with_name('benchmark_budgets.json')
+
+
+def import_file(skus):
+    """A CSV import that updates the given products, as a fresh upload each call"""
+    content = io.StringIO()
+    writer = csv.writer(content)
+    writer.writerow(['sku', 'is_featured'])
+    writer.writerows([sku, 'false'] for sku in skus)
+    return SimpleUploadedFile('products.csv', content.getvalue().encode(), content_type='text/csv')
+
+
+def benchmark_endpoints():
+    """
+    (name, method, path, payload) for every router endpoint, using existing
+    rows. A callable payload is called with the repetition number, for
+    requests that need a fresh upload or should change something every time.
+    """
+    product = Product.objects.order_by('id').first()
+    order = Order.objects.order_by('id').first()
+    customer = CustomUser.objects.filter(is_staff=False, order__isnull=False).order_by('id').first()
+    category = Category.objects.order_by('id').first()
+    review = Review.objects.order_by('id').first()
+    product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:50])
+    skus = list(Product.objects.exclude(sku=None).order_by('id').values_list('sku', flat=True)[:50])
+    # Orders of one day, so the rollup rows refreshed stay few however large the dataset
+    open_statuses = ('pending', 'confirmed')
+    latest = Order.objects.filter(order_status__in=open_statuses).order_by('-date_ordered').first()
+    batch_ids = list(Order.objects.filter(
+        order_status__in=open_statuses, date_ordered__date=timezone.localdate(latest.date_ordered)
+    ).order_by('id').values_list('id', flat=True)[:50]) if latest else []
+
+    endpoints = [
+        ('categories-list', 'get', '/api/categories/', None),
+        ('products-list', 'get', '/api/products/', None),
+        ('products-statistics', 'get', '/api/products/statistics/', None),
+        ('orders-list', 'get', '/api/orders/', None),
+        ('orders-statistics', 'get', '/api/orders/statistics/', None),
+        ('customers-list', 'get', '/api/customers/', None),
+        ('reviews-list', 'get', '/api/reviews/', None),
+        ('dashboard-overview', 'get', '/api/dashboard/overview/', None),
+        ('dashboard-summary', 'get', '/api/dashboard/summary/', None),
+        ('dashboard-recent-orders', 'get', '/api/dashboard/recent_orders/', None),
+        ('dashboard-top-products', 'get', '/api/dashboard/top_products/', None),
+        ('dashboard-revenue', 'get', '/api/dashboard/revenue/?interval=day&periods=365', None),
+        ('products-bulk-update', 'post', '/api/products/bulk_update/', {'ids': product_ids, 'is_featured': False}),
+        ('products-import', 'post', '/api/products/import/', lambda repetition: {'file': import_file(skus)}),
+        ('orders-export', 'get', '/api/orders/export/', None),
+        # Alternates so every repetition moves the orders
+        ('orders-batch-status', 'post', '/api/orders/batch_status/', lambda repetition: {
+            'ids': batch_ids, 'status': open_statuses[(repetition + 1) % 2],
+        }),
+    ]
+    if category:
+        endpoints.append(('categories-detail', 'get', f'/api/categories/{category.id}/', None))
+    if product:
+        endpoints.append(('products-detail', 'get', f'/api/products/{product.id}/', None))
+    if order:
+        endpoints.append(('orders-detail', 'get', f'/api/orders/{order.id}/', None))
+        endpoints.append(('orders-update-status', 'patch', f'/api/orders/{order.id}/update_status/',
+                          {'status': order.order_status}))
+    if customer:
+        endpoints.append(('customers-detail', 'get', f'/api/customers/{customer.id}/', None))
+        endpoints.append(('customers-orders', 'get', f'/api/customers/{customer.id}/orders/', None))
+        endpoints.append(('customers-overview', 'get', f'/api/customers/{customer.id}/overview/', None))
+    if review:
+        endpoints.append(('reviews-detail', 'get', f'/api/reviews/{review.id}/', None))
+    return endpoints
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmarks(user, repeat=10, endpoints=None):
+    """Measure query count, p50/p95 wall time and response size per endpoint"""
+    client = APIClient()
+    client.force_authenticate(user)
+    results = {}
+
+    for name, method, path, payload in endpoints or benchmark_endpoints():
+        timings = []
+        for repetition in range(repeat):
+            data = payload(repetition) if callable(payload) else payload
+            # Uploads go as multipart, everything else as JSON
+            upload = data and any(hasattr(value, 'read') for value in data.values())
+            request_format = 'multipart' if upload else 'json'
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, method)(path, data, format=request_format)
+                # Streamed responses only do their work as they are read
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            'path': path,
+            'status': response.status_code,
+            'queries': len(queries.captured_queries),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'bytes': len(body),
+        }
+    return results
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path) as budget_file:
+        return json.load(budget_file)
+
+
+def check_budgets(results, budgets, check_latency=True):
+    """Return a list of human readable budget violations"""
+    violations = []
+    for name, result in results.items():
+        if result['status'] >= 400:
+            violations.append(f'{name}: responded with HTTP {result["status"]}')
+        budget = budgets.get(name)
+        if budget is None:
+            violations.append(f'{name}: no budget defined')
+            continue
+        if result['queries'] > budget['max_queries']:
+            violations.append(f'{name}: {result["queries"]} queries, budget {budget["max_queries"]}')
+        if check_latency and result['p95_ms'] > budget['p95_ms']:
+            violations.append(f'{name}: p95 {result["p95_ms"]}ms, budget {budget["p95_ms"]}ms')
+    return violations
+
+
+def write_results(results, path, **metadata):
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        **metadata,
+        'results': results,
+    }
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+    return report
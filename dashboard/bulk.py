@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .live import publish_resync, publish_status_changes
+from .models import Order, Product
+from .response_cache import bump_versions_on_commit
+from .rollups import metrics_key, refresh_daily_metrics, refresh_product_sales_for_orders
+
+
+# Products per UPDATE statement; keeps IN lists and CASE expressions bounded
+CHUNK_SIZE = 500
+
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def markdown_price(percent, regular_price=None):
+    """SQL expression for regular_price less `percent`, rounded to paise"""
+    base = Value(regular_price, output_field=PRICE_FIELD) if regular_price is not None else F('regular_price')
+    factor = Value((100 - percent) / 100, output_field=PRICE_FIELD)
+    return Round(base * factor, 2, output_field=PRICE_FIELD)
+
+
+def _chunks(pks):
+    pks = sorted(pks)
+    for start in range(0, len(pks), CHUNK_SIZE):
+        yield pks[start:start + CHUNK_SIZE]
+
+
+def update_products(ids, changes, sale_prices=None):
+    """
+    Apply `changes` to the products in `ids` and set per-product sale prices
+    from `sale_prices`, all in one transaction.
+
+    Every chunk of CHUNK_SIZE products is a single UPDATE; per-product sale
+    prices become a CASE on the id. Products that only appear in
+    sale_prices get just their price. `markdown_percent` in changes sets
+    sale_price from the (new, if given) regular price inside the same
+    statement. Returns (rows the database reports as updated, products
+    targeted); ids that do not exist make up the difference.
+    """
+    sale_prices = sale_prices or {}
+    values = dict(changes)
+    if 'markdown_percent' in values:
+        values['sale_price'] = markdown_price(values.pop('markdown_percent'), values.get('regular_price'))
+    shared = set(ids) if values else set()
+    price_only = set(sale_prices) - shared
+    # QuerySet.update skips auto_now
+    now = timezone.now()
+
+    updated = 0
+    # Errors are never caught here, so an enclosing transaction needs no savepoint
+    with transaction.atomic(savepoint=False):
+        for targets, base in ((shared, values), (price_only, {})):
+            for chunk in _chunks(targets):
+                chunk_values = {**base, 'updated_at': now}
+                priced = [pk for pk in chunk if pk in sale_prices]
+                if priced:
+                    chunk_values['sale_price'] = Case(
+                        *[When(pk=pk, then=Value(sale_prices[pk], output_field=PRICE_FIELD)) for pk in priced],
+                        default=F('sale_price'),
+                        output_field=PRICE_FIELD,
+                    )
+                updated += Product.objects.filter(pk__in=chunk).update(**chunk_values)
+
+    if updated:
+        bump_versions_on_commit(Product)
+        publish_resync()
+    return updated, len(shared) + len(price_only)
+
+
+def transition_orders(ids, status):
+    """
+    Move orders to `status`, checking each one against Order.STATUS_TRANSITIONS.
+
+    The orders are read (and locked) in one query, then each group sharing
+    a source status is changed with one UPDATE that also re-checks that
+    status, all in one transaction. Returns {id: (outcome, previous status)}
+    with outcomes 'updated', 'unchanged', 'not_allowed' and 'not_found'.
+    Daily rollups, product sales and connected dashboards are updated
+    here, since QuerySet.update sends no signals.
+    """
+    ids = list(dict.fromkeys(ids))
+    outcomes = {pk: ('not_found', None) for pk in ids}
+    now = timezone.now()
+
+    with transaction.atomic():
+        orders = {
+            order.id: order for order in Order.objects.select_for_update().filter(pk__in=ids).only(
+                'id', 'order_status', 'order_type', 'date_ordered', 'total_amount'
+            )
+        }
+        by_source = {}
+        for pk, order in orders.items():
+            if order.order_status == status:
+                outcomes[pk] = ('unchanged', status)
+            elif not order.can_change_status(status):
+                outcomes[pk] = ('not_allowed', order.order_status)
+            else:
+                by_source.setdefault(order.order_status, []).append(pk)
+
+        changes = []
+        for source, pks in by_source.items():
+            # Rows are locked on PostgreSQL; the status check covers SQLite
+            Order.objects.filter(pk__in=pks, order_status=source).update(
+                order_status=status, complete=status == 'completed', updated_at=now
+            )
+            for pk in pks:
+                outcomes[pk] = ('updated', source)
+                changes.append((orders[pk], source))
+
+        keys = set()
+        for order, source in changes:
+            keys.add(metrics_key(order.date_ordered, order.order_type, source))
+            keys.add(metrics_key(order.date_ordered, order.order_type, status))
+            order.order_status = status
+        for key in keys:
+            refresh_daily_metrics(*key)
+        # Only cancelling or restoring an order changes what its products sold
+        affected = [order.id for order, source in changes if 'cancelled' in (source, status)]
+        if affected:
+            refresh_product_sales_for_orders(affected)
+        publish_status_changes(changes)
+    return outcomes
@@ -0,0 +1,79 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .pagination import KeysetPagination
+from .response_cache import get_version
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified validators for list and retrieve.
+
+    Lists use max(updated_at) and the row count of the filtered queryset, so
+    unchanged data is answered with 304 Not Modified after that single
+    aggregate, before the page is fetched or serialized. The count is handed
+    to the paginator, so a full response costs no extra query. Details use
+    the fetched object's own timestamp. Related rows without a timestamp of
+    their own (e.g. product images) are covered by the response-cache
+    versions of `cache_models`.
+
+    Every nested value must be covered one of these ways: order items and
+    shipping addresses move their order's updated_at when they change (see
+    signals.py), and customers and products are versioned.
+    """
+    last_modified_field = 'updated_at'
+    known_count = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_object(self):
+        # retrieve fetches the object for its validators; reuse it for the response
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
+
+    def validators(self, request):
+        if self.action == 'retrieve':
+            instance = self.get_object()
+            state = {'last_modified': getattr(instance, self.last_modified_field), 'count': 1}
+        elif isinstance(self.paginator, KeysetPagination):
+            # Keyset pages exist to avoid counting the whole table
+            return None, None
+        else:
+            queryset = self.filter_queryset(self.get_queryset()).order_by()
+            state = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+            self.known_count = state['count']
+
+        versions = [get_version(model) for model in getattr(self, 'cache_models', ())]
+        fingerprint = repr((
+            self.action, request.get_full_path(), state['last_modified'], state['count'], versions
+        ))
+        etag = f'W/"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"'
+        return etag, state['last_modified']
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        precondition = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if precondition is not None:
+            # 304 Not Modified, or 412 for a failed If-Match
+            response = Response(status=precondition.status_code)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -0,0 +1,148 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import OrderItem, ShippingAddress
+
+
+CSV_COLUMNS = [
+    'id', 'date_ordered', 'order_status', 'order_type', 'complete', 'total_amount', 'item_count',
+    'customer_email', 'customer_name', 'contact_value', 'transaction_id',
+    'address', 'city', 'state', 'zipcode', 'phone_number', 'items',
+]
+
+# Spreadsheets evaluate text cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    """
+    Slim down a filtered order queryset for export.
+
+    Only the columns that are written are loaded, and items and shipping
+    addresses are prefetched per iterator chunk.
+    """
+    return queryset.select_related(None).prefetch_related(None).select_related('user').only(
+        'id', 'date_ordered', 'order_status', 'order_type', 'complete', 'total_amount', 'item_count',
+        'contact_value', 'transaction_id', 'user__email', 'user__first_name', 'user__last_name',
+    ).prefetch_related(
+        Prefetch('orderitem_set', queryset=OrderItem.objects.select_related('product').only(
+            'id', 'order_id', 'quantity', 'price_at_order', 'variant_info', 'product__name', 'product__sku',
+        ).order_by('id')),
+        Prefetch('shippingaddress_set', queryset=ShippingAddress.objects.only(
+            'id', 'order_id', 'address', 'city', 'state', 'zipcode', 'phone_number',
+        ).order_by('id')),
+    )
+
+
+def order_record(order):
+    user = order.user
+    shipping = next(iter(order.shippingaddress_set.all()), None)
+    return {
+        'id': order.id,
+        'date_ordered': order.date_ordered,
+        'order_status': order.order_status,
+        'order_type': order.order_type,
+        'complete': order.complete,
+        'total_amount': order.order_total,
+        'item_count': order.order_item_count,
+        'customer_email': user.email if user else None,
+        'customer_name': f'{user.first_name} {user.last_name}'.strip() if user else None,
+        'contact_value': order.contact_value,
+        'transaction_id': order.transaction_id,
+        'shipping': {
+            field: getattr(shipping, field)
+            for field in ('address', 'city', 'state', 'zipcode', 'phone_number')
+        } if shipping else None,
+        'items': [
+            {
+                'product': item.product.name if item.product else None,
+                'sku': item.product.sku if item.product else None,
+                'quantity': item.quantity,
+                'price_at_order': item.price_at_order,
+                'variant_info': item.variant_info,
+            }
+            for item in order.orderitem_set.all()
+        ],
+    }
+
+
+def csv_cell(value):
+    """Quote customer-entered text that a spreadsheet would run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def csv_lines(orders):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for order in orders:
+        record = order_record(order)
+        shipping = record.pop('shipping') or {}
+        record['items'] = '; '.join(
+            f'{item["product"] or "Deleted product"} x{item["quantity"]} @ {item["price_at_order"]}'
+            for item in record['items']
+        )
+        record.update(shipping)
+        yield writer.writerow([csv_cell(record.get(column)) for column in CSV_COLUMNS])
+
+
+def ndjson_lines(orders):
+    for order in orders:
+        yield json.dumps(order_record(order), cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(queryset, export_format):
+    """Lines of the export; orders are read with a server-side cursor, chunk by chunk"""
+    orders = export_queryset(queryset).iterator(chunk_size=settings.ORDER_EXPORT_CHUNK_SIZE)
+    return csv_lines(orders) if export_format == 'csv' else ndjson_lines(orders)
+
+
+def batched(lines, size):
+    """
+    Join lines into larger blocks so each network write carries more than
+    one row. The first line goes out on its own so the download starts
+    before the first chunk of orders is read.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is not None:
+        yield first
+    while block := ''.join(islice(lines, size)):
+        yield block
+
+
+async def async_batched(lines, size):
+    """
+    batched() for ASGI servers.
+
+    Django would otherwise read a synchronous streaming iterator to the end
+    before sending anything. Each block is pulled in the request's
+    thread-sensitive worker, where the database cursor lives.
+    """
+    blocks = batched(lines, size)
+    next_block = sync_to_async(lambda: next(blocks, None))
+    try:
+        while (block := await next_block()) is not None:
+            yield block
+    finally:
+        # Close the cursor from the thread that opened it
+        await sync_to_async(blocks.close)()
@@ -0,0 +1,27 @@
+import os
+
+import cloudinary.uploader
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.module_loading import import_string
+
+
+class CloudinaryImageStore:
+    """Pushes product images to Cloudinary"""
+
+    def upload(self, file, folder):
+        result = cloudinary.uploader.upload(file, folder=folder, resource_type='image')
+        return result['secure_url']
+
+
+class LocalImageStore:
+    """Keeps product images under MEDIA_ROOT; a stand-in for Cloudinary in tests and local development"""
+
+    def upload(self, file, folder):
+        name = os.path.basename(getattr(file, 'name', '') or 'image')
+        path = default_storage.save(f'{folder}/{name}', file)
+        return default_storage.url(path)
+
+
+def get_image_store():
+    return import_string(settings.IMAGE_STORE)()
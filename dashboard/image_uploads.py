@@ -0,0 +1,208 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .image_store import get_image_store
+from .image_variants import build_variants
+from .models import ProductImage
+from .response_cache import bump_versions, bump_versions_on_commit
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide worker pool shared by every request"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_UPLOAD_WORKERS, thread_name_prefix='image-upload'
+            )
+    return _executor
+
+
+def stage_file(image_file):
+    """Copy an uploaded file, chunk by chunk, into local staging storage"""
+    extension = os.path.splitext(image_file.name)[1].lower()
+    return default_storage.save(f'uploads/pending/{uuid.uuid4().hex}{extension}', image_file)
+
+
+def stage_upload(product_id, image_file, is_main=False):
+    """
+    Save an uploaded file locally and record it as a pending ProductImage.
+
+    The transfer to the image store is queued once the surrounding
+    transaction commits, so the request can return straight away.
+    """
+    local_path = stage_file(image_file)
+
+    with transaction.atomic():
+        if is_main:
+            ProductImage.objects.filter(product_id=product_id, is_main=True).update(is_main=False)
+        product_image = ProductImage.objects.create(
+            product_id=product_id,
+            image=default_storage.url(local_path),
+            is_main=is_main,
+            status='pending',
+            local_path=local_path,
+        )
+        transaction.on_commit(lambda: enqueue_upload(product_image.id))
+    return product_image
+
+
+def enqueue_upload(image_id):
+    if settings.IMAGE_UPLOAD_ASYNC:
+        get_executor().submit(_run_in_worker, process_upload, image_id)
+    else:
+        process_upload(image_id)
+
+
+def enqueue_variants(image_ids):
+    if settings.IMAGE_UPLOAD_ASYNC:
+        get_executor().submit(_run_in_worker, build_image_variants, image_ids)
+    else:
+        build_image_variants(image_ids)
+
+
+def build_image_variants(image_ids):
+    return build_variants(ProductImage.objects.filter(pk__in=image_ids))
+
+
+def _run_in_worker(task, *args):
+    close_old_connections()
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Image task %s%s crashed', task.__name__, args)
+    finally:
+        close_old_connections()
+
+
+def push_once(store, local_path, folder):
+    """Upload a staged file to the image store in a single attempt"""
+    with default_storage.open(local_path, 'rb') as local_file:
+        return store.upload(local_file, folder=folder)
+
+
+def push_file(store, local_path, folder, attempts=0, on_failure=None):
+    """Upload a staged file to the image store, retrying with exponential backoff"""
+    while True:
+        attempts += 1
+        try:
+            return push_once(store, local_path, folder), attempts
+        except Exception as error:
+            logger.warning('Upload of %s failed on attempt %s: %s', local_path, attempts, error)
+            if attempts >= settings.IMAGE_UPLOAD_MAX_ATTEMPTS:
+                raise
+            if on_failure:
+                on_failure(attempts, error)
+            time.sleep(settings.IMAGE_UPLOAD_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def process_upload(image_id):
+    """Push a pending image to the image store and record the outcome"""
+    product_image = ProductImage.objects.filter(pk=image_id, status='pending').first()
+    if product_image is None:
+        return None
+
+    def record_failure(attempts, error):
+        ProductImage.objects.filter(pk=image_id).update(upload_attempts=attempts, upload_error=str(error))
+
+    try:
+        url, attempts = push_file(
+            get_image_store(), product_image.local_path, f'products/{product_image.product_id}',
+            attempts=product_image.upload_attempts, on_failure=record_failure,
+        )
+    except Exception as error:
+        ProductImage.objects.filter(pk=image_id).update(
+            status='failed', upload_attempts=settings.IMAGE_UPLOAD_MAX_ATTEMPTS, upload_error=str(error)
+        )
+        bump_versions(ProductImage)
+        return None
+
+    ProductImage.objects.filter(pk=image_id).update(
+        image=url, status='uploaded', local_path=None, upload_attempts=attempts, upload_error=None
+    )
+    bump_versions(ProductImage)
+    default_storage.delete(product_image.local_path)
+    build_image_variants([image_id])
+    return url
+
+
+def upload_batch(product, files, is_main=False):
+    """
+    Upload several images for a product concurrently.
+
+    Files are staged locally and each gets one attempt at the image store, in a
+    thread pool sized to the batch up to IMAGE_UPLOAD_BATCH_WORKERS. A file
+    whose attempt fails is saved as a pending image and retried with backoff by
+    the background workers, like a single upload, instead of holding up the
+    request. Returns one result per file, in the order the files were given.
+    """
+    staged = []
+    for image_file in files:
+        staged.append((image_file.name, stage_file(image_file)))
+
+    store = get_image_store()
+    folder = f'products/{product.id}'
+    with ThreadPoolExecutor(max_workers=min(settings.IMAGE_UPLOAD_BATCH_WORKERS, len(staged))) as pool:
+        futures = [pool.submit(push_once, store, local_path, folder) for _, local_path in staged]
+
+    results, images = [], []
+    for (name, local_path), future in zip(staged, futures):
+        try:
+            url = future.result()
+        except Exception as error:
+            logger.warning('Upload of %s failed on attempt 1: %s', local_path, error)
+            if settings.IMAGE_UPLOAD_MAX_ATTEMPTS <= 1:
+                results.append({'name': name, 'success': False, 'error': str(error)})
+                default_storage.delete(local_path)
+                continue
+            image = ProductImage(
+                product=product, image=default_storage.url(local_path), status='pending',
+                local_path=local_path, upload_attempts=1, upload_error=str(error),
+            )
+        else:
+            image = ProductImage(product=product, image=url, upload_attempts=1)
+            default_storage.delete(local_path)
+        image.is_main = is_main and not images
+        images.append(image)
+        results.append({'name': name, 'success': True, 'image': image})
+
+    with transaction.atomic():
+        if any(image.is_main for image in images):
+            ProductImage.objects.filter(product=product, is_main=True).update(is_main=False)
+        ProductImage.objects.bulk_create(images)
+        bump_versions_on_commit(ProductImage)
+        uploaded = [image.id for image in images if image.status == 'uploaded']
+        transaction.on_commit(lambda: enqueue_variants(uploaded))
+        for image in images:
+            if image.status == 'pending':
+                transaction.on_commit(partial(enqueue_upload, image.id))
+
+    for result in results:
+        image = result.pop('image', None)
+        if image is not None:
+            result.update({'id': image.id, 'url': image.image, 'is_main': image.is_main, 'status': image.status})
+    return results
+
+
+def reset_pending_uploads(include_failed=False):
+    """Ids of staged images still waiting for upload, e.g. after a restart"""
+    images = ProductImage.objects.filter(local_path__isnull=False)
+    if include_failed:
+        images.filter(status='failed').update(status='pending', upload_attempts=0)
+        bump_versions(ProductImage)
+    return list(images.filter(status='pending').values_list('id', flat=True))
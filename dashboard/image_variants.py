@@ -0,0 +1,142 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .imaging import available_formats, content_hash, render_variants
+from .models import ProductImage
+from .response_cache import bump_versions
+
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Process-wide pool for encoding variants.
+
+    Workers are spawned rather than forked because builds are started from
+    the image-upload threads, and forking a threaded process is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+    return _pool
+
+
+def source_name(product_image):
+    """Storage name of an image kept under MEDIA_ROOT, or None for remote images"""
+    url = product_image.image or ''
+    if product_image.status != 'uploaded' or not url.startswith(settings.MEDIA_URL):
+        return None
+    return url[len(settings.MEDIA_URL):]
+
+
+def variant_name(name, digest, width, fmt):
+    """Content-addressed name next to the original, e.g. products/kurta.3f9a0c1b2d4e.320w.webp"""
+    stem = os.path.splitext(name)[0]
+    return f'{stem}.{digest[:12]}.{width}w.{fmt}'
+
+
+def variant_names(variants):
+    return {name for by_width in variants.values() for name in by_width.values()}
+
+
+def is_current(product_image, digest):
+    names = variant_names(product_image.variants or {})
+    return product_image.variants_source == digest and names and all(default_storage.exists(n) for n in names)
+
+
+def _render_inline(data, widths, formats):
+    try:
+        return render_variants(data, widths, formats)
+    except Exception as error:
+        return error
+
+
+def build_variants(images, force=False):
+    """
+    Render and store WebP/AVIF variants for locally stored images.
+
+    An image is skipped when its variants were rendered from the same source
+    bytes and are still on disk, unless force is set. Rendering runs in the
+    process pool when there is more than one image to do. Returns the ids of
+    the images that were (re)built.
+    """
+    widths = settings.IMAGE_VARIANT_WIDTHS
+    formats = available_formats(settings.IMAGE_VARIANT_FORMATS)
+    if not formats:
+        return []
+
+    jobs = []
+    for product_image in images:
+        name = source_name(product_image)
+        if name is None or not default_storage.exists(name):
+            continue
+        with default_storage.open(name, 'rb') as source:
+            data = source.read()
+        digest = content_hash(data)
+        if force or not is_current(product_image, digest):
+            jobs.append((product_image, name, digest, data))
+
+    if len(jobs) > 1 and settings.IMAGE_VARIANT_WORKERS > 1:
+        futures = [get_pool().submit(render_variants, data, widths, formats) for _, _, _, data in jobs]
+        outputs = [future.exception() or future.result() for future in futures]
+    else:
+        outputs = [_render_inline(data, widths, formats) for _, _, _, data in jobs]
+
+    built = []
+    for (product_image, name, digest, _), output in zip(jobs, outputs):
+        if isinstance(output, Exception):
+            logger.warning('Could not render variants for image %s: %s', product_image.id, output)
+            continue
+
+        variants = {}
+        for width, fmt, encoded in output:
+            target = variant_name(name, digest, width, fmt)
+            if not default_storage.exists(target):
+                default_storage.save(target, ContentFile(encoded))
+            variants.setdefault(fmt, {})[str(width)] = target
+
+        for stale in variant_names(product_image.variants or {}) - variant_names(variants):
+            default_storage.delete(stale)
+        ProductImage.objects.filter(pk=product_image.pk).update(variants=variants, variants_source=digest)
+        product_image.variants, product_image.variants_source = variants, digest
+        built.append(product_image.id)
+    if built:
+        bump_versions(ProductImage)
+    return built
+
+
+def image_srcset(product_image):
+    """{format: srcset string} for an image, from stored variants or Cloudinary transformations"""
+    if product_image.variants:
+        return {
+            fmt: ', '.join(
+                f'{default_storage.url(name)} {width}w'
+                for width, name in sorted(by_width.items(), key=lambda item: int(item[0]))
+            )
+            for fmt, by_width in product_image.variants.items()
+        }
+
+    url = product_image.image or ''
+    if '/upload/' not in url:
+        return {}
+    return {
+        fmt: ', '.join(
+            f'{url.replace("/upload/", f"/upload/f_{fmt},q_auto,c_limit,w_{width}/")} {width}w'
+            for width in sorted(settings.IMAGE_VARIANT_WIDTHS)
+        )
+        for fmt in settings.IMAGE_VARIANT_FORMATS
+    }
@@ -0,0 +1,49 @@
+import hashlib
+import io
+
+from PIL import Image, ImageOps, features
+
+
+# Pillow save options per output format
+FORMAT_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60, 'speed': 6},
+}
+
+
+def available_formats(formats):
+    """The requested formats this Pillow build can encode"""
+    return [fmt for fmt in formats if fmt in FORMAT_OPTIONS and features.check(fmt)]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def variant_widths(source_width, widths):
+    """Widths to render for a source, never upscaling; tiny sources get one copy at their own width"""
+    fitting = sorted(width for width in set(widths) if width < source_width)
+    return fitting or [source_width]
+
+
+def render_variants(data, widths, formats):
+    """
+    Resize encoded image bytes to each width in each format.
+
+    Returns a list of (width, format, bytes). This runs in worker processes,
+    so it only depends on Pillow and must stay free of Django imports.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA' if 'transparency' in source.info or 'A' in source.mode else 'RGB')
+
+        rendered = []
+        for width in variant_widths(source.width, widths):
+            height = max(1, round(source.height * width / source.width))
+            resized = source if width == source.width else source.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, **FORMAT_OPTIONS[fmt])
+                rendered.append((width, fmt, buffer.getvalue()))
+        return rendered
@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .live import publish_resync
+from .models import Category, Product
+from .response_cache import bump_versions_on_commit
+from .serializers import ProductImportSerializer
+
+
+IMPORT_FORMATS = {'.csv': 'csv', '.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+# Every failed row is counted, but only this many are described in the result
+MAX_REPORTED_ERRORS = 500
+
+
+def guess_format(filename):
+    return IMPORT_FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def read_rows(file, file_format):
+    """
+    Yield (row number, row) from a binary file.
+
+    CSV and NDJSON are read line by line; a JSON file must hold one array
+    of objects and is parsed whole. Raises ValueError for a file that
+    cannot be read at all.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        if file_format == 'csv':
+            # Row 1 is the header
+            yield from enumerate(csv.DictReader(text), start=2)
+        elif file_format == 'ndjson':
+            for number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError:
+                    yield number, None
+        elif file_format == 'json':
+            rows = json.load(text)
+            if not isinstance(rows, list):
+                raise ValueError('A JSON import must be an array of products.')
+            yield from enumerate(rows, start=1)
+        else:
+            raise ValueError(f'Unsupported import format: {file_format}')
+    except csv.Error as error:
+        raise ValueError(f'Could not read CSV: {error}')
+    finally:
+        # The caller owns the file
+        text.detach()
+
+
+def _messages(detail):
+    if isinstance(detail, dict):
+        return {field: [str(message) for message in messages] for field, messages in detail.items()}
+    return {'non_field_errors': [str(message) for message in detail]}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, number, sku, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'sku': sku, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def import_products(rows, chunk_size=None):
+    """
+    Upsert products by sku from (row number, row) pairs.
+
+    Rows are validated and written a chunk at a time. One query finds which
+    skus of the chunk already exist, then one INSERT ... ON CONFLICT DO
+    UPDATE per set of supplied columns writes new and existing products
+    alike. Invalid rows are reported and skipped without affecting the
+    rest. Each chunk commits on its own, so an interrupted import can
+    simply be run again.
+    """
+    chunk_size = chunk_size or settings.PRODUCT_IMPORT_CHUNK_SIZE
+    serializer = ProductImportSerializer(context={
+        'categories': dict(Category.objects.values_list('slug', 'id')),
+    })
+    result = ImportResult()
+    seen = {}
+
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        _import_chunk(chunk, serializer, seen, result)
+
+    if result.created or result.updated:
+        bump_versions_on_commit(Product)
+        publish_resync()
+    return result.as_dict()
+
+
+def _import_chunk(chunk, serializer, seen, result):
+    valid = []
+    for number, row in chunk:
+        if not isinstance(row, dict):
+            result.fail(number, None, {'non_field_errors': ['Row is not a JSON object.']})
+            continue
+        try:
+            data = serializer.run_validation(row)
+        except ValidationError as error:
+            result.fail(number, row.get('sku'), _messages(error.detail))
+            continue
+        sku = data['sku']
+        if sku in seen:
+            result.fail(number, sku, {'sku': [f'Duplicate of row {seen[sku]}.']})
+            continue
+        seen[sku] = number
+        valid.append((number, data))
+
+    # Stored values of the NOT NULL columns let partial rows of existing
+    # products go through the same INSERT; only supplied columns are updated
+    existing = {
+        sku: {'name': name, 'regular_price': regular_price}
+        for sku, name, regular_price in Product.objects.filter(
+            sku__in=[data['sku'] for _, data in valid]
+        ).values_list('sku', 'name', 'regular_price')
+    }
+    groups = {}
+    for number, data in valid:
+        stored = existing.get(data['sku'])
+        if stored is None:
+            missing = {
+                field: ['This field is required for new products.']
+                for field in ('name', 'regular_price') if data.get(field) is None
+            }
+            if missing:
+                result.fail(number, data['sku'], missing)
+                continue
+        if 'category' in data:
+            data['category_id'] = data.pop('category')
+        groups.setdefault(tuple(sorted(data)), []).append((number, data))
+
+    try:
+        with transaction.atomic():
+            for columns, members in groups.items():
+                Product.objects.bulk_create(
+                    [Product(**{**existing.get(data['sku'], {}), **data}) for _, data in members],
+                    update_conflicts=True,
+                    unique_fields=['sku'],
+                    update_fields=[column for column in columns if column != 'sku'] + ['updated_at'],
+                )
+    except DatabaseError as error:
+        for members in groups.values():
+            for number, data in members:
+                result.fail(number, data['sku'], {'non_field_errors': [str(error)]})
+        return
+
+    for members in groups.values():
+        for _, data in members:
+            if data['sku'] in existing:
+                result.updated += 1
+            else:
+                result.created += 1
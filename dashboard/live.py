@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import threading
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .metrics import SUMMARY_CACHE_KEY, start_of_today
+from .models import Order
+from .response_cache import get_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Which revenue figure an order's total counts towards, by status
+REVENUE_BUCKETS = {'completed': 'completed_revenue', 'pending': 'pending_revenue', 'confirmed': 'pending_revenue'}
+
+
+class DashboardPublisher:
+    """
+    Fans dashboard events out to every connected event stream in this process.
+
+    Each stream owns an asyncio queue on its own event loop; publish() may be
+    called from any thread and hands events over with call_soon_threadsafe.
+    A stream that falls too far behind is emptied and told to resync.
+    While anyone is listening, one watcher per event loop checks the orders
+    table every LIVE_EVENTS_POLL_INTERVAL seconds, so changes made by other
+    processes or by the storefront still reach clients as a resync.
+    """
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._watchers = {}
+        self._local_events = 0
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = loop
+            if loop not in self._watchers:
+                self._watchers[loop] = loop.create_task(self._watch(loop))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            loop = self._subscribers.pop(queue, None)
+            if loop is not None and loop not in self._subscribers.values():
+                watcher = self._watchers.pop(loop, None)
+                if watcher:
+                    watcher.cancel()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        with self._lock:
+            self._local_events += 1
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The stream's loop has shut down without unsubscribing
+                self.unsubscribe(queue)
+
+    def _offer(self, queue, event):
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            event = {'type': 'resync'}
+        queue.put_nowait(event)
+
+    async def _watch(self, loop):
+        state, local_events = None, self._local_events
+        while True:
+            await asyncio.sleep(settings.LIVE_EVENTS_POLL_INTERVAL)
+            try:
+                current = await sync_to_async(order_table_state)()
+            except Exception:
+                logger.exception('Dashboard event watcher could not read orders')
+                continue
+            # Changes this process published already went out as deltas
+            if state is not None and current != state and local_events == self._local_events:
+                for queue, queue_loop in list(self._subscribers.items()):
+                    if queue_loop is loop:
+                        self._offer(queue, {'type': 'resync'})
+            state, local_events = current, self._local_events
+
+
+publisher = DashboardPublisher()
+
+
+def order_table_state():
+    """(last change, row count) of the orders table; both come from indexes"""
+    state = Order.objects.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    return state['last_modified'], state['count']
+
+
+def order_deltas(order, previous_status=None, created=False):
+    """
+    Changes to the summary figures caused by one order being created or
+    moving from previous_status to its current status.
+    """
+    deltas = {}
+
+    def add(name, amount):
+        deltas[name] = deltas.get(name, 0) + amount
+
+    amount = order.total_amount or Decimal('0.00')
+    placed_today = order.date_ordered and order.date_ordered >= start_of_today()
+
+    if created:
+        add('total_orders', 1)
+        add(f'{order.order_type}_orders', 1)
+        if placed_today:
+            add('today_orders', 1)
+    elif previous_status == order.order_status:
+        return {}
+
+    if previous_status and not created:
+        add(f'{previous_status}_orders', -1)
+        if previous_status in REVENUE_BUCKETS:
+            add(REVENUE_BUCKETS[previous_status], -amount)
+        if placed_today and previous_status != 'cancelled':
+            add('today_revenue', -amount)
+
+    add(f'{order.order_status}_orders', 1)
+    if order.order_status in REVENUE_BUCKETS:
+        add(REVENUE_BUCKETS[order.order_status], amount)
+    if placed_today and order.order_status != 'cancelled':
+        add('today_revenue', amount)
+
+    if 'completed_revenue' in deltas:
+        deltas['total_revenue'] = deltas['completed_revenue']
+    return {name: value for name, value in deltas.items() if value}
+
+
+def _publish_after_commit(event):
+    def publish():
+        # Resyncing clients must not be handed a summary cached before this change
+        get_cache().delete(SUMMARY_CACHE_KEY)
+        if event:
+            publisher.publish(event)
+    transaction.on_commit(publish)
+
+
+def publish_order_change(order, previous_status=None, created=False):
+    """Send an order's metric deltas to connected dashboards once the transaction commits"""
+    deltas = order_deltas(order, previous_status, created)
+    if not deltas:
+        _publish_after_commit(None)
+        return
+    _publish_after_commit({
+        'type': 'order_created' if created else 'order_status_changed',
+        'order_id': order.id,
+        'order_type': order.order_type,
+        'status': order.order_status,
+        'previous_status': None if created else previous_status,
+        'deltas': deltas,
+    })
+
+
+def publish_status_changes(changes):
+    """
+    Send the combined deltas of many orders changing status, given as
+    (order, previous status) pairs, as one event once the transaction commits.
+    """
+    deltas = {}
+    for order, previous_status in changes:
+        for name, value in order_deltas(order, previous_status).items():
+            deltas[name] = deltas.get(name, 0) + value
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        _publish_after_commit(None)
+        return
+    _publish_after_commit({
+        'type': 'orders_status_changed',
+        'order_ids': [order.id for order, _ in changes],
+        'deltas': deltas,
+    })
+
+
+def publish_resync():
+    """Ask connected dashboards to refetch the summary, for changes that have no cheap delta"""
+    _publish_after_commit({'type': 'resync'})
+
+
+def format_event(event):
+    """Encode an event as a Server-Sent Events frame"""
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f'event: {event["type"]}\ndata: {data}\n\n'
+
+
+async def event_stream(queue, snapshot=None):
+    """Yield SSE frames from a subscriber queue, with keep-alive comments while idle"""
+    try:
+        yield f'retry: {settings.LIVE_EVENTS_RETRY_MS}\n\n'
+        if snapshot is not None:
+            yield format_event({'type': 'snapshot', 'summary': snapshot, 'sent_at': timezone.now()})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.LIVE_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        publisher.unsubscribe(queue)
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from dashboard.benchmarks import BUDGETS_PATH, check_budgets, load_budgets, run_benchmarks, write_results
+from dashboard.models import CustomUser
+from dashboard.seeding import DatasetSeeder
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway test database and benchmark every admin API endpoint against budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--budgets', default=str(BUDGETS_PATH))
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database between runs')
+        parser.add_argument('--no-latency', action='store_true', help='Only enforce query count budgets')
+
+    def handle(self, *args, **options):
+        dataset = {key: options[key] for key in ('products', 'customers', 'orders', 'reviews', 'seed')}
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            admin = CustomUser.objects.filter(email='benchmark@example.com').first()
+            if admin is None:
+                DatasetSeeder(seed=options['seed'], log=self.stdout.write).run(
+                    products=options['products'], customers=options['customers'],
+                    orders=options['orders'], reviews=options['reviews'],
+                )
+                admin = CustomUser.objects.create_user(
+                    username='benchmark', email='benchmark@example.com', password='benchmark', is_staff=True
+                )
+            results = run_benchmarks(admin, repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        write_results(results, options['output'], dataset=dataset, repeat=options['repeat'])
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:28} {result["queries"]:>4} queries  p50 {result["p50_ms"]:>8.2f}ms  '
+                f'p95 {result["p95_ms"]:>8.2f}ms  {result["bytes"]:>8} bytes'
+            )
+
+        violations = check_budgets(results, load_budgets(options['budgets']), not options['no_latency'])
+        if violations:
+            raise CommandError('Budget exceeded:\n' + '\n'.join(violations))
+        self.stdout.write(self.style.SUCCESS(f'All endpoints within budget, results in {options["output"]}'))
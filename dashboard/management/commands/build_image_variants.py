@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from dashboard.image_variants import build_variants
+from dashboard.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Render WebP/AVIF variants for product images stored under MEDIA_ROOT; unchanged sources are skipped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render even when the source is unchanged')
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.filter(status='uploaded', image__startswith=settings.MEDIA_URL).order_by('id')
+        built = checked = 0
+        last_id = 0
+        while True:
+            batch = list(images.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            built += len(build_variants(batch, force=options['force']))
+            checked += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f'Built variants for {built} of {checked} local images'))
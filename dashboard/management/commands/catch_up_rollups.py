@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from dashboard.rollups import catch_up_rollups
+
+
+class Command(BaseCommand):
+    help = 'Repair order totals and rebuild the rollup days of orders changed recently, by any writer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes', type=int, default=settings.ROLLUP_CATCH_UP_MINUTES,
+            help='Look back this far; keep it longer than the schedule interval so runs overlap',
+        )
+
+    def handle(self, *args, **options):
+        orders, days = catch_up_rollups(timezone.now() - timedelta(minutes=options['minutes']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {orders} orders changed in the last {options["minutes"]} minutes, rebuilt {days} days'
+        ))
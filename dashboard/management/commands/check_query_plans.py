@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the admin API list queries and check that each one uses the index meant for it'
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, indexed, plan in check_query_plans():
+            if indexed:
+                self.stdout.write(f'OK    {label}')
+            else:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'SCAN  {label}'))
+            if options['verbosity'] > 1 or not indexed:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries do not use an index: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All checked queries use an index'))
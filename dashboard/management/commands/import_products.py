@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.imports import guess_format, import_products, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Create or update products by sku from a CSV, JSON or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, help='Rows per transaction (PRODUCT_IMPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or guess_format(options['path'])
+        if file_format is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format')
+
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_products(read_rows(file, file_format), chunk_size=options['chunk_size'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for error in result['errors']:
+            messages = '; '.join(f'{field}: {" ".join(texts)}' for field, texts in error['errors'].items())
+            self.stderr.write(f'Row {error["row"]} ({error["sku"] or "no sku"}): {messages}')
+        if result['errors_truncated']:
+            self.stderr.write(f'... {result["failed"] - len(result["errors"])} more rows failed')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {result["created"]}, updated {result["updated"]}, failed {result["failed"]} products'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from dashboard.rollups import rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily order metrics rollup from order history'
+
+    def handle(self, *args, **kwargs):
+        rows = rebuild_daily_metrics()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily metrics rows'))
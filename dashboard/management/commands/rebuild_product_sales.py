@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from dashboard.rollups import rebuild_product_sales
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-product daily sales rollup from order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Only rebuild the most recent days, e.g. to pick up orders written by the storefront'
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_product_sales(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} product sales rows'))
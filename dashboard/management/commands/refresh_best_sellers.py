@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from dashboard.rollups import refresh_best_sellers
+
+
+class Command(BaseCommand):
+    help = 'Set is_best_seller on the products with the most units sold recently, and clear it elsewhere'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BEST_SELLER_DAYS)
+        parser.add_argument('--top', type=int, default=settings.BEST_SELLER_COUNT)
+
+    def handle(self, *args, **options):
+        flagged, unflagged = refresh_best_sellers(options['days'], options['top'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Flagged {flagged} and unflagged {unflagged} best sellers '
+            f'(top {options["top"]} over {options["days"]} days)'
+        ))
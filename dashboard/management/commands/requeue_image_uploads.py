@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from dashboard.image_uploads import process_upload, reset_pending_uploads
+
+
+class Command(BaseCommand):
+    help = 'Upload product images left pending, e.g. by a restart, and optionally retry failed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--include-failed', action='store_true')
+
+    def handle(self, *args, **options):
+        uploaded = failed = 0
+        for image_id in reset_pending_uploads(include_failed=options['include_failed']):
+            if process_upload(image_id):
+                uploaded += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f'Uploaded {uploaded} images, {failed} failed'))
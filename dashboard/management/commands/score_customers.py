@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from dashboard.segments import score_customers
+
+
+class Command(BaseCommand):
+    help = 'Recompute RFM scores, segments and lifetime value for every customer'
+
+    def handle(self, *args, **options):
+        segments = score_customers()
+        summary = ', '.join(f'{name}: {count}' for name, count in sorted(segments.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {sum(segments.values())} customers ({summary or "none"})'
+        ))
@@ -0,0 +1,47 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from dashboard.seeding import DEFAULT_ANCHOR, DatasetSeeder
+
+
+def anchor_date(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = 'Seed a large synthetic dataset of customers, products, orders, reviews and carts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=8)
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--reviews', type=int, default=2000)
+        parser.add_argument('--carts', type=int, default=500)
+        parser.add_argument('--days', type=int, default=365, help='How far back order dates reach')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a reproducible dataset')
+        parser.add_argument(
+            '--anchor', type=anchor_date, default=DEFAULT_ANCHOR,
+            help='Date (YYYY-MM-DD) order dates count back from; use today for a live-looking dataset'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        seeder = DatasetSeeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            anchor=options['anchor'],
+            log=self.stdout.write if options['verbosity'] > 0 else None,
+        )
+        seeder.run(
+            categories=options['categories'],
+            products=options['products'],
+            customers=options['customers'],
+            orders=options['orders'],
+            reviews=options['reviews'],
+            carts=options['carts'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Seeded dataset in {time.monotonic() - started:.1f}s'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from dashboard.models import Order
+from dashboard.order_totals import find_total_drift
+
+
+class Command(BaseCommand):
+    help = 'Backfill and verify stored order totals against order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--check', action='store_true', help='Report drift without writing fixes')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checked = drifted = 0
+        last_pk = 0
+
+        while True:
+            orders = list(
+                Order.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'total_amount', 'item_count')[:chunk_size]
+            )
+            if not orders:
+                break
+            last_pk = orders[-1].pk
+            checked += len(orders)
+
+            fixes = find_total_drift(orders)
+            drifted += len(fixes)
+            if options['verbosity'] > 1:
+                for order in fixes:
+                    self.stdout.write(f'Order {order.pk}: total {order.total_amount}, items {order.item_count}')
+            if fixes and not options['check']:
+                with transaction.atomic():
+                    Order.objects.bulk_update(fixes, ['total_amount', 'item_count', 'updated_at'], batch_size=500)
+
+        action = 'found' if options['check'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} orders, {action} {drifted} with drifted totals'))
@@ -0,0 +1,314 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Avg, Case, Count, DecimalField, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, NullIf, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    Category, CustomUser, DailyOrderMetrics, DailyProductSales, Order, OrderItem, Product, ProductImage, Review,
+)
+from .response_cache import get_cache
+
+
+SUMMARY_CACHE_KEY = 'dashboard-summary'
+
+MONEY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=MONEY_FIELD)
+
+
+def order_item_total():
+    """SQL equivalent of OrderItem.get_total"""
+    return Case(
+        When(price_at_order__gt=0, then=F('price_at_order') * F('quantity')),
+        When(product__isnull=False, then=Coalesce(
+            'product__sale_price', 'product__regular_price'
+        ) * F('quantity')),
+        default=ZERO,
+        output_field=MONEY_FIELD,
+    )
+
+
+def order_revenue(prefix=''):
+    """
+    SQL equivalent of Order.order_total, i.e. `total_amount or get_cart_total`.
+
+    Signals in this process keep total_amount in step with the items, but
+    items written by the storefront or by bulk paths leave it at 0, so those
+    orders fall back to the sum of their items. `prefix` reaches the order
+    through a relation, e.g. 'order__' from a customer query.
+    """
+    cart_total = OrderItem.objects.filter(order=OuterRef(f'{prefix}pk')).order_by().values('order').annotate(
+        total=Sum(order_item_total())
+    ).values('total')
+    return Coalesce(
+        NullIf(f'{prefix}total_amount', ZERO),
+        Subquery(cart_total, output_field=MONEY_FIELD),
+        ZERO,
+        output_field=MONEY_FIELD,
+    )
+
+
+def start_of_today():
+    return timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+
+def order_statistics(queryset=None):
+    """
+    Order counts and revenue figures computed in a single aggregate query.
+
+    Revenue counts completed orders; pending revenue covers orders that are
+    still pending or confirmed, and today's revenue covers every order placed
+    today that has not been cancelled.
+    """
+    if queryset is None:
+        queryset = Order.objects.all()
+
+    open_statuses = Q(order_status__in=['pending', 'confirmed'])
+    completed = Q(order_status='completed')
+    stats = queryset.order_by().annotate(revenue=order_revenue()).aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(order_status='pending')),
+        confirmed_orders=Count('id', filter=Q(order_status='confirmed')),
+        completed_orders=Count('id', filter=completed),
+        cancelled_orders=Count('id', filter=Q(order_status='cancelled')),
+        whatsapp_orders=Count('id', filter=Q(order_type='whatsapp')),
+        email_orders=Count('id', filter=Q(order_type='email')),
+        today_orders=Count('id', filter=Q(date_ordered__gte=start_of_today())),
+        completed_revenue=Coalesce(Sum('revenue', filter=completed), ZERO),
+        pending_revenue=Coalesce(Sum('revenue', filter=open_statuses), ZERO),
+        today_revenue=Coalesce(Sum('revenue', filter=Q(
+            date_ordered__gte=start_of_today()
+        ) & ~Q(order_status='cancelled')), ZERO),
+    )
+
+    stats['total_revenue'] = stats['completed_revenue']
+    if stats['completed_orders']:
+        stats['average_order_value'] = (
+            stats['completed_revenue'] / stats['completed_orders']
+        ).quantize(Decimal('0.01'))
+    else:
+        stats['average_order_value'] = Decimal('0.00')
+    return stats
+
+
+def customer_order_totals(queryset):
+    """
+    Annotate customers with order_count, total_spent and last_order_at.
+
+    Each figure is a correlated subquery on the customer's orders, served by
+    the (user, -date_ordered) index, so a page costs the same whatever the
+    order history. As in CustomerStats, cancelled orders are not counted and
+    total_spent is the revenue of completed orders.
+    """
+    orders = Order.objects.filter(user=OuterRef('pk')).exclude(order_status='cancelled').order_by()
+    return queryset.annotate(
+        order_count=Coalesce(Subquery(
+            orders.values('user').annotate(count=Count('id')).values('count')
+        ), 0),
+        total_spent=Coalesce(Subquery(
+            orders.filter(order_status='completed').annotate(revenue=order_revenue()).values('user').annotate(
+                total=Sum('revenue')
+            ).values('total'), output_field=MONEY_FIELD
+        ), ZERO),
+        last_order_at=Subquery(orders.order_by('-date_ordered').values('date_ordered')[:1]),
+    )
+
+
+# Sales ranking windows in days, and what products can be ranked by
+SALES_WINDOWS = (7, 30, 90)
+SALES_RANKINGS = {'units': 'total_units', 'revenue': 'total_revenue', 'orders': 'total_orders'}
+
+
+def sales_ranking(days, rank_by='units', *fields):
+    """
+    Products ranked by sales over the last `days` days, read from the
+    DailyProductSales rollup. Rows hold product_id, any extra `fields`
+    (e.g. 'product__name') and the window's total_units, total_revenue and
+    total_orders.
+    """
+    rank = SALES_RANKINGS[rank_by]
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return DailyProductSales.objects.filter(date__gte=since).values('product_id', *fields).annotate(
+        total_units=Sum('units'), total_revenue=Sum('revenue'), total_orders=Sum('order_count'),
+    ).order_by(f'-{rank}', 'product_id')
+
+
+# Revenue series intervals, with the number of periods returned by default
+REVENUE_INTERVALS = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+REVENUE_PERIODS = {'day': 30, 'week': 12, 'month': 12}
+MAX_REVENUE_PERIODS = 366
+
+
+def period_start(day, interval):
+    """First day of the period containing `day`; weeks start on Monday like TruncWeek"""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start, interval):
+    if interval == 'week':
+        return start + timedelta(weeks=1)
+    if interval == 'month':
+        return (start + timedelta(days=31)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def previous_period(start, interval):
+    if interval == 'week':
+        return start - timedelta(weeks=1)
+    if interval == 'month':
+        return (start - timedelta(days=1)).replace(day=1)
+    return start - timedelta(days=1)
+
+
+def _revenue_key(interval, order_type, start, stamp):
+    count, updated_at = stamp
+    changed = updated_at.isoformat() if updated_at else 'never'
+    return f'revenue-series:{interval}:{order_type or "all"}:{start.isoformat()}:{count}:{changed}'
+
+
+def revenue_stamps(interval, first, last, order_type=None):
+    """
+    {period start: (rollup rows, their latest updated_at)} for the periods
+    from `first` to `last`, in one query. Any write to a period's rows,
+    from whichever process, changes its stamp.
+    """
+    rows = DailyOrderMetrics.objects.filter(date__gte=first, date__lt=next_period(last, interval))
+    if order_type:
+        rows = rows.filter(order_type=order_type)
+    return {
+        row['period']: (row['rows'], row['changed'])
+        for row in rows.order_by().annotate(period=REVENUE_INTERVALS[interval]('date')).values('period').annotate(
+            rows=Count('id'), changed=Max('updated_at'),
+        )
+    }
+
+
+def revenue_buckets(interval, first, last, order_type=None):
+    """
+    {period start: figures} for the periods from `first` to `last`, in one
+    query over the DailyOrderMetrics rollup. Periods without orders are
+    included with zero figures.
+    """
+    rows = DailyOrderMetrics.objects.filter(date__gte=first, date__lt=next_period(last, interval))
+    if order_type:
+        rows = rows.filter(order_type=order_type)
+    completed = Q(order_status='completed')
+    totals = {
+        row['period']: row
+        for row in rows.order_by().annotate(period=REVENUE_INTERVALS[interval]('date')).values('period').annotate(
+            orders=Sum('order_count'),
+            completed_orders=Coalesce(Sum('order_count', filter=completed), 0),
+            revenue=Coalesce(Sum('revenue', filter=completed), ZERO),
+        )
+    }
+
+    buckets = {}
+    start = first
+    while start <= last:
+        row = totals.get(start, {})
+        completed_orders = row.get('completed_orders', 0)
+        revenue = row.get('revenue', Decimal('0.00'))
+        buckets[start] = {
+            'period': start,
+            'orders': row.get('orders', 0),
+            'completed_orders': completed_orders,
+            'revenue': revenue,
+            'average_order_value': (
+                (revenue / completed_orders).quantize(Decimal('0.01')) if completed_orders else Decimal('0.00')
+            ),
+        }
+        start = next_period(start, interval)
+    return buckets
+
+
+def revenue_series(interval, periods=None, order_type=None):
+    """
+    Revenue, order counts and average order value for the last `periods`
+    days, weeks or months, oldest first, the current one included.
+
+    Revenue and average order value count completed orders, as in
+    order_statistics; `orders` counts every order placed. Closed periods
+    are cached without expiry under a key that includes their
+    revenue_stamps, so a rollup change made by any process (such as the
+    catch_up_rollups cron) is seen by every web worker. Only the stamps,
+    the open period and changed periods are read from the database.
+    """
+    periods = periods or REVENUE_PERIODS[interval]
+    current = period_start(timezone.localdate(), interval)
+    starts = [current]
+    while len(starts) < periods:
+        starts.append(previous_period(starts[-1], interval))
+    starts.reverse()
+
+    cache = get_cache()
+    stamps = revenue_stamps(interval, starts[0], starts[-2], order_type) if len(starts) > 1 else {}
+    keys = {
+        start: _revenue_key(interval, order_type, start, stamps.get(start, (0, None)))
+        for start in starts[:-1]
+    }
+    cached = cache.get_many(keys.values())
+    buckets = {start: cached[key] for start, key in keys.items() if key in cached}
+
+    missing = [start for start in keys if start not in buckets]
+    if missing:
+        closed = revenue_buckets(interval, missing[0], missing[-1], order_type)
+        cache.set_many({keys[start]: closed[start] for start in missing}, timeout=None)
+        buckets.update(closed)
+    buckets.update(revenue_buckets(interval, current, current, order_type))
+    return [buckets[start] for start in starts]
+
+
+def dashboard_summary(top_products=5):
+    """
+    Every figure the dashboard page renders, in seven small queries.
+
+    Order figures come from order_statistics; catalog figures are plain
+    counts, and the best sellers are the 30-day ranking from the product
+    sales rollup, read without images or categories.
+    """
+    products = Product.objects.aggregate(
+        total_products=Count('id'),
+        active_products=Count('id', filter=Q(status='active')),
+        featured_products=Count('id', filter=Q(is_featured=True)),
+    )
+    reviews = Review.objects.aggregate(total_reviews=Count('id'), average_rating=Avg('rating'))
+    if reviews['average_rating'] is not None:
+        reviews['average_rating'] = round(reviews['average_rating'], 1)
+
+    return {
+        **order_statistics(),
+        **products,
+        **reviews,
+        'total_customers': CustomUser.objects.filter(is_staff=False).count(),
+        'total_categories': Category.objects.count(),
+        'total_images': ProductImage.objects.count(),
+        'top_products': [
+            {
+                'id': row['product_id'],
+                'name': row['product__name'],
+                'regular_price': row['product__regular_price'],
+                'sale_price': row['product__sale_price'],
+                'units_sold': row['total_units'],
+            }
+            for row in sales_ranking(
+                30, 'units', 'product__name', 'product__regular_price', 'product__sale_price'
+            )[:top_products]
+        ],
+        'generated_at': timezone.now(),
+    }
+
+
+def cached_dashboard_summary():
+    """dashboard_summary, cached for DASHBOARD_SUMMARY_TTL seconds or until an order changes"""
+    cache = get_cache()
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = dashboard_summary()
+        cache.set(SUMMARY_CACHE_KEY, summary, settings.DASHBOARD_SUMMARY_TTL)
+    return summary
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_whatsapp_email_checkout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='user_note',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
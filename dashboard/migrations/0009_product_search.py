@@ -0,0 +1,83 @@
+# Full-text search index for products: a generated tsvector column with a GIN
+# index on PostgreSQL, an FTS5 shadow table kept in sync by triggers on SQLite.
+# The DDL is frozen here; dashboard.search only restores the SQLite triggers.
+
+from django.db import migrations
+
+
+POSTGRES_INSTALL = [
+    """
+    ALTER TABLE "Radhirra_product" ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(sku, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS product_search_vector_idx ON "Radhirra_product" USING GIN (search_vector)',
+]
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS product_search_vector_idx',
+    'ALTER TABLE "Radhirra_product" DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS "Radhirra_product_search" USING fts5(
+        name, sku, description, content='Radhirra_product', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_search_insert AFTER INSERT ON "Radhirra_product" BEGIN
+        INSERT INTO "Radhirra_product_search"(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_search_delete AFTER DELETE ON "Radhirra_product" BEGIN
+        INSERT INTO "Radhirra_product_search"("Radhirra_product_search", rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_search_update AFTER UPDATE ON "Radhirra_product" BEGIN
+        INSERT INTO "Radhirra_product_search"("Radhirra_product_search", rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO "Radhirra_product_search"(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+    """INSERT INTO "Radhirra_product_search"("Radhirra_product_search") VALUES ('rebuild')""",
+]
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS product_search_insert',
+    'DROP TRIGGER IF EXISTS product_search_delete',
+    'DROP TRIGGER IF EXISTS product_search_update',
+    'DROP TABLE IF EXISTS "Radhirra_product_search"',
+]
+
+
+def execute_for_vendor(schema_editor, postgres, sqlite):
+    vendor = schema_editor.connection.vendor
+    statements = postgres if vendor == 'postgresql' else sqlite if vendor == 'sqlite' else []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def install(apps, schema_editor):
+    execute_for_vendor(schema_editor, POSTGRES_INSTALL, SQLITE_INSTALL)
+
+
+def uninstall(apps, schema_editor):
+    execute_for_vendor(schema_editor, POSTGRES_UNINSTALL, SQLITE_UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='local_path',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], db_default='uploaded', default='uploaded', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='upload_attempts',
+            field=models.PositiveSmallIntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='upload_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
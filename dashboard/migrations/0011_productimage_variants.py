@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_productimage_upload_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='variants',
+            field=models.JSONField(blank=True, db_default={}, default=dict),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='variants_source',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_dailyproductsales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('completed_orders', models.PositiveIntegerField(default=0)),
+                ('total_spent', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('first_order_at', models.DateTimeField(blank=True, null=True)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('recency_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('recency_score', models.PositiveSmallIntegerField(default=0)),
+                ('frequency_score', models.PositiveSmallIntegerField(default=0)),
+                ('monetary_score', models.PositiveSmallIntegerField(default=0)),
+                ('segment', models.CharField(choices=[('champion', 'Champion'), ('loyal', 'Loyal'), ('new', 'New'), ('needs_attention', 'Needs attention'), ('at_risk', 'At risk'), ('lapsed', 'Lapsed'), ('prospect', 'No orders yet')], default='prospect', max_length=20)),
+                ('lifetime_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'customer stats',
+                'indexes': [models.Index(fields=['-lifetime_value'], name='customer_stats_ltv_idx'), models.Index(fields=['segment', '-lifetime_value'], name='customer_stats_segment_idx')],
+            },
+        ),
+    ]
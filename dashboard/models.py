@@ -1,4 +1,10 @@
+"""
+The storefront shares these tables and inserts rows with its own SQL, naming
+only the columns it knows. Columns added for the dashboard therefore carry a
+db_default as well as a Python default.
+"""
 from django.db import models
+from django.db.models.functions import Now
 from django.contrib.auth.models import AbstractUser
 from cloudinary.models import CloudinaryField
 
@@ -11,6 +17,9 @@ class CustomUser(AbstractUser):
     
     class Meta:
         db_table = 'users_customuser'
+        indexes = [
+            models.Index(fields=['is_staff', '-date_joined'], name='user_staff_joined_idx'),
+        ]
 
 
 class UserProfile(models.Model):
@@ -31,6 +40,7 @@ class Category(models.Model):
     name = models.CharField(max_length=120, unique=True)
     slug = models.CharField(max_length=120, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
     
     def __str__(self):
         return self.name
@@ -61,6 +71,7 @@ class Product(models.Model):
     is_new_arrival = models.BooleanField(default=False)
     is_best_seller = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
     
     def __str__(self):
         return self.name
@@ -73,17 +84,41 @@ class Product(models.Model):
     
     @property
     def main_image(self):
+        # Use prefetched images when available instead of issuing a query per product
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'productimage_set' in prefetched:
+            main_images = [image for image in prefetched['productimage_set'] if image.is_main]
+            return min(main_images, key=lambda image: image.pk, default=None)
         return self.productimage_set.filter(is_main=True).first()
     
     class Meta:
         db_table = 'Radhirra_product'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', '-id'], name='product_status_idx'),
+            models.Index(fields=['-id'], condition=models.Q(is_featured=True), name='product_featured_idx'),
+            models.Index(fields=['-id'], condition=models.Q(is_new_arrival=True), name='product_new_arrival_idx'),
+            models.Index(fields=['-id'], condition=models.Q(is_best_seller=True), name='product_best_seller_idx'),
+            models.Index(fields=['-updated_at'], name='product_updated_idx'),
+        ]
 
 
 class ProductImage(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('uploaded', 'Uploaded'),
+        ('failed', 'Failed'),
+    ]
+    
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     image = models.URLField(max_length=500)  # Store Cloudinary URL
     is_main = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploaded', db_default='uploaded')
+    local_path = models.CharField(max_length=255, blank=True, null=True)  # Staged file awaiting upload
+    upload_attempts = models.PositiveSmallIntegerField(default=0, db_default=0)
+    upload_error = models.TextField(blank=True, null=True)
+    variants = models.JSONField(default=dict, db_default={}, blank=True)  # {format: {width: storage name}}
+    variants_source = models.CharField(max_length=64, blank=True, null=True)  # sha256 of the rendered source
     
     @property
     def thumbnail_url(self):
@@ -109,6 +144,14 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    # Statuses an order may move to from each status
+    STATUS_TRANSITIONS = {
+        'pending': ('confirmed', 'completed', 'cancelled'),
+        'confirmed': ('pending', 'completed', 'cancelled'),
+        'completed': ('cancelled',),
+        'cancelled': ('pending',),
+    }
+    
     user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, blank=True, null=True)
     date_ordered = models.DateTimeField(auto_now_add=True)
     complete = models.BooleanField(default=False)
@@ -116,12 +159,16 @@ class Order(models.Model):
     order_type = models.CharField(max_length=10, choices=ORDER_TYPE_CHOICES, default='whatsapp')
     order_status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES, default='pending')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    item_count = models.PositiveIntegerField(default=0, db_default=0)
     contact_value = models.CharField(max_length=255, blank=True, null=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"Order {self.id}"
     
+    def can_change_status(self, status):
+        return status == self.order_status or status in self.STATUS_TRANSITIONS.get(self.order_status, ())
+    
     @property
     def get_cart_total(self):
         orderitems = self.orderitem_set.all()
@@ -134,9 +181,27 @@ class Order(models.Model):
         total = sum([item.quantity for item in orderitems])
         return total
     
+    @property
+    def order_total(self):
+        # Orders whose items were written around the signals (e.g. by the storefront) still read 0
+        return self.total_amount or self.get_cart_total
+    
+    @property
+    def order_item_count(self):
+        return self.item_count or self.get_cart_items
+    
     class Meta:
         db_table = 'Radhirra_order'
         ordering = ['-date_ordered']
+        indexes = [
+            models.Index(fields=['-date_ordered'], name='order_date_idx'),
+            models.Index(fields=['order_status', '-date_ordered'], name='order_status_date_idx'),
+            models.Index(fields=['order_type', '-date_ordered'], name='order_type_date_idx'),
+            models.Index(fields=['complete', '-date_ordered'], name='order_complete_date_idx'),
+            models.Index(fields=['user', '-date_ordered'], name='order_user_date_idx'),
+            models.Index(fields=['transaction_id'], name='order_transaction_idx'),
+            models.Index(fields=['-updated_at'], name='order_updated_idx'),
+        ]
 
 
 class OrderItem(models.Model):
@@ -185,6 +250,9 @@ class Cart(models.Model):
     
     class Meta:
         db_table = 'Radhirra_cart'
+        indexes = [
+            models.Index(fields=['session_key'], name='cart_session_key_idx'),
+        ]
 
 
 class CartItem(models.Model):
@@ -209,6 +277,7 @@ class Review(models.Model):
     rating = models.IntegerField()
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
     
     def __str__(self):
         return f"{self.product.name} - {self.rating} stars"
@@ -216,3 +285,79 @@ class Review(models.Model):
     class Meta:
         db_table = 'Radhirra_review'
         unique_together = ('product', 'user')
+        indexes = [
+            models.Index(fields=['-created_at'], name='review_created_idx'),
+            models.Index(fields=['rating', '-created_at'], name='review_rating_created_idx'),
+            models.Index(fields=['-updated_at'], name='review_updated_idx'),
+        ]
+
+
+class DailyOrderMetrics(models.Model):
+    """Per-day order counts and revenue, maintained by dashboard.rollups"""
+    date = models.DateField()
+    order_type = models.CharField(max_length=10, choices=Order.ORDER_TYPE_CHOICES)
+    order_status = models.CharField(max_length=10, choices=Order.ORDER_STATUS_CHOICES)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.date} {self.order_type}/{self.order_status}"
+    
+    class Meta:
+        unique_together = ('date', 'order_type', 'order_status')
+        ordering = ['-date']
+
+
+class DailyProductSales(models.Model):
+    """Units, revenue and orders per product per day, excluding cancelled orders; see dashboard.rollups"""
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.date} product {self.product_id}"
+    
+    class Meta:
+        unique_together = ('date', 'product')
+        ordering = ['-date']
+
+
+class CustomerStats(models.Model):
+    """RFM scores, segment and lifetime value of a customer, written by dashboard.segments"""
+    SEGMENT_CHOICES = [
+        ('champion', 'Champion'),
+        ('loyal', 'Loyal'),
+        ('new', 'New'),
+        ('needs_attention', 'Needs attention'),
+        ('at_risk', 'At risk'),
+        ('lapsed', 'Lapsed'),
+        ('prospect', 'No orders yet'),
+    ]
+    
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    order_count = models.PositiveIntegerField(default=0)
+    completed_orders = models.PositiveIntegerField(default=0)
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    first_order_at = models.DateTimeField(blank=True, null=True)
+    last_order_at = models.DateTimeField(blank=True, null=True)
+    recency_days = models.PositiveIntegerField(blank=True, null=True)
+    recency_score = models.PositiveSmallIntegerField(default=0)
+    frequency_score = models.PositiveSmallIntegerField(default=0)
+    monetary_score = models.PositiveSmallIntegerField(default=0)
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, default='prospect')
+    lifetime_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user_id} {self.segment}"
+    
+    class Meta:
+        verbose_name_plural = 'customer stats'
+        indexes = [
+            models.Index(fields=['-lifetime_value'], name='customer_stats_ltv_idx'),
+            models.Index(fields=['segment', '-lifetime_value'], name='customer_stats_segment_idx'),
+        ]
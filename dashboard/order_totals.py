@@ -0,0 +1,60 @@
+from django.db.models import Sum
+from django.utils import timezone
+
+from .metrics import order_item_total
+from .models import Order, OrderItem
+
+
+def compute_order_totals(order_ids):
+    """Map order id -> (total_amount, item_count) derived from its items"""
+    rows = OrderItem.objects.filter(order_id__in=order_ids).order_by().values('order_id').annotate(
+        total=Sum(order_item_total()),
+        items=Sum('quantity'),
+    )
+    return {
+        row['order_id']: (row['total'] or 0, row['items'] or 0)
+        for row in rows
+    }
+
+
+def sync_order_totals(order_ids):
+    """
+    Store item-derived totals on the given orders. As in find_total_drift,
+    an order left without items keeps its stored total and only has its
+    item count reset.
+    """
+    totals = compute_order_totals(order_ids)
+    now = timezone.now()
+    for order_id in order_ids:
+        if order_id in totals:
+            total_amount, item_count = totals[order_id]
+            Order.objects.filter(pk=order_id).update(
+                total_amount=total_amount, item_count=item_count, updated_at=now
+            )
+        else:
+            Order.objects.filter(pk=order_id).update(item_count=0, updated_at=now)
+
+
+def find_total_drift(orders):
+    """
+    Compare stored totals on `orders` against their items.
+
+    Orders without any items keep their stored total, since it is the only
+    record of what was charged. Returns the orders whose stored values differ,
+    already updated with the recomputed ones and a new updated_at, so list
+    validators see the change once they are saved.
+    """
+    totals = compute_order_totals([order.pk for order in orders])
+    now = timezone.now()
+    drifted = []
+    for order in orders:
+        if order.pk in totals:
+            total_amount, item_count = totals[order.pk]
+        else:
+            total_amount, item_count = order.total_amount, 0
+        if order.total_amount != total_amount or order.item_count != item_count:
+            order.total_amount = total_amount
+            order.item_count = item_count
+            order.updated_at = now
+            drifted.append(order)
+    return drifted
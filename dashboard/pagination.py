@@ -0,0 +1,57 @@
+from django.core.paginator import Paginator
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CountedPaginator(Paginator):
+    """Paginator that can reuse a row count the view already has"""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Page-number pagination that honours the frontend's page_size parameter.
+
+    Views that have already counted the filtered queryset (see
+    ConditionalGetMixin) set `known_count` to skip the second COUNT(*).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    known_count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.known_count = getattr(view, 'known_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountedPaginator(object_list, per_page, count=self.known_count)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor pagination over the view's `cursor_ordering`.
+
+    Pages are located with an indexed range filter instead of OFFSET, and no
+    COUNT(*) is run. Any ?ordering parameter is ignored in this mode.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class CursorPaginationMixin:
+    """Switch a list endpoint to keyset pagination with ?pagination=cursor"""
+    cursor_ordering = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.cursor_ordering:
+            params = self.request.query_params
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+        return super().paginator
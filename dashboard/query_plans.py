@@ -0,0 +1,119 @@
+import re
+from contextlib import contextmanager
+from itertools import count
+
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .metrics import sales_ranking
+from .models import Cart, DailyProductSales, Order
+
+
+_explain_ids = count()
+
+
+def endpoint_queryset(viewset_class, params=None):
+    """The page queryset a list endpoint runs for the given query parameters"""
+    request = Request(APIRequestFactory().get('/', params or {}))
+    view = viewset_class(request=request, action='list', format_kwarg=None, kwargs={})
+    return view.filter_queryset(view.get_queryset())[:20]
+
+
+def index_on(model, *fields):
+    """
+    Name of the index Django created on exactly these columns (e.g. for a
+    ForeignKey or unique_together), or None if the database has none
+    """
+    columns = [model._meta.get_field(field).column for field in fields]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return next((
+        name for name, constraint in constraints.items()
+        if constraint['columns'] == columns and (constraint['index'] or constraint['unique'])
+    ), None)
+
+
+def indexed_queries():
+    """
+    (label, queryset, index names) for the admin API's filter and sort
+    patterns. A pattern passes when its plan reads through one of the named
+    indexes; where the planner may pick either of two good indexes, both are
+    listed.
+    """
+    from .viewsets import CustomerViewSet, OrderViewSet, ProductViewSet, ReviewViewSet
+
+    return [
+        ('orders', endpoint_queryset(OrderViewSet), ['order_date_idx']),
+        ('orders?order_status', endpoint_queryset(OrderViewSet, {'order_status': 'pending'}),
+         ['order_status_date_idx']),
+        ('orders?order_type', endpoint_queryset(OrderViewSet, {'order_type': 'email'}), ['order_type_date_idx']),
+        # A boolean splits the table in two, so walking the date index is as good as the filtered one
+        ('orders?complete', endpoint_queryset(OrderViewSet, {'complete': 'true'}),
+         ['order_complete_date_idx', 'order_date_idx']),
+        ('orders by transaction_id', Order.objects.filter(transaction_id='ORD-1000'), ['order_transaction_idx']),
+        ('products?is_featured', endpoint_queryset(ProductViewSet, {'is_featured': 'true'}),
+         ['product_featured_idx']),
+        ('products?is_new_arrival', endpoint_queryset(ProductViewSet, {'is_new_arrival': 'true'}),
+         ['product_new_arrival_idx']),
+        ('products?is_best_seller', endpoint_queryset(ProductViewSet, {'is_best_seller': 'true'}),
+         ['product_best_seller_idx']),
+        ('products?status', endpoint_queryset(ProductViewSet, {'status': 'active'}), ['product_status_idx']),
+        ('customers', endpoint_queryset(CustomerViewSet), ['user_staff_joined_idx']),
+        ('reviews', endpoint_queryset(ReviewViewSet), ['review_created_idx']),
+        ('reviews?rating', endpoint_queryset(ReviewViewSet, {'rating': 5}), ['review_rating_created_idx']),
+        ('carts by session_key', Cart.objects.filter(session_key='abc'), ['cart_session_key_idx']),
+        # Either a date range scan or a walk in product order for the grouping
+        ('product sales ranking', sales_ranking(30)[:5],
+         [index_on(DailyProductSales, 'date', 'product'), index_on(DailyProductSales, 'product')]),
+    ]
+
+
+@contextmanager
+def index_preferred():
+    """
+    On PostgreSQL, discourage sequential scans so the plan shows whether an
+    index is usable even when the tables are too small for the planner to
+    bother with it. Any index then beats a scan, including the primary key,
+    which is why each pattern names the indexes it should use.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        yield
+
+
+def uses_index(plan, names):
+    """Whether the EXPLAIN output reads through one of the named indexes"""
+    if connection.vendor == 'postgresql':
+        # "Index Scan using name", "Index Only Scan using name", "Bitmap Index Scan on name"
+        markers = ('Index Scan using', 'Index Only Scan using', 'Bitmap Index Scan on')
+    else:
+        markers = ('USING INDEX', 'USING COVERING INDEX')
+    patterns = [re.compile(rf'\b{re.escape(name)}\b') for name in names if name]
+    return any(
+        any(marker in line for marker in markers) and any(pattern.search(line) for pattern in patterns)
+        for line in plan.splitlines()
+    )
+
+
+def explain(queryset):
+    if connection.vendor != 'sqlite':
+        return queryset.explain()
+    # SQLite keeps serving the cached plan of an identical EXPLAIN after an
+    # index is dropped on the same connection; a unique comment avoids it
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql} -- {next(_explain_ids)}', params)
+        return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+
+
+def check_query_plans():
+    """Return (label, uses an expected index, plan) for every pattern in indexed_queries"""
+    results = []
+    with index_preferred():
+        for label, queryset, names in indexed_queries():
+            plan = explain(queryset)
+            results.append((label, uses_index(plan, names), plan))
+    return results
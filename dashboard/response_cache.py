@@ -0,0 +1,113 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f'response-cache:version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    """
+    Current version token of a model's cached responses.
+
+    Tokens are timestamps rather than counters, so a version key that gets
+    evicted comes back with a fresh value instead of restarting at a number
+    that old entries may still be stored under.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(model))
+    if version is None:
+        cache.add(_version_key(model), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(model))
+    return version
+
+
+def bump_versions(*models):
+    """Invalidate every cached response built from these models"""
+    cache = get_cache()
+    for model in models:
+        cache.set(_version_key(model), time.time_ns(), timeout=None)
+
+
+def bump_versions_on_commit(*models):
+    """Bump now and again once the transaction commits, so readers racing the write cannot re-cache old rows"""
+    bump_versions(*models)
+    transaction.on_commit(lambda: bump_versions(*models))
+
+
+def _count(name, basename):
+    cache = get_cache()
+    key = f'response-cache:{name}:{basename}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def cache_stats(basenames):
+    cache = get_cache()
+    stats = {}
+    for basename in basenames:
+        hits = cache.get(f'response-cache:hits:{basename}', 0)
+        misses = cache.get(f'response-cache:misses:{basename}', 0)
+        lookups = hits + misses
+        stats[basename] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+        }
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses keyed on the query string and the
+    versions of `cache_models`.
+
+    Saves and deletes of those models bump their version (see signals.py),
+    so stale entries are never read again and simply age out. Writes that
+    bypass signals, such as QuerySet.update, must call bump_versions.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cache_key(self, request):
+        versions = ':'.join(str(get_version(model)) for model in self.cache_models)
+        params = sorted(request.query_params.lists())
+        fingerprint = hashlib.sha256(
+            repr((self.action, self.kwargs.get(self.lookup_url_kwarg or self.lookup_field), params)).encode()
+        ).hexdigest()
+        return f'response-cache:{self.basename}:{versions}:{fingerprint}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            _count('hits', self.basename)
+            data, status_code = cached
+            response = Response(data, status=status_code)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count('misses', self.basename)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.data, response.status_code), settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,255 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .live import publish_resync
+from .metrics import order_item_total, order_revenue, sales_ranking
+from .models import DailyOrderMetrics, DailyProductSales, Order, OrderItem, Product
+from .order_totals import find_total_drift
+from .response_cache import bump_versions_on_commit
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def metrics_key(date_ordered, order_type, order_status):
+    """Rollup row an order with these values is counted in"""
+    return (timezone.localdate(date_ordered), order_type, order_status)
+
+
+def refresh_daily_metrics(day, order_type, order_status):
+    """Recompute a single rollup row from the orders placed on that day
+
+    The row is created if missing and locked before the orders are counted, so
+    concurrent refreshes of the same row run one after the other and the last
+    one sees every committed order. Errors are never caught here, so an
+    enclosing transaction needs no savepoint.
+    """
+    lookup = {'date': day, 'order_type': order_type, 'order_status': order_status}
+    rows = DailyOrderMetrics.objects.filter(**lookup)
+    with transaction.atomic(savepoint=False):
+        DailyOrderMetrics.objects.bulk_create([DailyOrderMetrics(**lookup)], ignore_conflicts=True)
+        list(rows.select_for_update().values_list('id', flat=True))
+
+        start, end = day_bounds(day)
+        totals = Order.objects.filter(
+            date_ordered__gte=start, date_ordered__lt=end,
+            order_type=order_type, order_status=order_status,
+        ).order_by().annotate(order_revenue=order_revenue()).aggregate(
+            order_count=Count('id'),
+            revenue=Sum('order_revenue'),
+        )
+
+        if totals['order_count']:
+            DailyOrderMetrics.objects.bulk_create([DailyOrderMetrics(
+                order_count=totals['order_count'], revenue=totals['revenue'] or 0, **lookup,
+            )], update_conflicts=True, unique_fields=['date', 'order_type', 'order_status'],
+                update_fields=['order_count', 'revenue', 'updated_at'])
+        else:
+            rows.delete()
+
+
+def refresh_metrics_for_orders(order_ids):
+    """Refresh every rollup row the given orders are counted in"""
+    rows = Order.objects.filter(id__in=order_ids).values_list(
+        'date_ordered', 'order_type', 'order_status'
+    )
+    for key in {metrics_key(*row) for row in rows}:
+        refresh_daily_metrics(*key)
+
+
+@transaction.atomic
+def rebuild_daily_metrics():
+    """Rebuild the whole rollup table from order history"""
+    rows = Order.objects.order_by().annotate(
+        day=TruncDate('date_ordered'), order_revenue=order_revenue()
+    ).values('day', 'order_type', 'order_status').annotate(
+        order_count=Count('id'),
+        revenue=Sum('order_revenue'),
+    )
+
+    DailyOrderMetrics.objects.all().delete()
+    metrics = DailyOrderMetrics.objects.bulk_create([
+        DailyOrderMetrics(
+            date=row['day'],
+            order_type=row['order_type'],
+            order_status=row['order_status'],
+            order_count=row['order_count'],
+            revenue=row['revenue'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+    return len(metrics)
+
+
+def _sold_items():
+    """Order items that count as sales: attached to a product and an order that is not cancelled"""
+    return OrderItem.objects.filter(product__isnull=False, order__isnull=False).exclude(
+        order__order_status='cancelled'
+    ).order_by()
+
+
+def _sales_totals(items):
+    return items.annotate(
+        units_sold=Sum('quantity'),
+        line_revenue=Sum(order_item_total()),
+        orders=Count('order_id', distinct=True),
+    )
+
+
+def product_sales_keys(order_ids, product_ids=()):
+    """
+    (day, product id) rows the given orders count towards: one per product
+    on each order, plus `product_ids` (e.g. a removed item's product) on
+    each order's day.
+    """
+    days = {
+        pk: timezone.localdate(date_ordered)
+        for pk, date_ordered in Order.objects.filter(id__in=order_ids).values_list('id', 'date_ordered')
+    }
+    items = OrderItem.objects.filter(order_id__in=days, product__isnull=False).values_list('order_id', 'product_id')
+    keys = {(days[order_id], product_id) for order_id, product_id in items}
+    keys.update((day, product_id) for day in days.values() for product_id in product_ids if product_id)
+    return keys
+
+
+def refresh_product_sales(keys):
+    """Recompute the given (day, product id) rows of the product sales rollup, one query per day"""
+    by_day = {}
+    for day, product_id in keys:
+        by_day.setdefault(day, set()).add(product_id)
+
+    for day, product_ids in by_day.items():
+        start, end = day_bounds(day)
+        rows = _sales_totals(_sold_items().filter(
+            order__date_ordered__gte=start, order__date_ordered__lt=end, product_id__in=product_ids,
+        ).values('product_id'))
+        sales = [
+            DailyProductSales(
+                date=day, product_id=row['product_id'], units=max(row['units_sold'] or 0, 0),
+                revenue=row['line_revenue'] or 0, order_count=row['orders'],
+            )
+            for row in rows
+        ]
+        if sales:
+            DailyProductSales.objects.bulk_create(
+                sales, update_conflicts=True, unique_fields=['date', 'product'],
+                update_fields=['units', 'revenue', 'order_count', 'updated_at'],
+            )
+        stale = product_ids - {row.product_id for row in sales}
+        if stale:
+            DailyProductSales.objects.filter(date=day, product_id__in=stale).delete()
+
+
+def refresh_product_sales_for_orders(order_ids, product_ids=()):
+    """Refresh every product sales row the given orders count towards"""
+    refresh_product_sales(product_sales_keys(order_ids, product_ids))
+
+
+@transaction.atomic
+def rebuild_product_sales(days=None):
+    """Rebuild the product sales rollup from order items, for the last `days` days or all history"""
+    items = _sold_items()
+    existing = DailyProductSales.objects.all()
+    if days:
+        since = timezone.localdate() - timedelta(days=days - 1)
+        items = items.filter(order__date_ordered__gte=day_bounds(since)[0])
+        existing = existing.filter(date__gte=since)
+
+    rows = _sales_totals(items.annotate(day=TruncDate('order__date_ordered')).values('day', 'product_id'))
+    existing.delete()
+    sales = DailyProductSales.objects.bulk_create([
+        DailyProductSales(
+            date=row['day'], product_id=row['product_id'], units=max(row['units_sold'] or 0, 0),
+            revenue=row['line_revenue'] or 0, order_count=row['orders'],
+        )
+        for row in rows
+    ], batch_size=1000)
+    return len(sales)
+
+
+@transaction.atomic
+def rebuild_days(days):
+    """Recompute every order metrics and product sales row of whole days, one day at a time"""
+    for day in sorted(days):
+        start, end = day_bounds(day)
+        metrics = Order.objects.filter(date_ordered__gte=start, date_ordered__lt=end).order_by().annotate(
+            order_revenue=order_revenue()
+        ).values('order_type', 'order_status').annotate(
+            order_count=Count('id'),
+            revenue=Sum('order_revenue'),
+        )
+        sales = _sales_totals(_sold_items().filter(
+            order__date_ordered__gte=start, order__date_ordered__lt=end,
+        ).values('product_id'))
+
+        DailyOrderMetrics.objects.filter(date=day).delete()
+        DailyOrderMetrics.objects.bulk_create([
+            DailyOrderMetrics(
+                date=day, order_type=row['order_type'], order_status=row['order_status'],
+                order_count=row['order_count'], revenue=row['revenue'] or 0,
+            )
+            for row in metrics
+        ])
+        DailyProductSales.objects.filter(date=day).delete()
+        DailyProductSales.objects.bulk_create([
+            DailyProductSales(
+                date=day, product_id=row['product_id'], units=max(row['units_sold'] or 0, 0),
+                revenue=row['line_revenue'] or 0, order_count=row['orders'],
+            )
+            for row in sales
+        ], batch_size=1000)
+
+
+def catch_up_rollups(since):
+    """
+    Bring stored order totals and both rollups up to date with every order
+    changed since `since`, whoever wrote it.
+
+    The signals only see writes made by this process; the storefront and
+    bulk paths write orders and items around them. Orders are found through
+    the updated_at index, their totals are repaired as sync_order_totals
+    does, and every day they fall on is rebuilt whole so rows of statuses
+    an order left are corrected too. Returns (orders checked, days rebuilt).
+    """
+    orders = list(Order.objects.filter(updated_at__gte=since).only(
+        'pk', 'date_ordered', 'total_amount', 'item_count'
+    ))
+    fixes = find_total_drift(orders)
+    days = {timezone.localdate(order.date_ordered) for order in orders}
+    with transaction.atomic():
+        if fixes:
+            Order.objects.bulk_update(fixes, ['total_amount', 'item_count', 'updated_at'], batch_size=500)
+        rebuild_days(days)
+    if days:
+        publish_resync()
+    return len(orders), len(days)
+
+
+def refresh_best_sellers(days=None, top=None):
+    """
+    Flag the `top` products with the most units sold in the last `days`
+    days as best sellers and clear the flag everywhere else.
+
+    Returns (flagged, unflagged) counts.
+    """
+    days = days or settings.BEST_SELLER_DAYS
+    top = top or settings.BEST_SELLER_COUNT
+    ranked = [row['product_id'] for row in sales_ranking(days, 'units')[:top]]
+    now = timezone.now()
+    with transaction.atomic():
+        unflagged = Product.objects.filter(is_best_seller=True).exclude(id__in=ranked).update(
+            is_best_seller=False, updated_at=now
+        )
+        flagged = Product.objects.filter(id__in=ranked, is_best_seller=False).update(
+            is_best_seller=True, updated_at=now
+        )
+    if flagged or unflagged:
+        bump_versions_on_commit(Product)
+    return flagged, unflagged
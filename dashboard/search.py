@@ -0,0 +1,121 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+
+PRODUCT_TABLE = 'Radhirra_product'
+FTS_TABLE = 'Radhirra_product_search'
+
+# SQLite rebuilds tables for many schema changes, which drops their triggers,
+# so repair_search re-creates them after migrate (see signals.py). The index
+# itself is created by migration 0009.
+SQLITE_TRIGGERS = {
+    'product_search_insert': f"""
+    CREATE TRIGGER IF NOT EXISTS product_search_insert AFTER INSERT ON "{PRODUCT_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+    'product_search_delete': f"""
+    CREATE TRIGGER IF NOT EXISTS product_search_delete AFTER DELETE ON "{PRODUCT_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+    END
+    """,
+    'product_search_update': f"""
+    CREATE TRIGGER IF NOT EXISTS product_search_update AFTER UPDATE ON "{PRODUCT_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO "{FTS_TABLE}"(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+}
+SQLITE_REBUILD = f"""INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES ('rebuild')"""
+
+
+def repair_search(db_connection):
+    """
+    Restore SQLite search triggers that a table rebuild dropped, and reindex
+    the products written while they were missing. Does nothing while the
+    triggers are intact, so a migrate does not rebuild the index every time.
+    """
+    if db_connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE not in db_connection.introspection.table_names():
+        return
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [PRODUCT_TABLE]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [sql for name, sql in SQLITE_TRIGGERS.items() if name not in existing]
+        if not missing:
+            return
+        for statement in missing:
+            cursor.execute(statement)
+        cursor.execute(SQLITE_REBUILD)
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text.lower())
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """
+    Ranked, prefix-matching product search on the database's full-text index.
+
+    A term that exactly matches a SKU returns that product straight from the
+    unique SKU index. Results are ordered by relevance unless ?ordering is
+    given, so this backend must run after OrderingFilter.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+
+        sku_match = queryset.filter(sku=text)
+        if sku_match.exists():
+            return sku_match
+
+        if connection.vendor == 'postgresql':
+            queryset = self.postgres_search(queryset, terms)
+        elif connection.vendor == 'sqlite':
+            queryset = self.sqlite_search(queryset, terms)
+        else:
+            for term in terms:
+                queryset = queryset.filter(name__icontains=term)
+            return queryset
+
+        if self.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', '-id')
+        return queryset
+
+    def postgres_search(self, queryset, terms):
+        query = ' & '.join(f'{term}:*' for term in terms)
+        vector = f'"{PRODUCT_TABLE}"."search_vector"'
+        return queryset.filter(
+            RawSQL(f"{vector} @@ to_tsquery('simple', %s)", [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"ts_rank({vector}, to_tsquery('simple', %s))", [query], output_field=FloatField())
+        )
+
+    def sqlite_search(self, queryset, terms):
+        query = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(RawSQL(
+            f'"{PRODUCT_TABLE}"."id" IN (SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s)',
+            [query], output_field=BooleanField()
+        )).annotate(search_rank=RawSQL(
+            # bm25 scores better matches lower; negate so higher ranks sort first like ts_rank
+            f'(SELECT -bm25("{FTS_TABLE}", 10.0, 10.0, 1.0) FROM "{FTS_TABLE}" '
+            f'WHERE "{FTS_TABLE}" MATCH %s AND rowid = "{PRODUCT_TABLE}"."id")',
+            [query], output_field=FloatField()
+        ))
@@ -0,0 +1,311 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+
+from .models import (
+    CustomUser, UserProfile, Category, Product, ProductImage,
+    Order, OrderItem, ShippingAddress, Cart, CartItem, Review
+)
+from .response_cache import bump_versions
+from .rollups import rebuild_daily_metrics, rebuild_product_sales
+from .segments import score_customers
+
+
+CITIES = [
+    ('Mumbai', 'Maharashtra'), ('Pune', 'Maharashtra'), ('Delhi', 'Delhi'),
+    ('Bengaluru', 'Karnataka'), ('Chennai', 'Tamil Nadu'), ('Kolkata', 'West Bengal'),
+    ('Hyderabad', 'Telangana'), ('Jaipur', 'Rajasthan'), ('Ahmedabad', 'Gujarat'),
+    ('Lucknow', 'Uttar Pradesh'),
+]
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Ananya', 'Vihaan', 'Saanvi', 'Arjun', 'Meera', 'Kabir', 'Radha']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Gupta', 'Reddy', 'Das', 'Nair', 'Joshi', 'Mehta', 'Rao']
+CATEGORY_NAMES = ['Sarees', 'Kurtas', 'Lehengas', 'Dupattas', 'Salwar Suits', 'Blouses', 'Gowns', 'Jewellery']
+MATERIALS = ['Cotton', 'Silk', 'Linen', 'Georgette', 'Chiffon', 'Rayon']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+SLEEVES = ['Full', 'Half', 'Sleeveless', 'Three Quarter']
+
+# Older orders have mostly been resolved; recent ones are still in flight
+RECENT_STATUS_WEIGHTS = {'pending': 30, 'confirmed': 25, 'completed': 35, 'cancelled': 10}
+SETTLED_STATUS_WEIGHTS = {'pending': 2, 'confirmed': 6, 'completed': 80, 'cancelled': 12}
+ITEMS_PER_ORDER_WEIGHTS = [50, 25, 13, 8, 4]
+RATING_WEIGHTS = {5: 45, 4: 30, 3: 12, 2: 6, 1: 7}
+# Seeded dates count back from here, so a seed gives the same rows on any day
+DEFAULT_ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def zipf_weights(count, exponent):
+    """Cumulative weights where the item at rank n is picked ~1/n**exponent often"""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+@contextmanager
+def manual_timestamps(*fields):
+    """Let bulk_create keep explicitly set auto_now/auto_now_add values"""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class DatasetSeeder:
+    """
+    Generates a large, skewed but deterministic dataset with batched bulk_create.
+
+    Given the same seed, anchor and starting database, two runs produce the
+    same rows. Dates fall in the `days` before `anchor`; pass the current time
+    for a dataset that looks live. Signals do not fire for bulk inserts, so
+    stored order totals are computed here and the rollups are rebuilt once at
+    the end.
+    """
+
+    def __init__(self, seed=None, batch_size=2000, days=365, anchor=DEFAULT_ANCHOR, log=None):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.now = anchor
+
+    def run(self, categories=8, products=500, customers=1000, orders=5000, reviews=2000, carts=500):
+        timestamp_fields = [
+            Order._meta.get_field('date_ordered'), Order._meta.get_field('updated_at'),
+            OrderItem._meta.get_field('date_added'), ShippingAddress._meta.get_field('date_added'),
+            Review._meta.get_field('created_at'), Cart._meta.get_field('created_at'),
+            Category._meta.get_field('created_at'),
+        ]
+        with manual_timestamps(*timestamp_fields):
+            category_ids = self.create_categories(categories)
+            self.products = self.create_products(products, category_ids)
+            self.customer_ids = self.create_customers(customers)
+            # Popularity ranks are shuffled so best sellers are spread across the catalog
+            self.random.shuffle(self.products)
+            self.product_weights = zipf_weights(len(self.products), 1.1)
+            self.customer_weights = zipf_weights(len(self.customer_ids), 0.8)
+            self.create_orders(orders)
+            self.create_reviews(reviews)
+            self.create_carts(carts)
+        self.rebuild_aggregates()
+
+    def rebuild_aggregates(self):
+        rebuild_daily_metrics()
+        rebuild_product_sales()
+        score_customers(now=self.now)
+        self.log('Rebuilt order and product sales rollups and customer scores')
+        bump_versions(Category, Product, ProductImage)
+
+    def random_past(self, max_days=None):
+        # Squaring skews towards recent dates, like a growing store
+        days_ago = (max_days or self.days) * self.random.random() ** 2
+        return self.now - timedelta(days=days_ago)
+
+    def next_offset(self, model):
+        return model.objects.aggregate(Max('id'))['id__max'] or 0
+
+    def bulk_create(self, model, objects):
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(objects[start:start + self.batch_size]))
+        return created
+
+    def create_categories(self, count):
+        offset = self.next_offset(Category)
+        categories = self.bulk_create(Category, [
+            Category(
+                name=f'{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {offset + i + 1}',
+                slug=f'category-{offset + i + 1}',
+                created_at=self.random_past(),
+            )
+            for i in range(count)
+        ])
+        self.log(f'Created {len(categories)} categories')
+        return [category.id for category in categories]
+
+    def create_products(self, count, category_ids):
+        offset = self.next_offset(Product)
+        products, images = [], []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start, min(start + self.batch_size, count)):
+                regular_price = Decimal(self.random.randrange(499, 25000, 50))
+                on_sale = self.random.random() < 0.35
+                batch.append(Product(
+                    name=f'{self.random.choice(MATERIALS)} {self.random.choice(CATEGORY_NAMES)} {offset + i + 1}',
+                    sku=f'SKU-{offset + i + 1:07d}',
+                    regular_price=regular_price,
+                    sale_price=(regular_price * Decimal(self.random.choice(['0.9', '0.8', '0.7']))).quantize(Decimal('1'))
+                    if on_sale else None,
+                    description='Handcrafted ethnic wear. ' * self.random.randint(1, 6),
+                    size=self.random.choice(SIZES),
+                    material=self.random.choice(MATERIALS),
+                    sleeve=self.random.choice(SLEEVES),
+                    category_id=self.random.choice(category_ids) if category_ids else None,
+                    is_featured=self.random.random() < 0.05,
+                    is_new_arrival=self.random.random() < 0.1,
+                    status=self.random.choices(['active', 'inactive', 'draft'], [90, 6, 4])[0],
+                ))
+            with transaction.atomic():
+                batch = Product.objects.bulk_create(batch)
+            for product in batch:
+                for n in range(self.random.randint(1, 4)):
+                    images.append(ProductImage(
+                        product=product,
+                        image=f'https://res.cloudinary.com/demo/image/upload/products/{product.sku}-{n}.jpg',
+                        is_main=n == 0,
+                    ))
+            products.extend((product.id, product.sale_price or product.regular_price) for product in batch)
+        self.bulk_create(ProductImage, images)
+        self.log(f'Created {len(products)} products with {len(images)} images')
+        return products
+
+    def create_customers(self, count):
+        offset = self.next_offset(CustomUser)
+        password = make_password('password')
+        customer_ids = []
+        for start in range(0, count, self.batch_size):
+            users = []
+            for i in range(start, min(start + self.batch_size, count)):
+                number = offset + i + 1
+                users.append(CustomUser(
+                    username=f'customer{number}',
+                    email=f'customer{number}@example.com',
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    password=password,
+                    date_joined=self.random_past(self.days * 2),
+                ))
+            with transaction.atomic():
+                users = CustomUser.objects.bulk_create(users)
+                UserProfile.objects.bulk_create([self.profile_for(user) for user in users])
+            customer_ids.extend(user.id for user in users)
+        self.log(f'Created {len(customer_ids)} customers with profiles')
+        return customer_ids
+
+    def profile_for(self, user):
+        city, state = self.random.choice(CITIES)
+        return UserProfile(
+            user=user,
+            phone=f'9{self.random.randrange(10 ** 8, 10 ** 9)}',
+            address=f'{self.random.randint(1, 999)} Main Road',
+            city=city,
+            state=state,
+            zipcode=str(self.random.randrange(110000, 860000)),
+            gender=self.random.choice(['male', 'female']),
+        )
+
+    def pick_customer(self):
+        if not self.customer_ids or self.random.random() < 0.1:
+            return None
+        return self.random.choices(self.customer_ids, cum_weights=self.customer_weights)[0]
+
+    def create_orders(self, count):
+        created_items = 0
+        for start in range(0, count, self.batch_size):
+            batch_size = min(self.batch_size, count - start)
+            orders, order_lines = [], []
+            for _ in range(batch_size):
+                date_ordered = self.random_past()
+                recent = self.now - date_ordered < timedelta(days=14)
+                weights = RECENT_STATUS_WEIGHTS if recent else SETTLED_STATUS_WEIGHTS
+                status = self.random.choices(list(weights), list(weights.values()))[0]
+                lines = []
+                if self.products:
+                    line_count = self.random.choices(range(1, 6), ITEMS_PER_ORDER_WEIGHTS)[0]
+                    picks = self.random.choices(self.products, cum_weights=self.product_weights, k=line_count)
+                    lines = [(product_id, price, self.random.choices([1, 2, 3], [75, 20, 5])[0])
+                             for product_id, price in picks]
+                order_type = 'whatsapp' if self.random.random() < 0.7 else 'email'
+                orders.append(Order(
+                    user_id=self.pick_customer(),
+                    date_ordered=date_ordered,
+                    updated_at=date_ordered,
+                    complete=status == 'completed',
+                    transaction_id=f'ORD-{self.random.getrandbits(48):012x}',
+                    order_type=order_type,
+                    order_status=status,
+                    total_amount=sum(price * quantity for _, price, quantity in lines),
+                    item_count=sum(quantity for _, _, quantity in lines),
+                    contact_value=f'9{self.random.randrange(10 ** 8, 10 ** 9)}' if order_type == 'whatsapp'
+                    else f'buyer{self.random.randrange(10 ** 6)}@example.com',
+                ))
+                order_lines.append(lines)
+
+            with transaction.atomic():
+                orders = Order.objects.bulk_create(orders)
+                items, addresses = [], []
+                for order, lines in zip(orders, order_lines):
+                    for product_id, price, quantity in lines:
+                        items.append(OrderItem(
+                            order=order, product_id=product_id, quantity=quantity,
+                            price_at_order=price, date_added=order.date_ordered,
+                        ))
+                    city, state = self.random.choice(CITIES)
+                    addresses.append(ShippingAddress(
+                        user_id=order.user_id, order=order,
+                        address=f'{self.random.randint(1, 999)} Market Street',
+                        city=city, state=state, zipcode=str(self.random.randrange(110000, 860000)),
+                        phone_number=order.contact_value if order.order_type == 'whatsapp' else None,
+                        date_added=order.date_ordered,
+                    ))
+                OrderItem.objects.bulk_create(items)
+                ShippingAddress.objects.bulk_create(addresses)
+            created_items += len(items)
+            self.log(f'Created {start + batch_size}/{count} orders')
+        self.log(f'Created {count} orders with {created_items} items')
+
+    def create_reviews(self, count):
+        if not self.products or not self.customer_ids:
+            return
+        count = min(count, len(self.products) * len(self.customer_ids))
+        existing = set(Review.objects.values_list('product_id', 'user_id'))
+        seen, reviews = set(), []
+        attempts = 0
+        while len(seen) < count and attempts < count * 3:
+            attempts += 1
+            product_id = self.random.choices(self.products, cum_weights=self.product_weights)[0][0]
+            user_id = self.random.choices(self.customer_ids, cum_weights=self.customer_weights)[0]
+            pair = (product_id, user_id)
+            if pair in seen or pair in existing:
+                continue
+            seen.add(pair)
+            reviews.append(Review(
+                product_id=product_id,
+                user_id=user_id,
+                rating=self.random.choices(list(RATING_WEIGHTS), list(RATING_WEIGHTS.values()))[0],
+                comment='Lovely fabric and fit.' if self.random.random() < 0.7 else 'Colour differs from the photo.',
+                created_at=self.random_past(),
+            ))
+        self.bulk_create(Review, reviews)
+        self.log(f'Created {len(reviews)} reviews')
+
+    def create_carts(self, count):
+        if not self.products:
+            return
+        carts = self.bulk_create(Cart, [
+            Cart(
+                user_id=self.pick_customer(),
+                session_key=f'{self.random.getrandbits(128):032x}',
+                created_at=self.random_past(30),
+            )
+            for _ in range(count)
+        ])
+        items = []
+        for cart in carts:
+            for product_id, _ in self.random.choices(
+                self.products, cum_weights=self.product_weights, k=self.random.randint(1, 4)
+            ):
+                items.append(CartItem(
+                    cart=cart, product_id=product_id, quantity=self.random.randint(1, 3),
+                    size=self.random.choice(SIZES),
+                ))
+        self.bulk_create(CartItem, items)
+        self.log(f'Created {len(carts)} carts with {len(items)} items')
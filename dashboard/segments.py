@@ -0,0 +1,145 @@
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from .metrics import order_revenue
+from .models import CustomerStats, CustomUser
+
+
+BATCH_SIZE = 1000
+
+# Segment of a customer from their recency and frequency scores; the first
+# matching rule wins and customers matching none have lapsed
+SEGMENT_RULES = [
+    ('champion', lambda r, f: (r >= 4) & (f >= 4)),
+    ('loyal', lambda r, f: (r >= 3) & (f >= 3)),
+    ('new', lambda r, f: r >= 4),
+    ('needs_attention', lambda r, f: r >= 3),
+    ('at_risk', lambda r, f: f >= 3),
+]
+
+
+def customer_aggregates():
+    """
+    (id, orders, completed orders, completed revenue, first order, last order)
+    for every customer, in one grouped query. Cancelled orders are left
+    out; customers without orders come back with zeros and no dates.
+    """
+    placed = ~Q(order__order_status='cancelled')
+    completed = Q(order__order_status='completed')
+    return CustomUser.objects.filter(is_staff=False).order_by().values_list('id').annotate(
+        order_count=Count('order', filter=placed),
+        completed_orders=Count('order', filter=completed),
+        total_spent=Sum(order_revenue('order__'), filter=completed),
+        first_order_at=Min('order__date_ordered', filter=placed),
+        last_order_at=Max('order__date_ordered', filter=placed),
+    ).values_list('id', 'order_count', 'completed_orders', 'total_spent', 'first_order_at', 'last_order_at')
+
+
+def quintile_scores(values):
+    """
+    1-5 from the share of values strictly below each value. Tied values share
+    a score, so the many single-order customers all score 1 on frequency.
+    """
+    below = np.searchsorted(np.sort(values), values, side='left')
+    return np.minimum(1 + 5 * below // len(values), 5)
+
+
+def score_rows(rows, now=None):
+    """
+    Recency, frequency and monetary scores, segments and lifetime values of
+    aggregate rows, as arrays over the whole customer base.
+
+    Scores rank customers who have placed an order against each other on
+    days since their last order, orders placed and completed revenue.
+    Lifetime value is completed revenue so far plus the average completed
+    order value at the customer's yearly order rate for CUSTOMER_LTV_YEARS
+    more years, scaled down linearly to nothing CUSTOMER_LAPSE_DAYS after
+    the last order.
+    """
+    now = now or timezone.now()
+    count = len(rows)
+    orders = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+    completed = np.fromiter((row[2] for row in rows), dtype=np.int64, count=count)
+    spent = np.fromiter((row[3] or 0 for row in rows), dtype=np.float64, count=count)
+    first_age = np.fromiter(
+        ((now - row[4]).total_seconds() / 86400 if row[4] else np.nan for row in rows), dtype=np.float64, count=count
+    )
+    last_age = np.fromiter(
+        ((now - row[5]).total_seconds() / 86400 if row[5] else np.nan for row in rows), dtype=np.float64, count=count
+    )
+
+    buyers = orders > 0
+    recency = np.zeros(count, dtype=np.int64)
+    frequency = np.zeros(count, dtype=np.int64)
+    monetary = np.zeros(count, dtype=np.int64)
+    segments = np.full(count, 'prospect', dtype=object)
+    if buyers.any():
+        recency[buyers] = quintile_scores(-last_age[buyers])
+        frequency[buyers] = quintile_scores(orders[buyers])
+        monetary[buyers] = quintile_scores(spent[buyers])
+        r, f = recency[buyers], frequency[buyers]
+        segments[buyers] = np.select(
+            [rule(r, f) for _, rule in SEGMENT_RULES], [name for name, _ in SEGMENT_RULES], default='lapsed'
+        )
+
+    tenure_years = np.maximum(np.nan_to_num(first_age), settings.CUSTOMER_MIN_TENURE_DAYS) / 365
+    average_order = np.divide(spent, completed, out=np.zeros(count), where=completed > 0)
+    activity = np.clip(1 - np.nan_to_num(last_age, nan=np.inf) / settings.CUSTOMER_LAPSE_DAYS, 0, 1)
+    lifetime_value = spent + average_order * (completed / tenure_years) * settings.CUSTOMER_LTV_YEARS * activity
+
+    return {
+        'recency_days': np.floor(np.nan_to_num(last_age)).astype(np.int64),
+        'recency_score': recency,
+        'frequency_score': frequency,
+        'monetary_score': monetary,
+        'segment': segments,
+        'lifetime_value': np.round(lifetime_value, 2),
+    }
+
+
+@transaction.atomic
+def score_customers(now=None):
+    """
+    Rewrite every customer's CustomerStats row from their order history.
+    Returns the number of customers per segment.
+    """
+    rows = list(customer_aggregates())
+    scores = score_rows(rows, now)
+
+    stats = [
+        CustomerStats(
+            user_id=user_id,
+            order_count=order_count,
+            completed_orders=completed_orders,
+            total_spent=total_spent or 0,
+            first_order_at=first_order_at,
+            last_order_at=last_order_at,
+            recency_days=int(scores['recency_days'][index]) if order_count else None,
+            recency_score=int(scores['recency_score'][index]),
+            frequency_score=int(scores['frequency_score'][index]),
+            monetary_score=int(scores['monetary_score'][index]),
+            segment=scores['segment'][index],
+            lifetime_value=Decimal(f'{scores["lifetime_value"][index]:.2f}'),
+        )
+        for index, (user_id, order_count, completed_orders, total_spent, first_order_at, last_order_at)
+        in enumerate(rows)
+    ]
+    CustomerStats.objects.bulk_create(
+        stats,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=[
+            field.name for field in CustomerStats._meta.concrete_fields if field.name != 'user'
+        ],
+    )
+    # Customers who became staff are no longer scored
+    CustomerStats.objects.filter(user__is_staff=True).delete()
+
+    names, counts = np.unique(scores['segment'].astype(str), return_counts=True)
+    return dict(zip(names.tolist(), counts.tolist()))
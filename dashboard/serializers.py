@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from .image_variants import image_srcset
 from .models import (
     CustomUser, UserProfile, Category, Product, ProductImage,
-    Order, OrderItem, ShippingAddress, Cart, CartItem, Review
+    Order, OrderItem, ShippingAddress, Cart, CartItem, Review, CustomerStats
 )
 
 
@@ -21,6 +24,23 @@ class CustomUserSerializer(serializers.ModelSerializer):
         extra_kwargs = {'password': {'write_only': True}}
 
 
+class CustomerStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomerStats
+        exclude = ['user']
+
+
+class CustomerSerializer(CustomUserSerializer):
+    """Customer with live order figures, annotated by metrics.customer_order_totals"""
+    order_count = serializers.IntegerField(read_only=True)
+    total_spent = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    last_order_at = serializers.DateTimeField(read_only=True)
+    stats = CustomerStatsSerializer(read_only=True)
+
+    class Meta(CustomUserSerializer.Meta):
+        fields = CustomUserSerializer.Meta.fields + ['order_count', 'total_spent', 'last_order_at', 'stats']
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -37,6 +57,7 @@ class ProductSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     discount_percentage = serializers.ReadOnlyField()
     main_image_url = serializers.SerializerMethodField()
+    main_image_srcset = serializers.SerializerMethodField()
     images = ProductImageSerializer(source='productimage_set', many=True, read_only=True)
     
     class Meta:
@@ -59,6 +80,10 @@ class ProductSerializer(serializers.ModelSerializer):
         if main_image and main_image.image:
             return main_image.image  # Direct URL
         return "https://placehold.co/300x300/1a1a1f/6b7280?text=No+Image"
+    
+    def get_main_image_srcset(self, obj):
+        main_image = obj.main_image
+        return image_srcset(main_image) if main_image else {}
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -82,8 +107,8 @@ class OrderSerializer(serializers.ModelSerializer):
     customer_email = serializers.CharField(source='user.email', read_only=True)
     items = OrderItemSerializer(source='orderitem_set', many=True, read_only=True)
     shipping_address = ShippingAddressSerializer(source='shippingaddress_set', many=True, read_only=True)
-    get_cart_total = serializers.ReadOnlyField()
-    get_cart_items = serializers.ReadOnlyField()
+    get_cart_total = serializers.DecimalField(source='order_total', max_digits=10, decimal_places=2, read_only=True)
+    get_cart_items = serializers.IntegerField(source='order_item_count', read_only=True)
     user_id = serializers.IntegerField(source='user.id', read_only=True)
     
     class Meta:
@@ -124,10 +149,95 @@ class ReviewSerializer(serializers.ModelSerializer):
 
 # Admin-specific serializers for bulk operations
 class ProductBulkUpdateSerializer(serializers.Serializer):
-    ids = serializers.ListField(child=serializers.IntegerField())
+    """
+    Changes applied to every product in `ids`, plus optional per-product
+    sale prices in `sale_prices` ({id: price or null}). At most one of
+    sale_price, markdown_percent and sale_prices may be given.
+    """
+    PRICE_SOURCES = ('sale_price', 'markdown_percent', 'sale_prices')
+    
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
     is_featured = serializers.BooleanField(required=False)
     is_new_arrival = serializers.BooleanField(required=False)
     is_best_seller = serializers.BooleanField(required=False)
+    status = serializers.ChoiceField(choices=Product.STATUS_CHOICES, required=False)
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False, allow_null=True)
+    regular_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False)
+    sale_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False, allow_null=True
+    )
+    markdown_percent = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=Decimal('0.01'), max_value=Decimal('99.99'), required=False
+    )
+    sale_prices = serializers.DictField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), allow_null=True),
+        required=False
+    )
+    
+    def validate_sale_prices(self, value):
+        try:
+            return {int(pk): price for pk, price in value.items()}
+        except ValueError:
+            raise serializers.ValidationError('Keys must be product ids.')
+    
+    def validate(self, data):
+        if len([field for field in self.PRICE_SOURCES if field in data]) > 1:
+            raise serializers.ValidationError('Use only one of sale_price, markdown_percent and sale_prices.')
+        changes = set(data) - {'ids', 'sale_prices'}
+        if changes and not data['ids']:
+            # Would otherwise be dropped silently while sale_prices still applies
+            raise serializers.ValidationError({'ids': 'Give the products the other changes apply to.'})
+        if not data.get('sale_prices') and not changes:
+            raise serializers.ValidationError('Nothing to update.')
+        return data
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """
+    One row of a product import, keyed on sku.
+
+    Blank cells clear nullable fields and leave the others untouched.
+    `category` is a category slug, resolved through context['categories'].
+    Name and regular price are only required when the sku is new, which
+    the importer checks once it knows which skus already exist.
+    """
+    category = serializers.CharField(required=False, allow_null=True)
+    
+    class Meta:
+        model = Product
+        fields = [
+            'sku', 'name', 'regular_price', 'sale_price', 'description', 'size', 'material',
+            'specifications', 'seller_information', 'category', 'sleeve',
+            'is_featured', 'is_new_arrival', 'is_best_seller', 'status',
+        ]
+        extra_kwargs = {
+            'sku': {'required': True, 'allow_null': False, 'allow_blank': False, 'validators': []},
+            'name': {'required': False},
+            'regular_price': {'required': False},
+        }
+    
+    def to_internal_value(self, data):
+        row = {}
+        for key, value in data.items():
+            field = self.fields.get(key)
+            if field is None:
+                continue  # Unknown columns, e.g. the id of an exported file
+            if isinstance(value, str):
+                value = value.strip()
+            if value in ('', None):
+                if not field.allow_null:
+                    continue
+                value = None
+            row[key] = value
+        return super().to_internal_value(row)
+    
+    def validate_category(self, value):
+        if value is None:
+            return None
+        try:
+            return self.context['categories'][value]
+        except KeyError:
+            raise serializers.ValidationError(f'Unknown category "{value}".')
 
 
 class OrderStatusUpdateSerializer(serializers.Serializer):
@@ -136,4 +246,8 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
         ('confirmed', 'Confirmed'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled')
-    ])
\ No newline at end of file
+    ])
+
+
+class OrderBatchStatusSerializer(OrderStatusUpdateSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=5000)
@@ -0,0 +1,134 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, CustomerStats, CustomUser, Order, OrderItem, Product, ProductImage, ShippingAddress
+from .live import publish_order_change, publish_resync
+from .order_totals import sync_order_totals
+from .response_cache import bump_versions_on_commit
+from .rollups import (
+    metrics_key, product_sales_keys, refresh_daily_metrics, refresh_metrics_for_orders,
+    refresh_product_sales, refresh_product_sales_for_orders,
+)
+from .search import repair_search
+
+
+def _order_state(order):
+    if order.date_ordered is None:
+        return None
+    return metrics_key(order.date_ordered, order.order_type, order.order_status)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_state(sender, instance, **kwargs):
+    # Read through __dict__ so deferred fields are not loaded one query at a time
+    values = instance.__dict__
+    instance._metrics_state = tuple(values.get(name) for name in ('date_ordered', 'order_type', 'order_status'))
+
+
+@receiver(post_save, sender=Order)
+def update_metrics_on_order_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    keys = {_order_state(instance)}
+    previous = getattr(instance, '_metrics_state', None)
+    if previous and None not in previous:
+        keys.add(metrics_key(*previous))
+    for key in keys - {None}:
+        refresh_daily_metrics(*key)
+    # Cancelling or restoring an order, or moving it to another day, changes its products' daily sales
+    if previous and not created and None not in previous and (
+        (previous[2] == 'cancelled') != (instance.order_status == 'cancelled')
+        or previous[0] != instance.date_ordered
+    ):
+        sales_keys = product_sales_keys([instance.pk])
+        sales_keys |= {(metrics_key(*previous)[0], product_id) for _, product_id in sales_keys}
+        refresh_product_sales(sales_keys)
+    publish_order_change(instance, previous[2] if previous else None, created)
+    remember_order_state(sender, instance)
+
+
+@receiver(pre_delete, sender=Order)
+def remember_order_sales(sender, instance, **kwargs):
+    # Its items are detached before post_delete, so collect their rows now
+    instance._sales_keys = product_sales_keys([instance.pk])
+
+
+@receiver(post_delete, sender=Order)
+def update_metrics_on_order_delete(sender, instance, **kwargs):
+    key = _order_state(instance)
+    if key:
+        refresh_daily_metrics(*key)
+    refresh_product_sales(getattr(instance, '_sales_keys', ()))
+    publish_resync()
+
+
+@receiver(post_init, sender=OrderItem)
+def remember_order_item_order(sender, instance, **kwargs):
+    instance._metrics_order_id = instance.__dict__.get('order_id')
+    instance._sales_product_id = instance.__dict__.get('product_id')
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def update_order_on_item_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    order_ids = {instance.order_id, getattr(instance, '_metrics_order_id', None)} - {None}
+    if order_ids:
+        sync_order_totals(order_ids)
+        refresh_metrics_for_orders(order_ids)
+        # The item's products are passed along in case it no longer sits on the order
+        product_ids = {instance.product_id, getattr(instance, '_sales_product_id', None)} - {None}
+        refresh_product_sales_for_orders(order_ids, product_ids)
+        publish_resync()
+    instance._metrics_order_id = instance.order_id
+    instance._sales_product_id = instance.product_id
+
+
+@receiver(post_init, sender=ShippingAddress)
+def remember_address_order(sender, instance, **kwargs):
+    instance._validator_order_id = instance.__dict__.get('order_id')
+
+
+@receiver(post_save, sender=ShippingAddress)
+@receiver(post_delete, sender=ShippingAddress)
+def touch_order_on_address_change(sender, instance, raw=False, **kwargs):
+    # Addresses are nested in order responses, whose validators follow Order.updated_at
+    if raw:
+        return
+    order_ids = {instance.order_id, getattr(instance, '_validator_order_id', None)} - {None}
+    if order_ids:
+        Order.objects.filter(pk__in=order_ids).update(updated_at=timezone.now())
+    instance._validator_order_id = instance.order_id
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_customer_names(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Logins only stamp last_login, which no response shows
+    if not raw and update_fields != frozenset({'last_login'}):
+        bump_versions_on_commit(CustomUser)
+
+
+@receiver(post_save, sender=CustomUser)
+def create_customer_stats(sender, instance, created=False, raw=False, **kwargs):
+    # New customers sort and filter as prospects until score_customers next runs
+    if created and not raw and not instance.is_staff:
+        CustomerStats.objects.create(user=instance)
+
+
+@receiver(post_migrate)
+def repair_product_search(sender, using, **kwargs):
+    if sender.name == 'dashboard':
+        repair_search(connections[using])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_versions_on_commit(sender)
@@ -1,3 +1,1494 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import numpy as np
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .benchmarks import check_budgets, load_budgets, run_benchmarks
+from .image_variants import build_variants
+from .order_totals import find_total_drift
+from .live import event_stream, order_deltas, publisher
+from .models import (
+    CustomUser, Category, Product, ProductImage, Order, OrderItem, ShippingAddress, Review, DailyOrderMetrics,
+    DailyProductSales, CustomerStats,
+)
+from .query_plans import check_query_plans
+from .response_cache import get_cache
+from .rollups import catch_up_rollups, rebuild_daily_metrics, rebuild_product_sales, refresh_daily_metrics
+from .search import repair_search
+from .seeding import DEFAULT_ANCHOR, DatasetSeeder
+from .segments import quintile_scores, score_customers
+
+
+class AdminAPITestCase(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_order(self, status='pending', order_type='whatsapp', total_amount=0, items=()):
+        order = Order.objects.create(
+            order_status=status, order_type=order_type, total_amount=total_amount,
+            complete=status == 'completed'
+        )
+        for product, quantity, price in items:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, price_at_order=price)
+        return order
+
+
+class OrderStatisticsTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Kurta', regular_price=Decimal('500.00'), sale_price=Decimal('400.00'))
+
+    def test_statistics_values(self):
+        self.create_order('completed', total_amount=Decimal('250.00'))
+        self.create_order('completed', items=[(self.product, 2, Decimal('0'))])
+        self.create_order('confirmed', order_type='email', items=[(self.product, 1, Decimal('300.00'))])
+        self.create_order('cancelled', total_amount=Decimal('999.00'))
+
+        data = self.client.get('/api/orders/statistics/').json()
+
+        self.assertEqual(data['total_orders'], 4)
+        self.assertEqual(data['completed_orders'], 2)
+        self.assertEqual(data['confirmed_orders'], 1)
+        self.assertEqual(data['cancelled_orders'], 1)
+        self.assertEqual(data['email_orders'], 1)
+        self.assertEqual(Decimal(data['total_revenue']), Decimal('1050.00'))
+        self.assertEqual(Decimal(data['completed_revenue']), Decimal('1050.00'))
+        self.assertEqual(Decimal(data['pending_revenue']), Decimal('300.00'))
+        self.assertEqual(Decimal(data['today_revenue']), Decimal('1350.00'))
+        self.assertEqual(Decimal(data['average_order_value']), Decimal('525.00'))
+
+    def test_statistics_query_count_is_constant(self):
+        for i in range(3):
+            self.create_order('completed', items=[(self.product, 1, Decimal('0'))])
+        with self.assertNumQueries(1):
+            self.client.get('/api/orders/statistics/')
+
+        for i in range(20):
+            self.create_order('completed', items=[(self.product, i + 1, Decimal('10.00'))])
+        with self.assertNumQueries(1):
+            self.client.get('/api/orders/statistics/')
+
+
+class DailyOrderMetricsTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Saree', regular_price=Decimal('100.00'))
+
+    def rollup(self):
+        return sorted(DailyOrderMetrics.objects.values_list('order_type', 'order_status', 'order_count', 'revenue'))
+
+    def test_hooks_match_rebuild(self):
+        order = self.create_order('pending', items=[(self.product, 2, Decimal('0'))])
+        self.create_order('completed', order_type='email', total_amount=Decimal('80.00'))
+        order.order_status = 'completed'
+        order.save()
+        OrderItem.objects.create(order=order, product=self.product, quantity=1, price_at_order=Decimal('50.00'))
+        self.create_order('pending').delete()
+
+        incremental = self.rollup()
+        rebuild_daily_metrics()
+        self.assertEqual(incremental, self.rollup())
+        self.assertEqual(incremental, [
+            ('email', 'completed', 1, Decimal('80.00')),
+            ('whatsapp', 'completed', 1, Decimal('250.00')),
+        ])
+
+    def test_overview_reads_rollup(self):
+        self.create_order('completed', total_amount=Decimal('120.00'))
+        self.create_order('pending', total_amount=Decimal('30.00'))
+        self.create_order('confirmed', total_amount=Decimal('45.00'))
+        self.create_order('cancelled', total_amount=Decimal('15.00'))
+
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/dashboard/overview/').json()
+        self.assertEqual(data['total_orders'], 4)
+        self.assertEqual(data['completed_orders'], 1)
+        # Same status rule as the order statistics
+        self.assertEqual(data['pending_orders'], 1)
+        self.assertEqual(data['pending_orders'], self.client.get('/api/orders/statistics/').json()['pending_orders'])
+        self.assertEqual(Decimal(data['total_revenue']), Decimal('120.00'))
+
+    def test_refresh_overwrites_rows_written_concurrently(self):
+        order = self.create_order('completed', total_amount=Decimal('120.00'))
+        day = timezone.localdate(order.date_ordered)
+        # Another process wrote the row from an older count, or deleted it
+        DailyOrderMetrics.objects.filter(date=day).update(order_count=5, revenue=Decimal('1.00'))
+        refresh_daily_metrics(day, order.order_type, 'completed')
+        self.assertEqual(self.rollup(), [('whatsapp', 'completed', 1, Decimal('120.00'))])
+
+        DailyOrderMetrics.objects.all().delete()
+        refresh_daily_metrics(day, order.order_type, 'completed')
+        self.assertEqual(self.rollup(), [('whatsapp', 'completed', 1, Decimal('120.00'))])
+
+        refresh_daily_metrics(day, order.order_type, 'pending')
+        self.assertEqual(self.rollup(), [('whatsapp', 'completed', 1, Decimal('120.00'))])
+
+
+class RollupCatchUpTests(AdminAPITestCase):
+    def rollups(self):
+        return (
+            sorted(DailyOrderMetrics.objects.values_list('date', 'order_type', 'order_status', 'order_count', 'revenue')),
+            sorted(DailyProductSales.objects.values_list('date', 'product_id', 'units', 'revenue', 'order_count')),
+        )
+
+    def test_catches_up_with_writes_around_the_signals(self):
+        get_cache().clear()
+        product = Product.objects.create(name='Saree', regular_price=Decimal('100.00'))
+        earlier = timezone.now() - timedelta(days=2)
+        kept = self.create_order('completed', items=[(product, 1, Decimal('0'))])
+        Order.objects.filter(pk=kept.pk).update(date_ordered=earlier)
+        rebuild_daily_metrics()
+        rebuild_product_sales()
+        before = self.client.get('/api/dashboard/revenue/', {'periods': 3}).json()['results']
+        self.assertEqual(Decimal(before[0]['revenue']), Decimal('100.00'))
+
+        # Storefront-style writes: no model signals fire
+        since = timezone.now()
+        placed = Order.objects.bulk_create([Order(order_status='completed', complete=True)])[0]
+        OrderItem.objects.bulk_create([OrderItem(order=placed, product=product, quantity=3, price_at_order=0)])
+        Order.objects.filter(pk=kept.pk).update(order_status='cancelled', updated_at=timezone.now())
+
+        self.assertEqual(catch_up_rollups(since), (2, 2))
+        self.assertEqual(Order.objects.get(pk=placed.pk).total_amount, Decimal('300.00'))
+        caught_up = self.rollups()
+        rebuild_daily_metrics()
+        rebuild_product_sales()
+        self.assertEqual(caught_up, self.rollups())
+        self.assertEqual(
+            [(row[1], row[2], row[3]) for row in caught_up[0]],
+            [('whatsapp', 'cancelled', 1), ('whatsapp', 'completed', 1)],
+        )
+
+        after = self.client.get('/api/dashboard/revenue/', {'periods': 3}).json()['results']
+        self.assertEqual(Decimal(after[0]['revenue']), Decimal('0.00'))
+        self.assertEqual(Decimal(after[-1]['revenue']), Decimal('300.00'))
+
+        out = StringIO()
+        call_command('catch_up_rollups', minutes=5, stdout=out)
+        self.assertIn('rebuilt 2 days', out.getvalue())
+
+
+class OrderTotalsTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Lehenga', regular_price=Decimal('70.00'), sale_price=Decimal('60.00'))
+
+    def test_item_changes_update_stored_totals(self):
+        order = self.create_order(items=[(self.product, 2, Decimal('0')), (self.product, 1, Decimal('25.00'))])
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('145.00'), 3))
+
+        order.orderitem_set.filter(price_at_order=0).get().delete()
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('25.00'), 1))
+
+        # Without items the stored total is the only record of the charge, as in sync_order_totals
+        order.orderitem_set.get().delete()
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('25.00'), 0))
+        self.assertEqual(find_total_drift([order]), [])
+
+    def test_sync_command_repairs_drift(self):
+        drifted = self.create_order(items=[(self.product, 3, Decimal('10.00'))])
+        itemless = self.create_order(total_amount=Decimal('99.00'))
+        Order.objects.filter(pk=drifted.pk).update(total_amount=0, item_count=0)
+
+        out = StringIO()
+        call_command('sync_order_totals', '--check', chunk_size=1, stdout=out)
+        self.assertIn('found 1', out.getvalue())
+        self.assertEqual(Order.objects.get(pk=drifted.pk).total_amount, 0)
+
+        call_command('sync_order_totals', chunk_size=1, stdout=StringIO())
+        self.assertEqual(Order.objects.get(pk=drifted.pk).total_amount, Decimal('30.00'))
+        self.assertEqual(Order.objects.get(pk=drifted.pk).item_count, 3)
+        self.assertEqual(Order.objects.get(pk=itemless.pk).total_amount, Decimal('99.00'))
+
+    def test_unsynced_orders_fall_back_to_their_items(self):
+        customer = CustomUser.objects.create_user(username='tara', email='tara@example.com', password='pass')
+        order = Order.objects.create(user=customer, order_status='completed', complete=True)
+        # Written around the signals, as the storefront does
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=self.product, quantity=2, price_at_order=Decimal('100.00')),
+        ])
+
+        data = self.client.get(f'/api/orders/{order.id}/').json()
+        self.assertEqual((Decimal(data['get_cart_total']), data['get_cart_items']), (Decimal('200.00'), 2))
+        self.assertEqual(Decimal(self.client.get('/api/orders/statistics/').json()['total_revenue']), Decimal('200.00'))
+        self.assertEqual(Decimal(self.client.get('/api/customers/').json()['results'][0]['total_spent']), Decimal('200.00'))
+        score_customers()
+        self.assertEqual(CustomerStats.objects.get(user=customer).total_spent, Decimal('200.00'))
+
+
+class ProductListQueryTests(AdminAPITestCase):
+    def create_products(self, count):
+        category = Category.objects.create(name=f'Category {count}', slug=f'category-{count}')
+        for i in range(count):
+            product = Product.objects.create(name=f'Product {i}', regular_price=Decimal('10.00'), category=category)
+            ProductImage.objects.create(product=product, image=f'https://example.com/{i}.png')
+            ProductImage.objects.create(product=product, image=f'https://example.com/{i}-main.png', is_main=True)
+
+    def test_main_image_uses_prefetched_images(self):
+        self.create_products(3)
+        with self.assertNumQueries(3):
+            data = self.client.get('/api/products/').json()
+        self.assertTrue(data['results'][0]['main_image_url'].endswith('-main.png'))
+
+        self.create_products(15)
+        with self.assertNumQueries(3):
+            self.client.get('/api/products/')
+        for product in Product.objects.all()[:8]:
+            self.create_order('completed', items=[(product, 2, Decimal('10.00'))])
+        # Ranking from the rollup, then the ranked products and their images
+        with self.assertNumQueries(3):
+            self.client.get('/api/dashboard/top_products/')
+
+
+class QueryPlanTests(TestCase):
+    def test_list_queries_use_indexes(self):
+        for label, indexed, plan in check_query_plans():
+            with self.subTest(label):
+                self.assertTrue(indexed, plan)
+
+    def test_missing_index_fails_the_check(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX order_status_date_idx')
+            cursor.execute('DROP INDEX review_rating_created_idx')
+        failing = [label for label, indexed, plan in check_query_plans() if not indexed]
+        self.assertEqual(failing, ['orders?order_status', 'reviews?rating'])
+
+
+class DatasetSeederTests(TestCase):
+    def test_seeds_consistent_dataset(self):
+        DatasetSeeder(seed=7, batch_size=50).run(
+            categories=3, products=20, customers=30, orders=120, reviews=40, carts=10
+        )
+        self.assertEqual(Order.objects.count(), 120)
+        self.assertEqual(Product.objects.count(), 20)
+        self.assertEqual(CustomUser.objects.count(), 30)
+
+        out = StringIO()
+        call_command('sync_order_totals', '--check', stdout=out)
+        self.assertIn('found 0', out.getvalue())
+        self.assertEqual(
+            DailyOrderMetrics.objects.aggregate(total=Sum('order_count'))['total'], 120
+        )
+
+    def test_dates_count_back_from_a_fixed_anchor(self):
+        def order_dates(**kwargs):
+            Order.objects.all().delete()
+            DatasetSeeder(seed=5, **kwargs).run(
+                categories=1, products=5, customers=5, orders=20, reviews=0, carts=0
+            )
+            return list(Order.objects.order_by('id').values_list('date_ordered', flat=True))
+
+        dates = order_dates(days=30)
+        self.assertTrue(all(DEFAULT_ANCHOR - timedelta(days=30) <= date <= DEFAULT_ANCHOR for date in dates))
+        anchor = DEFAULT_ANCHOR + timedelta(days=100)
+        self.assertEqual(order_dates(days=30, anchor=anchor), [date + timedelta(days=100) for date in dates])
+
+
+class EndpointBudgetTests(AdminAPITestCase):
+    def test_endpoints_stay_within_query_budgets(self):
+        DatasetSeeder(seed=3, batch_size=100).run(
+            categories=3, products=30, customers=40, orders=300, reviews=50, carts=5
+        )
+        results = run_benchmarks(self.admin, repeat=1)
+        self.assertEqual(set(results), set(load_budgets()))
+        self.assertEqual(check_budgets(results, load_budgets(), check_latency=False), [])
+
+
+class CursorPaginationTests(AdminAPITestCase):
+    def test_cursor_pages_cover_all_orders_without_count(self):
+        orders = [self.create_order() for _ in range(7)]
+        Order.objects.filter(pk=orders[0].pk).update(date_ordered=orders[1].date_ordered)
+
+        seen = []
+        url = '/api/orders/?pagination=cursor&page_size=3'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).json()
+            self.assertNotIn('count', data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+            seen.extend(order['id'] for order in data['results'])
+            url = data['next']
+
+        expected = list(Order.objects.order_by('-date_ordered', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_page_number_pagination_remains_default(self):
+        self.create_order()
+        data = self.client.get('/api/orders/').json()
+        self.assertEqual(data['count'], 1)
+
+
+class ProductSearchTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Product.objects.create(name='Silk Saree', sku='SR-001', regular_price=10, description='Banarasi silk saree')
+        Product.objects.create(name='Cotton Kurta', sku='KR-001', regular_price=10, description='Soft cotton with silk trim')
+        Product.objects.create(name='Linen Dupatta', sku='DP-001', regular_price=10, description='Light linen')
+
+    def search(self, term, **params):
+        response = self.client.get('/api/products/', {'search': term, **params})
+        return [product['name'] for product in response.json()['results']]
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(self.search('silk'), ['Silk Saree', 'Cotton Kurta'])
+        self.assertEqual(self.search('kurt'), ['Cotton Kurta'])
+        self.assertEqual(self.search('silk', ordering='id'), ['Silk Saree', 'Cotton Kurta'])
+        self.assertEqual(self.search('velvet'), [])
+
+    def test_exact_sku_match(self):
+        self.assertEqual(self.search('DP-001'), ['Linen Dupatta'])
+
+    def test_index_follows_updates_and_deletes(self):
+        product = Product.objects.get(sku='DP-001')
+        product.name = 'Linen Stole'
+        product.save()
+        self.assertEqual(self.search('stole'), ['Linen Stole'])
+        product.delete()
+        self.assertEqual(self.search('linen'), [])
+
+    def test_repair_only_reindexes_after_losing_triggers(self):
+        with CaptureQueriesContext(connection) as queries:
+            repair_search(connection)
+        self.assertFalse(any('rebuild' in query['sql'] for query in queries))
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER product_search_insert')
+        Product.objects.create(name='Velvet Lehenga', sku='LH-001', regular_price=10)
+        self.assertEqual(self.search('velvet'), [])
+        repair_search(connection)
+        # A new term, since the empty result above is in the response cache
+        self.assertEqual(self.search('lehenga'), ['Velvet Lehenga'])
+
+
+class FlakyImageStore:
+    calls = 0
+
+    def upload(self, file, folder):
+        FlakyImageStore.calls += 1
+        if FlakyImageStore.calls < 2:
+            raise ConnectionError('storage unavailable')
+        return f'https://images.example.com/{folder}/{os.path.basename(file.name)}'
+
+
+@override_settings(
+    IMAGE_STORE='dashboard.image_store.LocalImageStore',
+    IMAGE_UPLOAD_ASYNC=False,
+    IMAGE_UPLOAD_RETRY_DELAY=0,
+)
+class ImageUploadPipelineTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.product = Product.objects.create(name='Anarkali', regular_price=10)
+
+    def upload(self, name='photo.png', is_main='true'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/upload-product-image/', {
+                'product_id': self.product.id,
+                'image': SimpleUploadedFile(name, b'\x89PNG image bytes', content_type='image/png'),
+                'is_main': is_main,
+            })
+        return response
+
+    def test_upload_is_staged_then_pushed_to_store(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'uploaded')
+        self.assertTrue(status['url'].startswith('/media/products/'))
+        image = ProductImage.objects.get()
+        self.assertIsNone(image.local_path)
+        self.assertTrue(image.is_main)
+
+    @override_settings(IMAGE_STORE='dashboard.tests.FlakyImageStore')
+    def test_failed_upload_is_retried(self):
+        FlakyImageStore.calls = 0
+        response = self.upload()
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'uploaded')
+        self.assertEqual(status['attempts'], 2)
+
+    @override_settings(IMAGE_STORE='dashboard.tests.FlakyImageStore', IMAGE_UPLOAD_MAX_ATTEMPTS=1)
+    def test_upload_fails_after_max_attempts(self):
+        FlakyImageStore.calls = 0
+        response = self.upload()
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['error'], 'Image upload failed')
+        self.assertEqual(ProductImage.objects.get().upload_error, 'storage unavailable')
+
+    def test_storefront_inserts_get_column_defaults(self):
+        # The storefront writes images with its own SQL and knows nothing of the upload columns
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO "Radhirra_productimage" (product_id, image, is_main) VALUES (%s, %s, %s)',
+                [self.product.id, 'https://images.example.com/storefront.png', True],
+            )
+        image = ProductImage.objects.get()
+        self.assertEqual((image.status, image.upload_attempts, image.variants), ('uploaded', 0, {}))
+
+
+class SlowImageStore:
+    delay = 0.3
+
+    def upload(self, file, folder):
+        time.sleep(self.delay)
+        if file.read() == b'not an image':
+            raise ValueError('unsupported image')
+        return f'https://images.example.com/{folder}/{os.path.basename(file.name)}'
+
+
+@override_settings(
+    IMAGE_STORE='dashboard.tests.SlowImageStore',
+    IMAGE_UPLOAD_MAX_ATTEMPTS=1,
+)
+class BatchImageUploadTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.product = Product.objects.create(name='Sharara', regular_price=10)
+        ProductImage.objects.create(product=self.product, image='https://images.example.com/old.png', is_main=True)
+
+    def test_files_upload_concurrently_with_per_file_results(self):
+        files = [SimpleUploadedFile(f'photo{i}.png', b'png bytes') for i in range(6)]
+        files.append(SimpleUploadedFile('broken.png', b'not an image'))
+
+        started = time.monotonic()
+        response = self.client.post(
+            f'/api/products/{self.product.id}/upload_images/', {'images': files, 'is_main': 'true'}
+        )
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, SlowImageStore.delay * 3)
+        data = response.json()
+        self.assertFalse(data['success'])
+        self.assertEqual([result['success'] for result in data['results']], [True] * 6 + [False])
+        self.assertEqual(data['results'][-1]['error'], 'unsupported image')
+        main_images = ProductImage.objects.filter(product=self.product, is_main=True)
+        self.assertEqual([image.image for image in main_images], [data['images'][0]['url']])
+        self.assertEqual(ProductImage.objects.filter(product=self.product).count(), 7)
+
+    @override_settings(
+        IMAGE_STORE='dashboard.tests.FlakyImageStore',
+        IMAGE_UPLOAD_ASYNC=False,
+        IMAGE_UPLOAD_MAX_ATTEMPTS=3,
+        IMAGE_UPLOAD_RETRY_DELAY=0,
+    )
+    def test_failed_files_are_retried_by_the_background_workers(self):
+        FlakyImageStore.calls = 0
+        files = [SimpleUploadedFile(f'photo{i}.png', b'png bytes') for i in range(2)]
+        with self.captureOnCommitCallbacks() as callbacks:
+            data = self.client.post(
+                f'/api/products/{self.product.id}/upload_images/', {'images': files}
+            ).json()
+        self.assertTrue(data['success'])
+        self.assertEqual(sorted(result['status'] for result in data['results']), ['pending', 'uploaded'])
+        pending = ProductImage.objects.get(status='pending')
+        self.assertEqual((pending.upload_attempts, pending.upload_error), (1, 'storage unavailable'))
+
+        for callback in callbacks:
+            callback()
+        pending.refresh_from_db()
+        self.assertEqual((pending.status, pending.upload_attempts, pending.local_path), ('uploaded', 2, None))
+
+
+def png_bytes(size=(700, 400), color=(200, 40, 90)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[160, 320, 640, 1024], IMAGE_VARIANT_FORMATS=['webp'])
+class ImageVariantTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.product = Product.objects.create(name='Lehenga', regular_price=10)
+
+    def add_image(self, name, data, is_main=True):
+        path = default_storage.save(f'products/{name}', ContentFile(data))
+        return ProductImage.objects.create(product=self.product, image=default_storage.url(path), is_main=is_main)
+
+    def test_variants_are_content_addressed_and_cached(self):
+        image = self.add_image('lehenga.png', png_bytes())
+
+        self.assertEqual(build_variants([image]), [image.id])
+        image.refresh_from_db()
+        self.assertEqual(sorted(image.variants['webp'], key=int), ['160', '320', '640'])
+        names = set(image.variants['webp'].values())
+        for name in names:
+            self.assertRegex(name, r'^products/lehenga\.[0-9a-f]{12}\.\d+w\.webp$')
+            self.assertTrue(default_storage.exists(name))
+        with default_storage.open(image.variants['webp']['320'], 'rb') as variant:
+            self.assertEqual(Image.open(variant).size, (320, 183))
+
+        self.assertEqual(build_variants([image]), [])
+
+        with default_storage.open('products/lehenga.png', 'wb') as source:
+            source.write(png_bytes(color=(10, 10, 10)))
+        self.assertEqual(build_variants([image]), [image.id])
+        image.refresh_from_db()
+        self.assertTrue(names.isdisjoint(image.variants['webp'].values()))
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    @override_settings(IMAGE_VARIANT_WORKERS=2, IMAGE_VARIANT_FORMATS=['webp', 'avif'])
+    def test_batch_renders_in_process_pool_and_serializes_srcset(self):
+        images = [self.add_image('front.png', png_bytes()), self.add_image('tiny.png', png_bytes((90, 60)), False)]
+
+        self.assertEqual(sorted(build_variants(images)), sorted(image.id for image in images))
+        images[1].refresh_from_db()
+        self.assertEqual(list(images[1].variants['webp']), ['90'])
+
+        data = self.client.get('/api/products/').json()['results'][0]
+        srcset = data['main_image_srcset']
+        self.assertRegex(srcset['webp'], r'^/media/products/front\.\w+\.160w\.webp 160w, .* 640w$')
+        if 'avif' in images[0].variants:
+            self.assertIn('640w', srcset['avif'])
+
+    def test_cloudinary_images_use_url_transformations(self):
+        ProductImage.objects.create(
+            product=self.product, image='https://res.cloudinary.com/demo/image/upload/v1/kurta.png', is_main=True
+        )
+        srcset = self.client.get(f'/api/products/{self.product.id}/').json()['main_image_srcset']
+        self.assertIn('/upload/f_webp,q_auto,c_limit,w_320/v1/kurta.png 320w', srcset['webp'])
+
+
+class ResponseCacheTests(AdminAPITestCase):
+    cache_settings = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'response-cache-tests'}
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(CACHES={'default': self.cache_settings}))
+        get_cache().clear()
+        self.category = Category.objects.create(name='Kurtas', slug='kurtas')
+        self.product = Product.objects.create(name='Kurta', regular_price=10, category=self.category)
+
+    def get(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_repeat_reads_are_served_from_cache(self):
+        self.assertEqual(self.get('/api/products/')['X-Cache'], 'MISS')
+        # Only the ETag aggregate runs; the page and its count come from the cache
+        with self.assertNumQueries(1):
+            response = self.get('/api/products/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['results'][0]['name'], 'Kurta')
+
+        self.assertEqual(self.get('/api/products/', ordering='name')['X-Cache'], 'MISS')
+        self.assertEqual(self.get(f'/api/products/{self.product.id}/')['X-Cache'], 'MISS')
+        self.assertEqual(self.get(f'/api/products/{self.product.id}/')['X-Cache'], 'HIT')
+
+        stats = self.get('/api/dashboard/cache_stats/').json()
+        self.assertEqual(stats['product'], {'hits': 2, 'misses': 3, 'hit_rate': 0.4})
+        self.assertEqual(stats['category']['hits'], 0)
+
+    def test_writes_invalidate_dependent_responses(self):
+        self.get('/api/products/')
+        self.get('/api/categories/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/products/{self.product.id}/', {'name': 'Silk Kurta'}, format='json')
+        response = self.get('/api/products/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['name'], 'Silk Kurta')
+        self.assertEqual(self.get('/api/categories/')['X-Cache'], 'HIT')
+
+        ProductImage.objects.create(product=self.product, image='https://images.example.com/a.png', is_main=True)
+        self.assertEqual(self.get('/api/products/').json()['results'][0]['main_image_url'],
+                         'https://images.example.com/a.png')
+
+        self.category.name = 'Kurta Sets'
+        self.category.save()
+        self.assertEqual(self.get('/api/products/').json()['results'][0]['category_name'], 'Kurta Sets')
+        self.assertEqual(self.get('/api/categories/')['X-Cache'], 'MISS')
+
+        self.client.post('/api/products/bulk_update/', {'ids': [self.product.id], 'is_featured': True}, format='json')
+        self.assertTrue(self.get('/api/products/').json()['results'][0]['is_featured'])
+
+
+class FileResponseCacheTests(ResponseCacheTests):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        self.cache_settings = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        super().setUp()
+
+
+class ConditionalGetTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        self.products = [Product.objects.create(name=f'Saree {i}', regular_price=10) for i in range(3)]
+
+    def test_unchanged_list_answers_304_after_one_query(self):
+        response = self.client.get('/api/products/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        self.assertNotEqual(self.client.get('/api/products/', {'page': 2}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_edits_deletes_and_related_rows_change_the_etag(self):
+        etags = [self.client.get('/api/products/')['ETag']]
+
+        self.client.patch(f'/api/products/{self.products[0].id}/', {'name': 'Silk Saree'}, format='json')
+        etags.append(self.client.get('/api/products/')['ETag'])
+        self.products[1].delete()
+        etags.append(self.client.get('/api/products/')['ETag'])
+        ProductImage.objects.create(product=self.products[2], image='https://images.example.com/s.png', is_main=True)
+        etags.append(self.client.get('/api/products/')['ETag'])
+        self.client.post('/api/products/bulk_update/', {'ids': [self.products[2].id], 'is_featured': True}, format='json')
+
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(set(etags + [response['ETag']])), 5)
+
+    def test_detail_supports_validators(self):
+        product = self.products[0]
+        etag = self.client.get(f'/api/products/{product.id}/')['ETag']
+        self.assertEqual(self.client.get(f'/api/products/{product.id}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/products/999999/').status_code, 404)
+
+    def test_order_validators_follow_items_addresses_and_names(self):
+        order = self.create_order()
+        response = self.client.get('/api/orders/')
+        modified_since = response['Last-Modified']
+        self.assertEqual(self.client.get('/api/orders/', HTTP_IF_MODIFIED_SINCE=modified_since).status_code, 304)
+
+        etags = [response['ETag']]
+        self.client.patch(f'/api/orders/{order.id}/update_status/', {'status': 'confirmed'}, format='json')
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        item = OrderItem.objects.create(order=order, product=self.products[0], quantity=1, price_at_order=10)
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        address = ShippingAddress.objects.create(order=order, city='Pune')
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        address.delete()
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        self.products[0].name = 'Silk Saree'
+        self.products[0].save()
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        self.admin.first_name = 'Asha'
+        self.admin.save()
+        etags.append(self.client.get('/api/orders/')['ETag'])
+        item.delete()
+        response = self.client.get('/api/orders/', HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(set(etags + [response['ETag']])), 8)
+
+    def test_review_validators(self):
+        review = Review.objects.create(product=self.products[0], user=self.admin, rating=4, comment='Nice')
+        etag = self.client.get('/api/reviews/')['ETag']
+        self.assertEqual(self.client.get('/api/reviews/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        detail = self.client.get(f'/api/reviews/{review.id}/')['ETag']
+
+        self.client.patch(f'/api/reviews/{review.id}/', {'rating': 5}, format='json')
+        self.assertEqual(self.client.get('/api/reviews/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/reviews/{review.id}/', HTTP_IF_NONE_MATCH=detail).status_code, 200)
+
+    def test_sync_command_moves_order_updated_at(self):
+        product = self.products[0]
+        order = self.create_order(items=[(product, 2, Decimal('100.00'))])
+        Order.objects.filter(pk=order.pk).update(total_amount=0)
+        before = Order.objects.get(pk=order.pk).updated_at
+
+        call_command('sync_order_totals', stdout=StringIO())
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('200.00'))
+        self.assertGreater(order.updated_at, before)
+
+
+class RevenueSeriesTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+    def place(self, status, total_amount, days_ago=0, order_type='whatsapp'):
+        order = self.create_order(status, order_type=order_type, total_amount=total_amount)
+        if days_ago:
+            order.date_ordered = timezone.now() - timedelta(days=days_ago)
+            order.save()
+        return order
+
+    def series(self, **params):
+        response = self.client.get('/api/dashboard/revenue/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_daily_buckets(self):
+        self.place('completed', Decimal('100.00'))
+        self.place('completed', Decimal('300.00'), days_ago=2)
+        self.place('completed', Decimal('100.00'), days_ago=2)
+        self.place('pending', Decimal('50.00'), days_ago=2)
+        self.place('completed', Decimal('40.00'), days_ago=5, order_type='email')
+
+        results = self.series(interval='day', periods=7)
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results[-1]['period'], timezone.localdate().isoformat())
+        self.assertEqual(
+            [(row['orders'], row['completed_orders'], Decimal(row['revenue'])) for row in results],
+            [(0, 0, 0), (1, 1, Decimal('40.00')), (0, 0, 0), (0, 0, 0),
+             (3, 2, Decimal('400.00')), (0, 0, 0), (1, 1, Decimal('100.00'))],
+        )
+        self.assertEqual(Decimal(results[4]['average_order_value']), Decimal('200.00'))
+
+        email = self.series(interval='day', periods=7, order_type='email')
+        self.assertEqual([row['orders'] for row in email], [0, 1, 0, 0, 0, 0, 0])
+
+    def test_weeks_and_months_start_on_period_boundaries(self):
+        today = timezone.localdate()
+        weeks = self.series(interval='week', periods=4)
+        self.assertEqual(weeks[-1]['period'], (today - timedelta(days=today.weekday())).isoformat())
+        self.assertEqual(weeks[0]['period'], (today - timedelta(days=today.weekday(), weeks=3)).isoformat())
+        months = self.series(interval='month')
+        self.assertEqual(len(months), 12)
+        self.assertEqual(months[-1]['period'], today.replace(day=1).isoformat())
+        self.assertTrue(all(row['period'].endswith('-01') for row in months))
+
+    def test_closed_periods_are_cached_until_their_rows_change(self):
+        order = self.place('completed', Decimal('300.00'), days_ago=2)
+        self.place('completed', Decimal('100.00'))
+        self.series(interval='day', periods=30)
+
+        # Only the stamps and the open period are read once the closed ones are cached
+        with self.assertNumQueries(2):
+            results = self.series(interval='day', periods=30)
+        self.assertEqual(Decimal(results[-3]['revenue']), Decimal('300.00'))
+
+        order.order_status = 'cancelled'
+        order.save()
+        results = self.series(interval='day', periods=30)
+        self.assertEqual(Decimal(results[-3]['revenue']), Decimal('0.00'))
+        self.assertEqual(Decimal(results[-1]['revenue']), Decimal('100.00'))
+
+        Order.objects.filter(pk=order.pk).update(order_status='completed')
+        rebuild_daily_metrics()
+        results = self.series(interval='day', periods=30)
+        self.assertEqual(Decimal(results[-3]['revenue']), Decimal('300.00'))
+
+    def test_rollup_writes_from_other_processes_reach_cached_periods(self):
+        self.place('completed', Decimal('300.00'), days_ago=2)
+        self.series(interval='day', periods=30)
+        self.series(interval='week', periods=8)
+
+        # As the catch_up_rollups cron would, with no eviction in this process
+        day = timezone.localdate() - timedelta(days=2)
+        DailyOrderMetrics.objects.filter(date=day).update(
+            revenue=Decimal('450.00'), updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(Decimal(self.series(interval='day', periods=30)[-3]['revenue']), Decimal('450.00'))
+        weeks = self.series(interval='week', periods=8)
+        self.assertEqual(sum(Decimal(row['revenue']) for row in weeks), Decimal('450.00'))
+
+        DailyOrderMetrics.objects.filter(date=day).delete()
+        self.assertEqual(Decimal(self.series(interval='day', periods=30)[-3]['revenue']), Decimal('0.00'))
+
+    def test_invalid_parameters(self):
+        for params in ({'interval': 'hour'}, {'order_type': 'fax'}, {'periods': 0}, {'periods': 'x'},
+                       {'periods': 1000}):
+            response = self.client.get('/api/dashboard/revenue/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class DashboardSummaryTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        customer = CustomUser.objects.create_user(username='asha', email='asha@example.com', password='pass')
+        category = Category.objects.create(name='Sarees', slug='sarees')
+        saree = Product.objects.create(name='Banarasi', regular_price=100, category=category, is_best_seller=True)
+        Product.objects.create(name='Chiffon', regular_price=50, category=category, is_featured=True)
+        ProductImage.objects.create(product=saree, image='https://images.example.com/b.png', is_main=True)
+        Review.objects.create(product=saree, user=customer, rating=4, comment='Lovely')
+        Review.objects.create(product=saree, user=self.admin, rating=5, comment='Great')
+        self.create_order('completed', items=[(saree, 1, Decimal('100.00'))])
+        self.create_order('pending', total_amount=Decimal('50.00'))
+
+    def test_summary_returns_every_dashboard_figure_from_few_queries(self):
+        with self.assertNumQueries(7):
+            data = self.client.get('/api/dashboard/summary/').json()
+
+        self.assertEqual(data['total_orders'], 2)
+        self.assertEqual(data['today_orders'], 2)
+        self.assertEqual(data['pending_orders'], 1)
+        self.assertEqual(Decimal(data['total_revenue']), Decimal('100.00'))
+        self.assertEqual(Decimal(data['today_revenue']), Decimal('150.00'))
+        self.assertEqual(data['total_customers'], 1)
+        self.assertEqual(data['total_products'], 2)
+        self.assertEqual(data['featured_products'], 1)
+        self.assertEqual(data['total_categories'], 1)
+        self.assertEqual(data['total_images'], 1)
+        self.assertEqual(data['total_reviews'], 2)
+        self.assertEqual(data['average_rating'], 4.5)
+        self.assertEqual([product['name'] for product in data['top_products']], ['Banarasi'])
+
+    def test_summary_is_cached_for_its_ttl(self):
+        self.client.get('/api/dashboard/summary/')
+        self.create_order('pending')
+        with self.assertNumQueries(0):
+            data = self.client.get('/api/dashboard/summary/').json()
+        self.assertEqual(data['total_orders'], 2)
+
+        get_cache().delete('dashboard-summary')
+        self.assertEqual(self.client.get('/api/dashboard/summary/').json()['total_orders'], 3)
+
+
+@override_settings(LIVE_EVENTS_POLL_INTERVAL=3600)
+class LiveDashboardEventTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.close_loop)
+
+    def close_loop(self):
+        # Let cancelled watcher tasks finish before the loop goes away
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
+
+    def test_order_deltas_follow_status_changes(self):
+        order = self.create_order('pending', total_amount=Decimal('100.00'))
+        self.assertEqual(order_deltas(order, created=True), {
+            'total_orders': 1, 'whatsapp_orders': 1, 'today_orders': 1,
+            'pending_orders': 1, 'pending_revenue': Decimal('100.00'), 'today_revenue': Decimal('100.00'),
+        })
+
+        order.order_status = 'completed'
+        self.assertEqual(order_deltas(order, 'pending'), {
+            'pending_orders': -1, 'completed_orders': 1, 'pending_revenue': Decimal('-100.00'),
+            'completed_revenue': Decimal('100.00'), 'total_revenue': Decimal('100.00'),
+        })
+        order.order_status = 'cancelled'
+        self.assertEqual(order_deltas(order, 'completed')['today_revenue'], Decimal('-100.00'))
+        self.assertEqual(order_deltas(order, 'cancelled'), {})
+
+    def test_status_change_is_pushed_to_every_subscriber_after_commit(self):
+        async def subscribe():
+            return publisher.subscribe(), publisher.subscribe()
+
+        queues = self.loop.run_until_complete(subscribe())
+        self.addCleanup(lambda: [publisher.unsubscribe(queue) for queue in queues])
+        order = self.create_order('pending', total_amount=Decimal('40.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/orders/{order.id}/update_status/', {'status': 'confirmed'}, format='json')
+
+        async def receive():
+            return [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+
+        for event in self.loop.run_until_complete(receive()):
+            self.assertEqual(event['type'], 'order_status_changed')
+            self.assertEqual(event['previous_status'], 'pending')
+            self.assertEqual(event['deltas'], {'pending_orders': -1, 'confirmed_orders': 1})
+
+    def test_batch_status_change_is_pushed_as_one_event(self):
+        async def subscribe():
+            return publisher.subscribe()
+
+        queue = self.loop.run_until_complete(subscribe())
+        self.addCleanup(publisher.unsubscribe, queue)
+        orders = [self.create_order('pending', total_amount=Decimal('10.00')) for _ in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '/api/orders/batch_status/', {'ids': [o.id for o in orders], 'status': 'completed'}, format='json'
+            )
+
+        event = self.loop.run_until_complete(asyncio.wait_for(queue.get(), 1))
+        self.assertEqual(event['type'], 'orders_status_changed')
+        self.assertEqual(event['deltas'], {
+            'pending_orders': -3, 'completed_orders': 3, 'pending_revenue': Decimal('-30.00'),
+            'completed_revenue': Decimal('30.00'), 'total_revenue': Decimal('30.00'),
+        })
+        self.assertTrue(queue.empty())
+
+    def test_event_stream_sends_snapshot_then_events_and_unsubscribes(self):
+        async def scenario():
+            queue = publisher.subscribe()
+            stream = event_stream(queue, snapshot={'total_orders': 3})
+            frames = [await anext(stream), await anext(stream)]
+            publisher.publish({'type': 'resync'})
+            frames.append(await anext(stream))
+            await stream.aclose()
+            return frames
+
+        retry, snapshot, resync = self.loop.run_until_complete(scenario())
+        self.assertEqual(retry, 'retry: 5000\n\n')
+        self.assertTrue(snapshot.startswith('event: snapshot\ndata: '))
+        self.assertEqual(json.loads(snapshot.split('data: ', 1)[1])['summary'], {'total_orders': 3})
+        self.assertEqual(resync, 'event: resync\ndata: {"type": "resync"}\n\n')
+        self.assertEqual(publisher.subscriber_count, 0)
+
+
+class LiveDashboardEndpointTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+    async def test_stream_requires_staff_token_and_opens_with_snapshot(self):
+        response = await self.async_client.get('/api/dashboard/events/')
+        self.assertEqual(response.status_code, 401)
+
+        token = str((await asyncio.to_thread(RefreshToken.for_user, self.admin)).access_token)
+        response = await self.async_client.get(
+            '/api/dashboard/events/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.streaming_content
+        self.assertEqual(await anext(content), b'retry: 5000\n\n')
+        self.assertIn(b'"total_orders": 0', await anext(content))
+        await response._iterator.aclose()
+
+    def test_wsgi_requests_are_told_to_keep_polling(self):
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        response = self.client.get('/api/dashboard/events/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 501)
+
+
+class OrderExportTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(
+            name='Kurta', sku='KUR-1', regular_price=Decimal('500.00'), sale_price=Decimal('400.00')
+        )
+        self.order = self.create_order('completed', total_amount=Decimal('800.00'), items=[
+            (self.product, 2, Decimal('400.00')),
+        ])
+        ShippingAddress.objects.create(order=self.order, address='1 MG Road', city='Pune', zipcode='411001')
+        self.create_order('pending', order_type='email', total_amount=Decimal('120.00'))
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/orders/export/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="orders-', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        row = next(row for row in rows if row['id'] == str(self.order.id))
+        self.assertEqual(row['city'], 'Pune')
+        self.assertEqual(row['items'], 'Kurta x2 @ 400.00')
+
+    def test_csv_export_defuses_formulas(self):
+        ShippingAddress.objects.filter(order=self.order).update(
+            address='=HYPERLINK("http://evil.example")', city='@SUM(A1)'
+        )
+        Order.objects.filter(pk=self.order.pk).update(contact_value='+91 98200 00000')
+        _, body = self.export('?order_status=completed')
+        row = next(csv.DictReader(StringIO(body)))
+        self.assertEqual(row['address'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual(row['city'], "'@SUM(A1)")
+        self.assertEqual(row['contact_value'], "'+91 98200 00000")
+        self.assertEqual(row['total_amount'], '800.00')
+
+    def test_ndjson_export_nests_items_and_shipping(self):
+        response, body = self.export('?export_format=ndjson&order_status=completed')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.order.id])
+        self.assertEqual(records[0]['shipping']['zipcode'], '411001')
+        self.assertEqual(records[0]['items'][0]['sku'], 'KUR-1')
+
+    def test_date_range_filter(self):
+        Order.objects.filter(pk=self.order.pk).update(date_ordered=timezone.now() - timedelta(days=10))
+        today = timezone.localdate().isoformat()
+        _, body = self.export(f'?export_format=ndjson&date_from={today}&date_to={today}')
+        self.assertEqual(len(body.splitlines()), 1)
+        self.assertNotIn(f'"id": {self.order.id},', body)
+
+        response = self.client.get(f'/api/orders/?date_to={today}&date_from=yesterday')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/orders/export/?export_format=xlsx')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ORDER_EXPORT_CHUNK_SIZE=2)
+    def test_query_count_does_not_grow_with_rows_per_chunk(self):
+        for _ in range(3):
+            self.create_order('completed', items=[(self.product, 1, Decimal('400.00'))])
+        with CaptureQueriesContext(connection) as queries:
+            _, body = self.export('?export_format=ndjson')
+        self.assertEqual(len(body.splitlines()), 5)
+        # One order query, then items and shipping prefetched once per chunk of two
+        self.assertLessEqual(len(queries), 1 + 2 * 3 + 2)
+
+    async def test_asgi_export_streams(self):
+        token = str((await asyncio.to_thread(RefreshToken.for_user, self.admin)).access_token)
+        response = await self.async_client.get(
+            '/api/orders/export/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertTrue(response.is_async)
+        content = response.streaming_content
+        self.assertTrue((await anext(content)).startswith(b'id,date_ordered,'))
+        rest = b''.join([block async for block in content])
+        self.assertEqual(len(rest.splitlines()), 2)
+
+
+class ProductImportTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='Kurtas', slug='kurtas')
+        self.existing = Product.objects.create(
+            name='Old kurta', sku='KUR-1', regular_price=Decimal('500.00'), description='Keep me', is_featured=True
+        )
+
+    def upload(self, name, content):
+        return self.client.post(
+            '/api/products/import/', {'file': SimpleUploadedFile(name, content.encode())}, format='multipart'
+        )
+
+    def test_csv_upserts_by_sku_and_reports_bad_rows(self):
+        response = self.upload('catalog.csv', (
+            'sku,name,regular_price,sale_price,category,is_featured\n'
+            'KUR-1,Kurta,550.00,,kurtas,\n'
+            'KUR-2,Dupatta,300,250,kurtas,true\n'
+            'KUR-3,Saree,abc,,kurtas,\n'
+            'KUR-4,Lehenga,900,,gowns,\n'
+            'KUR-2,Dupatta again,300,,,\n'
+            ',No sku,100,,,\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (1, 1, 4))
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertIn('regular_price', errors[4])
+        self.assertEqual(errors[5], {'category': ['Unknown category "gowns".']})
+        self.assertEqual(errors[6], {'sku': ['Duplicate of row 3.']})
+        self.assertIn('sku', errors[7])
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.regular_price), ('Kurta', Decimal('550.00')))
+        self.assertEqual(self.existing.category, self.category)
+        # Blank boolean cells leave the flag alone; columns not in the file are untouched
+        self.assertTrue(self.existing.is_featured)
+        self.assertEqual(self.existing.description, 'Keep me')
+        dupatta = Product.objects.get(sku='KUR-2')
+        self.assertEqual((dupatta.sale_price, dupatta.is_featured), (Decimal('250.00'), True))
+
+    def test_ndjson_partial_rows_and_new_sku_requirements(self):
+        response = self.upload('prices.ndjson', '\n'.join([
+            '{"sku": "KUR-1", "sale_price": "450.00"}',
+            '{"sku": "NEW-1", "sale_price": "10.00"}',
+            'not json',
+        ]))
+        self.assertEqual((response.data['updated'], response.data['failed']), (1, 2))
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors[2]), {'name', 'regular_price'})
+        self.assertEqual(errors[3], {'non_field_errors': ['Row is not a JSON object.']})
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.sale_price), ('Old kurta', Decimal('450.00')))
+
+    def test_queries_per_chunk_and_cache_invalidation(self):
+        self.client.get('/api/products/')
+        rows = [{'sku': f'SKU-{i}', 'name': f'Product {i}', 'regular_price': '99.00'} for i in range(30)]
+        with override_settings(PRODUCT_IMPORT_CHUNK_SIZE=10), CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload('catalog.json', json.dumps(rows))
+        self.assertEqual(response.data['created'], 30)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "Radhirra_product"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self.client.get('/api/products/')['X-Cache'], 'MISS')
+
+    def test_management_command(self):
+        path = os.path.join(tempfile.mkdtemp(), 'catalog.csv')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'w') as file:
+            file.write('sku,name,regular_price,status\nKUR-9,Kurta,100,active\nKUR-10,Kurta,100,archived\n')
+        out, err = StringIO(), StringIO()
+        call_command('import_products', path, stdout=out, stderr=err)
+        self.assertIn('Created 1, updated 0, failed 1 products', out.getvalue())
+        self.assertIn('Row 3 (KUR-10): status:', err.getvalue())
+
+
+class ProductBulkUpdateTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='Sarees', slug='sarees')
+        self.products = [
+            Product.objects.create(name=f'Kurta {i}', regular_price=Decimal('1000.00') + i) for i in range(3)
+        ]
+        self.ids = [product.id for product in self.products]
+
+    def bulk_update(self, payload):
+        return self.client.post('/api/products/bulk_update/', payload, format='json')
+
+    def test_shared_changes_in_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk_update({
+                'ids': self.ids + [999999], 'status': 'draft', 'category': self.category.id,
+                'is_featured': True, 'markdown_percent': '12.50',
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['updated'], response.data['requested']), (3, 4))
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('status', 'category', 'is_featured', 'sale_price')),
+            [('draft', self.category.id, True, Decimal(price)) for price in ('875.00', '875.88', '876.75')]
+        )
+
+    def test_markdown_uses_new_regular_price(self):
+        self.bulk_update({'ids': self.ids[:1], 'regular_price': '2000.00', 'markdown_percent': '25'})
+        product = Product.objects.get(pk=self.ids[0])
+        self.assertEqual((product.regular_price, product.sale_price), (Decimal('2000.00'), Decimal('1500.00')))
+
+    def test_per_product_sale_prices(self):
+        Product.objects.filter(pk=self.ids[2]).update(sale_price=Decimal('5.00'))
+        response = self.bulk_update({
+            'ids': self.ids[:1], 'is_new_arrival': True,
+            'sale_prices': {str(self.ids[0]): '900.00', str(self.ids[1]): None},
+        })
+        self.assertEqual(response.data['updated'], 2)
+        rows = dict(Product.objects.values_list('id', 'sale_price'))
+        self.assertEqual([rows[pk] for pk in self.ids], [Decimal('900.00'), None, Decimal('5.00')])
+        # Shared changes only go to ids; the map only sets prices
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('is_new_arrival', flat=True)), [True, False, False]
+        )
+
+    def test_invalid_requests(self):
+        for payload in [
+            {'ids': self.ids},
+            {'ids': self.ids, 'sale_price': '10.00', 'markdown_percent': '10'},
+            {'ids': self.ids, 'markdown_percent': '100'},
+            {'sale_prices': {'abc': '10.00'}},
+            {'ids': self.ids, 'status': 'archived'},
+            {'status': 'draft'},
+            {'status': 'draft', 'sale_prices': {str(self.ids[0]): '900.00'}},
+        ]:
+            self.assertEqual(self.bulk_update(payload).status_code, 400, payload)
+        self.assertFalse(Product.objects.filter(status='draft').exists())
+        self.assertEqual(Product.objects.filter(sale_price__isnull=False).count(), 0)
+
+
+class OrderBatchStatusTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.pending = [self.create_order('pending', total_amount=Decimal('100.00')) for _ in range(3)]
+        self.confirmed = self.create_order('confirmed', order_type='email', total_amount=Decimal('50.00'))
+        self.cancelled = self.create_order('cancelled', total_amount=Decimal('70.00'))
+
+    def batch(self, ids, status):
+        return self.client.post('/api/orders/batch_status/', {'ids': ids, 'status': status}, format='json')
+
+    def test_per_id_outcomes_and_one_update_per_source_status(self):
+        ids = [order.id for order in self.pending] + [self.confirmed.id, self.cancelled.id, 999999]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.batch(ids, 'completed')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 4)
+        outcomes = {item['id']: (item['outcome'], item['previous_status']) for item in response.data['results']}
+        self.assertEqual(outcomes[self.pending[0].id], ('updated', 'pending'))
+        self.assertEqual(outcomes[self.confirmed.id], ('updated', 'confirmed'))
+        self.assertEqual(outcomes[self.cancelled.id], ('not_allowed', 'cancelled'))
+        self.assertEqual(outcomes[999999], ('not_found', None))
+
+        order_updates = [query for query in queries if query['sql'].startswith('UPDATE "Radhirra_order"')]
+        self.assertEqual(len(order_updates), 2)
+        self.assertEqual(Order.objects.filter(order_status='completed', complete=True).count(), 4)
+        self.assertEqual(Order.objects.get(pk=self.cancelled.id).order_status, 'cancelled')
+
+        self.assertEqual(self.batch([self.pending[0].id], 'completed').data['results'][0]['outcome'], 'unchanged')
+
+    def test_rollups_match_rebuild(self):
+        self.batch([order.id for order in self.pending] + [self.confirmed.id], 'cancelled')
+        incremental = sorted(DailyOrderMetrics.objects.values_list('order_type', 'order_status', 'order_count'))
+        rebuild_daily_metrics()
+        rebuilt = sorted(DailyOrderMetrics.objects.values_list('order_type', 'order_status', 'order_count'))
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(incremental, [('email', 'cancelled', 1), ('whatsapp', 'cancelled', 4)])
+
+    def test_single_update_checks_transitions(self):
+        response = self.client.patch(
+            f'/api/orders/{self.cancelled.id}/update_status/', {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            f'/api/orders/{self.cancelled.id}/update_status/', {'status': 'pending'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.get(pk=self.cancelled.id).order_status, 'pending')
+
+
+class ProductSalesTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.kurta = Product.objects.create(name='Kurta', regular_price=Decimal('500.00'))
+        self.saree = Product.objects.create(name='Saree', regular_price=Decimal('2000.00'))
+        self.dupatta = Product.objects.create(name='Dupatta', regular_price=Decimal('300.00'), is_best_seller=True)
+
+    def sales(self):
+        return sorted(DailyProductSales.objects.values_list('date', 'product_id', 'units', 'revenue', 'order_count'))
+
+    def place(self, items, days_ago=0, status='completed'):
+        order = self.create_order(status)
+        if days_ago:
+            Order.objects.filter(pk=order.pk).update(date_ordered=timezone.now() - timedelta(days=days_ago))
+        for product, quantity in items:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, price_at_order=Decimal('0'))
+        return order
+
+    def test_hooks_match_rebuild(self):
+        first = self.place([(self.kurta, 2), (self.saree, 1)])
+        second = self.place([(self.kurta, 1)], days_ago=3)
+        item = OrderItem.objects.create(order=second, product=self.saree, quantity=1)
+        item.product = self.dupatta
+        item.save()
+        OrderItem.objects.filter(order=first, product=self.saree).get().delete()
+        self.client.patch(f'/api/orders/{second.id}/update_status/', {'status': 'cancelled'}, format='json')
+        self.client.patch(f'/api/orders/{second.id}/update_status/', {'status': 'pending'}, format='json')
+        self.client.post('/api/orders/batch_status/', {'ids': [first.id], 'status': 'cancelled'}, format='json')
+        self.place([(self.saree, 4)]).delete()
+
+        incremental = self.sales()
+        rebuild_product_sales()
+        self.assertEqual(incremental, self.sales())
+        self.assertEqual([row[1:] for row in incremental], [
+            (self.kurta.id, 1, Decimal('500.00'), 1),
+            (self.dupatta.id, 1, Decimal('300.00'), 1),
+        ])
+
+    def test_ranking_windows_and_endpoint(self):
+        self.place([(self.kurta, 5)], days_ago=20)
+        self.place([(self.saree, 1), (self.kurta, 1)])
+        self.place([(self.saree, 1)], days_ago=1)
+        self.place([(self.dupatta, 9)], status='cancelled')
+
+        def ranked(query):
+            response = self.client.get(f'/api/dashboard/top_products/{query}')
+            self.assertEqual(response.status_code, 200)
+            return [(product['name'], product['sales']['units']) for product in response.json()]
+
+        self.assertEqual(ranked('?days=7'), [('Saree', 2), ('Kurta', 1)])
+        self.assertEqual(ranked(''), [('Kurta', 6), ('Saree', 2)])
+        self.assertEqual(ranked('?rank_by=revenue'), [('Saree', 2), ('Kurta', 6)])
+        # Two orders each; ties fall back to product id
+        self.assertEqual(ranked('?rank_by=orders&limit=1'), [('Kurta', 6)])
+        for query in ('?days=14', '?rank_by=views', '?limit=0', '?limit=x'):
+            self.assertEqual(self.client.get(f'/api/dashboard/top_products/{query}').status_code, 400)
+
+    def test_refresh_best_sellers(self):
+        self.place([(self.kurta, 3), (self.saree, 1)])
+        out = StringIO()
+        call_command('refresh_best_sellers', '--top', '1', stdout=out)
+        self.assertIn('Flagged 1 and unflagged 1', out.getvalue())
+        self.assertEqual(list(Product.objects.filter(is_best_seller=True)), [self.kurta])
+
+
+class CustomerSegmentTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.regular = self.customer('regular', [(365, 'completed', 100), (0, 'completed', 100)])
+        self.lapsed = self.customer('lapsed', [(400, 'completed', 900)])
+        self.occasional = self.customer('occasional', [(1, 'pending', 50), (2, 'cancelled', 500)])
+        self.prospect = self.customer('prospect', [])
+
+    def customer(self, name, orders):
+        user = CustomUser.objects.create_user(username=name, email=f'{name}@example.com', password='pass')
+        for days_ago, status, amount in orders:
+            order = Order.objects.create(user=user, order_status=status, total_amount=amount)
+            Order.objects.filter(pk=order.pk).update(date_ordered=self.now - timedelta(days=days_ago))
+        return user
+
+    def test_quintile_scores_share_ties(self):
+        self.assertEqual(quintile_scores(np.array([1, 1, 1, 2, 5])).tolist(), [1, 1, 1, 4, 5])
+
+    def test_scores_segments_and_lifetime_value(self):
+        self.assertEqual(CustomerStats.objects.get(user=self.prospect).segment, 'prospect')
+
+        segments = score_customers(now=self.now)
+        self.assertEqual(sum(segments.values()), 4)
+        stats = {row.user_id: row for row in CustomerStats.objects.all()}
+
+        regular = stats[self.regular.id]
+        self.assertEqual((regular.order_count, regular.completed_orders, regular.total_spent), (2, 2, Decimal('200.00')))
+        self.assertEqual((regular.recency_score, regular.frequency_score, regular.segment), (4, 4, 'champion'))
+        # 200 so far, plus 100 a time at 2 orders a year for 3 more years
+        self.assertEqual(regular.lifetime_value, Decimal('800.00'))
+
+        lapsed = stats[self.lapsed.id]
+        self.assertEqual((lapsed.recency_days, lapsed.monetary_score, lapsed.segment), (400, 4, 'lapsed'))
+        self.assertEqual(lapsed.lifetime_value, Decimal('900.00'))
+
+        # Ranked only against the other two buyers, one pending order is not enough
+        occasional = stats[self.occasional.id]
+        self.assertEqual(
+            (occasional.order_count, occasional.total_spent, occasional.recency_score, occasional.segment),
+            (1, Decimal('0.00'), 2, 'lapsed'),
+        )
+        self.assertEqual(occasional.lifetime_value, Decimal('0.00'))
+
+        prospect = stats[self.prospect.id]
+        self.assertEqual((prospect.segment, prospect.recency_days, prospect.recency_score), ('prospect', None, 0))
+
+    def test_customers_filter_and_order_by_stored_scores(self):
+        score_customers(now=self.now)
+        self.regular.is_staff = True
+        self.regular.save()
+        self.assertEqual(score_customers(now=self.now)['lapsed'], 1)
+        self.assertFalse(CustomerStats.objects.filter(user=self.regular).exists())
+
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/customers/', {'ordering': '-lifetime_value'}).json()
+        self.assertEqual([row['username'] for row in data['results']], ['lapsed', 'occasional', 'prospect'])
+        self.assertEqual(data['results'][0]['stats']['segment'], 'lapsed')
+
+        data = self.client.get('/api/customers/?segment=needs_attention&segment=prospect').json()
+        self.assertEqual({row['username'] for row in data['results']}, {'occasional', 'prospect'})
+        data = self.client.get('/api/customers/', {'min_lifetime_value': 500}).json()
+        self.assertEqual([row['username'] for row in data['results']], ['lapsed'])
+        self.assertEqual(self.client.get('/api/customers/', {'segment': 'vip'}).status_code, 400)
+
+
+
+class CustomerOrderTotalsTests(AdminAPITestCase):
+    def customer(self, name, orders):
+        user = CustomUser.objects.create_user(username=name, email=f'{name}@example.com', password='pass')
+        for days_ago, status, amount in orders:
+            order = Order.objects.create(user=user, order_status=status, total_amount=amount)
+            Order.objects.filter(pk=order.pk).update(date_ordered=timezone.now() - timedelta(days=days_ago))
+        return user
+
+    def page(self, **params):
+        return self.client.get('/api/customers/', {'page_size': 20, **params}).json()['results']
+
+    def test_totals_and_ordering(self):
+        self.customer('asha', [(10, 'completed', 300), (2, 'pending', 100), (1, 'cancelled', 900)])
+        self.customer('bina', [(5, 'completed', 500), (4, 'completed', 250)])
+        self.customer('chitra', [])
+
+        rows = {row['username']: row for row in self.page()}
+        self.assertEqual(
+            (rows['asha']['order_count'], Decimal(rows['asha']['total_spent'])), (2, Decimal('300.00'))
+        )
+        self.assertEqual(
+            (rows['bina']['order_count'], Decimal(rows['bina']['total_spent'])), (2, Decimal('750.00'))
+        )
+        self.assertEqual(
+            (rows['chitra']['order_count'], Decimal(rows['chitra']['total_spent']), rows['chitra']['last_order_at']),
+            (0, Decimal('0.00'), None),
+        )
+
+        self.assertEqual([row['username'] for row in self.page(ordering='-total_spent')], ['bina', 'asha', 'chitra'])
+        self.assertEqual([row['username'] for row in self.page(ordering='total_spent')], ['chitra', 'asha', 'bina'])
+        self.assertEqual(
+            [row['username'] for row in self.page(ordering='-last_order_at')][:2], ['asha', 'bina']
+        )
+        self.assertEqual(self.page(ordering='-order_count,username')[0]['username'], 'asha')
+
+    def test_page_costs_fixed_queries(self):
+        for index in range(20):
+            self.customer(f'c{index}', [(day, 'completed', 100) for day in range(index % 4)])
+        with self.assertNumQueries(2):
+            self.page(ordering='-order_count')
+
+        for user in CustomUser.objects.filter(is_staff=False):
+            Order.objects.bulk_create([Order(user=user, order_status='completed', total_amount=10) for _ in range(5)])
+        with self.assertNumQueries(2):
+            rows = self.page(ordering='-order_count')
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0]['order_count'], 8)
+
+    def test_order_figures_are_only_computed_where_returned(self):
+        user = self.customer('asha', [(1, 'completed', 300)])
+        detail = self.client.get(f'/api/customers/{user.id}/').json()
+        self.assertEqual((detail['order_count'], Decimal(detail['total_spent'])), (1, Decimal('300.00')))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(f'/api/customers/{user.id}/toggle_active/')
+            self.client.get(f'/api/customers/{user.id}/orders/')
+        lookups = [query['sql'] for query in queries.captured_queries if 'FROM "users_customuser"' in query['sql']]
+        self.assertEqual(len(lookups), 2)
+        for sql in lookups:
+            self.assertNotIn('Radhirra_order', sql)
+
+
+class CustomerOverviewTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = CustomUser.objects.create_user(username='meera', email='meera@example.com', password='pass')
+        self.product = Product.objects.create(name='Kurta', regular_price=Decimal('500.00'))
+        self.add_orders(45)
+        Review.objects.create(product=self.product, user=self.customer, rating=5, comment='Fits well')
+
+    def add_orders(self, count):
+        for index in range(count):
+            order = Order.objects.create(
+                user=self.customer, order_status='completed' if index % 3 else 'pending', complete=bool(index % 3)
+            )
+            OrderItem.objects.create(order=order, product=self.product, quantity=2, price_at_order=Decimal('100.00'))
+            ShippingAddress.objects.create(order=order, address='1 MG Road', city='Pune', state='MH', zipcode='411001')
+
+    def overview(self, **params):
+        return self.client.get(f'/api/customers/{self.customer.id}/overview/', params)
+
+    def test_one_response_with_paginated_orders(self):
+        with self.assertNumQueries(6):
+            data = self.overview().json()
+
+        self.assertEqual(data['customer']['email'], 'meera@example.com')
+        self.assertEqual(data['customer']['order_count'], 45)
+        self.assertEqual(data['stats']['total_orders'], 45)
+        self.assertEqual(data['stats']['completed_orders'], 30)
+        self.assertEqual(Decimal(data['stats']['completed_revenue']), Decimal('6000.00'))
+
+        orders = data['orders']
+        self.assertEqual(orders['count'], 45)
+        self.assertEqual(len(orders['results']), 20)
+        self.assertIn('page=2', orders['next'])
+        first = orders['results'][0]
+        self.assertEqual(first['id'], Order.objects.filter(user=self.customer).order_by('-id').first().id)
+        self.assertEqual(first['items'][0]['product_name'], 'Kurta')
+        self.assertEqual(first['shipping_address'][0]['city'], 'Pune')
+        self.assertEqual([review['comment'] for review in data['reviews']], ['Fits well'])
+
+        last_page = self.overview(page=3).json()['orders']
+        self.assertEqual(len(last_page['results']), 5)
+        self.assertIsNone(last_page['next'])
+        self.assertEqual(self.overview(page=4).status_code, 404)
+
+    def test_query_count_does_not_grow_with_history(self):
+        self.add_orders(30)
+        with self.assertNumQueries(6):
+            data = self.overview(page_size=50).json()
+        self.assertEqual(len(data['orders']['results']), 50)
@@ -13,6 +13,10 @@ urlpatterns = [
     
     # Image upload API
     path("api/upload-product-image/", views.upload_product_image_api, name="upload_product_image"),
+    path("api/upload-product-image/<int:image_id>/status/", views.product_image_status_api, name="product_image_status"),
+    
+    # Live dashboard updates (Server-Sent Events)
+    path("api/dashboard/events/", views.dashboard_events_api, name="dashboard_events"),
     
     # DRF API endpoints
     path("", include('dashboard.api_urls')),
@@ -1,7 +1,15 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
-import cloudinary.uploader
+from django.views.decorators.http import require_GET
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .image_uploads import stage_upload
+from .live import event_stream, publisher
+from .metrics import cached_dashboard_summary
 from .models import Product, Order, ProductImage
 
 
@@ -50,31 +58,68 @@ def upload_product_image_api(request):
             if not product_id or not image_file:
                 return JsonResponse({'success': False, 'error': 'Missing product_id or image'})
             
-            # Upload actual image to Cloudinary
-            result = cloudinary.uploader.upload(
-                image_file,
-                folder=f"products/{product_id}",
-                resource_type="image"
-            )
-            
-            # If this is main image, unset other main images first
-            if is_main:
-                ProductImage.objects.filter(product_id=product_id, is_main=True).update(is_main=False)
-            
-            # Save Cloudinary URL to database
-            product_image = ProductImage.objects.create(
-                product_id=product_id,
-                image=result['secure_url'],  # Store full Cloudinary URL
-                is_main=is_main
-            )
+            # Stage the file locally; a background worker pushes it to the image store
+            product_image = stage_upload(product_id, image_file, is_main)
             
             return JsonResponse({
                 'success': True,
                 'image_id': product_image.id,
-                'url': result['secure_url'],
-                'thumbnail': product_image.thumbnail_url
-            })
+                'status': product_image.status,
+                'url': product_image.image,
+                'thumbnail': product_image.thumbnail_url,
+                'status_url': reverse('product_image_status', args=[product_image.id]),
+            }, status=202)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
     
     return JsonResponse({'success': False, 'error': 'Invalid request'})
+
+
+def product_image_status_api(request, image_id):
+    product_image = ProductImage.objects.filter(pk=image_id).first()
+    if product_image is None:
+        return JsonResponse({'success': False, 'error': 'Image not found'}, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'image_id': product_image.id,
+        'status': product_image.status,
+        'url': product_image.image,
+        'thumbnail': product_image.thumbnail_url,
+        'attempts': product_image.upload_attempts,
+        # The stored error is raw exception text from the image store; it stays in the logs
+        'error': 'Image upload failed' if product_image.status == 'failed' else None,
+    })
+
+
+def _jwt_user(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+@require_GET
+async def dashboard_events_api(request):
+    """Server-Sent Events stream of dashboard metric deltas; needs an ASGI server"""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would try to buffer the endless stream
+        return JsonResponse({'success': False, 'error': 'Live updates need an ASGI server'}, status=501)
+    
+    user = await sync_to_async(_jwt_user)(request)
+    if user is None or not user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Authentication required'}, status=401)
+    
+    # Subscribe before taking the snapshot so no event falls between the two
+    queue = publisher.subscribe()
+    try:
+        snapshot = await sync_to_async(cached_dashboard_summary)()
+    except Exception:
+        publisher.unsubscribe(queue)
+        raise
+    
+    response = StreamingHttpResponse(event_stream(queue, snapshot), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,16 +4,34 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Sum, Q
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, F, Prefetch, Sum, Q
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from .models import (
     CustomUser, UserProfile, Category, Product, ProductImage,
-    Order, OrderItem, ShippingAddress, Cart, CartItem, Review
+    Order, OrderItem, ShippingAddress, Cart, CartItem, Review, DailyOrderMetrics
 )
 from .serializers import (
-    CustomUserSerializer, CategorySerializer, ProductSerializer,
+    CustomerSerializer, CategorySerializer, ProductSerializer,
     OrderSerializer, ReviewSerializer, ProductBulkUpdateSerializer,
-    OrderStatusUpdateSerializer
+    OrderStatusUpdateSerializer, OrderBatchStatusSerializer
 )
+from .bulk import transition_orders, update_products
+from .conditional import ConditionalGetMixin
+from .exports import EXPORT_FORMATS, async_batched, batched, export_lines
+from .filtering import CustomerFilter, DateRangeFilter
+from .image_uploads import upload_batch
+from .imports import guess_format, import_products, read_rows
+from .metrics import (
+    MAX_REVENUE_PERIODS, REVENUE_INTERVALS, SALES_RANKINGS, SALES_WINDOWS, ZERO, cached_dashboard_summary,
+    customer_order_totals, order_statistics, revenue_series, sales_ranking,
+)
+from .pagination import CursorPaginationMixin, StandardPagination
+from .response_cache import CachedResponseMixin, cache_stats
+from .search import ProductSearchFilter
 
 
 class AdminPermission(IsAuthenticated):
@@ -22,7 +40,8 @@ class AdminPermission(IsAuthenticated):
         return super().has_permission(request, view) and request.user.is_staff
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = (Category,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AdminPermission]
@@ -32,70 +51,64 @@ class CategoryViewSet(viewsets.ModelViewSet):
     ordering = ['name']
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = (Product, ProductImage, Category)
     queryset = Product.objects.select_related('category').prefetch_related('productimage_set')
     serializer_class = ProductSerializer
     permission_classes = [AdminPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'is_featured', 'is_new_arrival', 'is_best_seller']
-    search_fields = ['name', 'sku', 'description']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
+    filterset_fields = ['category', 'is_featured', 'is_new_arrival', 'is_best_seller', 'status']
     ordering_fields = ['name', 'regular_price', 'id']
     ordering = ['-id']
 
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
-        """Bulk update products (feature, unfeature, etc.)"""
+        """Bulk update flags, status, category and prices of many products"""
         serializer = ProductBulkUpdateSerializer(data=request.data)
         if serializer.is_valid():
-            ids = serializer.validated_data['ids']
-            products = Product.objects.filter(id__in=ids)
-            
-            update_fields = {}
-            if 'is_featured' in serializer.validated_data:
-                update_fields['is_featured'] = serializer.validated_data['is_featured']
-            if 'is_new_arrival' in serializer.validated_data:
-                update_fields['is_new_arrival'] = serializer.validated_data['is_new_arrival']
-            if 'is_best_seller' in serializer.validated_data:
-                update_fields['is_best_seller'] = serializer.validated_data['is_best_seller']
-            
-            products.update(**update_fields)
-            return Response({'message': f'Updated {products.count()} products'})
+            changes = dict(serializer.validated_data)
+            ids = changes.pop('ids')
+            sale_prices = changes.pop('sale_prices', None)
+            updated, requested = update_products(ids, changes, sale_prices)
+            return Response({'message': f'Updated {updated} products', 'updated': updated, 'requested': requested})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def import_file(self, request):
+        """Create or update products by sku from an uploaded CSV, JSON or NDJSON file"""
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or guess_format(upload.name)
+        if file_format not in ('csv', 'json', 'ndjson'):
+            return Response(
+                {'error': 'Upload a .csv, .json or .ndjson file, or set file_format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = import_products(read_rows(upload, file_format))
+        except ValueError as error:
+            # Chunks before the unreadable part are already saved; re-importing is safe
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_images(self, request, pk=None):
         """Upload images for a product"""
-        try:
-            product = self.get_object()
-            uploaded_images = []
-            
-            files = request.FILES.getlist('images')
-            is_main = request.data.get('is_main', 'false').lower() == 'true'
-            
-            if not files:
-                return Response({'error': 'No images provided'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            for i, file in enumerate(files):
-                product_image = ProductImage.objects.create(
-                    product=product,
-                    image=file,
-                    is_main=is_main and i == 0
-                )
-                
-                if product_image.is_main:
-                    ProductImage.objects.filter(
-                        product=product, is_main=True
-                    ).exclude(id=product_image.id).update(is_main=False)
-                
-                uploaded_images.append({
-                    'id': product_image.id,
-                    'url': product_image.image.url,
-                    'is_main': product_image.is_main
-                })
-            
-            return Response({'success': True, 'images': uploaded_images})
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        product = self.get_object()
+        files = request.FILES.getlist('images')
+        is_main = request.data.get('is_main', 'false').lower() == 'true'
+        
+        if not files:
+            return Response({'error': 'No images provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = upload_batch(product, files, is_main)
+        uploaded = [result for result in results if result['success']]
+        return Response(
+            {'success': len(uploaded) == len(results), 'images': uploaded, 'results': results},
+            status=status.HTTP_200_OK if uploaded else status.HTTP_502_BAD_GATEWAY
+        )
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
@@ -112,15 +125,21 @@ class ProductViewSet(viewsets.ModelViewSet):
 
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.select_related('user').prefetch_related('orderitem_set__product')
+class OrderViewSet(ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.select_related('user').prefetch_related(
+        'orderitem_set__product', 'shippingaddress_set'
+    )
+    # Item and address writes touch the order itself; product and customer names are nested
+    cache_models = (Product, CustomUser)
     serializer_class = OrderSerializer
     permission_classes = [AdminPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, DateRangeFilter, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['order_status', 'order_type', 'complete']
+    date_range_field = 'date_ordered'
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'transaction_id', 'contact_value']
     ordering_fields = ['date_ordered', 'id', 'total_amount']
     ordering = ['-date_ordered']
+    cursor_ordering = ('-date_ordered', 'id')
 
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
@@ -128,52 +147,130 @@ class OrderViewSet(viewsets.ModelViewSet):
         order = self.get_object()
         serializer = OrderStatusUpdateSerializer(data=request.data)
         if serializer.is_valid():
-            status = serializer.validated_data['status']
-            order.order_status = status
-            
-            # Update complete field based on status
-            if status == 'completed':
-                order.complete = True
-            elif status in ['pending', 'confirmed']:
-                order.complete = False
-            
-            order.save()
-            return Response({'message': f'Order status updated to {status}'})
+            new_status = serializer.validated_data['status']
+            if not order.can_change_status(new_status):
+                return Response(
+                    {'error': f'A {order.order_status} order cannot be changed to {new_status}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            order.order_status = new_status
+            order.complete = new_status == 'completed'
+            # Signals keep the rollups and live dashboards in step
+            order.save(update_fields=['order_status', 'complete', 'updated_at'])
+            return Response({'message': f'Order status updated to {new_status}'})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def batch_status(self, request):
+        """Move many orders to one status; reports the outcome for every id"""
+        serializer = OrderBatchStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        new_status = serializer.validated_data['status']
+        outcomes = transition_orders(serializer.validated_data['ids'], new_status)
+        return Response({
+            'status': new_status,
+            'updated': sum(1 for outcome, _ in outcomes.values() if outcome == 'updated'),
+            'results': [
+                {'id': pk, 'outcome': outcome, 'previous_status': previous}
+                for pk, (outcome, previous) in outcomes.items()
+            ],
+        })
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get order statistics"""
-        stats = {
-            'total_orders': Order.objects.count(),
-            'pending_orders': Order.objects.filter(order_status='pending').count(),
-            'confirmed_orders': Order.objects.filter(order_status='confirmed').count(),
-            'completed_orders': Order.objects.filter(order_status='completed').count(),
-            'cancelled_orders': Order.objects.filter(order_status='cancelled').count(),
-            'whatsapp_orders': Order.objects.filter(order_type='whatsapp').count(),
-            'email_orders': Order.objects.filter(order_type='email').count(),
-            'total_revenue': sum([order.total_amount or order.get_cart_total for order in Order.objects.filter(order_status='completed')]),
-        }
-        return Response(stats)
+        return Response(order_statistics())
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered orders as CSV (default) or NDJSON (?export_format=ndjson)"""
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'export_format': f'Choose one of: {", ".join(EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class CustomerViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = CustomUser.objects.filter(is_staff=False).select_related('userprofile')
-    serializer_class = CustomUserSerializer
+        lines = export_lines(self.filter_queryset(self.get_queryset()), export_format)
+        size = settings.ORDER_EXPORT_ROWS_PER_WRITE
+        if isinstance(request._request, ASGIRequest):
+            content = async_batched(lines, size)
+        else:
+            content = batched(lines, size)
+
+        extension = 'csv' if export_format == 'csv' else 'ndjson'
+        filename = f'orders-{timezone.localtime():%Y%m%d-%H%M}.{extension}'
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class CustomerViewSet(CursorPaginationMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = CustomUser.objects.filter(is_staff=False).select_related('userprofile', 'stats').alias(
+        lifetime_value=F('stats__lifetime_value')
+    )
+    serializer_class = CustomerSerializer
     permission_classes = [AdminPermission]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = CustomerFilter
     search_fields = ['email', 'first_name', 'last_name', 'username']
-    ordering_fields = ['date_joined', 'email']
+    ordering_fields = ['date_joined', 'email', 'lifetime_value', 'order_count', 'total_spent', 'last_order_at']
     ordering = ['-date_joined']
+    cursor_ordering = ('-date_joined', 'id')
+    # Latest reviews returned by overview
+    overview_reviews = 20
+    # Actions that serialize customers with their order figures; the rest only look one up
+    order_total_actions = ('list', 'retrieve', 'overview')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.order_total_actions:
+            queryset = customer_order_totals(queryset)
+        return queryset
 
     @action(detail=True, methods=['get'])
     def orders(self, request, pk=None):
         """Get customer's orders"""
         customer = self.get_object()
-        orders = Order.objects.filter(user=customer).order_by('-date_ordered')
+        orders = Order.objects.filter(user=customer).select_related('user').prefetch_related(
+            'orderitem_set__product', 'shippingaddress_set'
+        ).order_by('-date_ordered')
         serializer = OrderSerializer(orders, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def overview(self, request, pk=None):
+        """
+        Profile, order statistics, one page of recent orders and the latest
+        reviews of a customer, in six queries however long their history.
+        The statistics' order count doubles as the page count.
+        """
+        customer = self.get_object()
+        orders = Order.objects.filter(user=customer)
+        stats = order_statistics(orders)
+
+        self.known_count = stats['total_orders']
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(
+            orders.select_related('user').prefetch_related(
+                Prefetch('orderitem_set', queryset=OrderItem.objects.select_related('product')),
+                'shippingaddress_set',
+            ).order_by('-date_ordered', '-id'),
+            request, view=self,
+        )
+        reviews = Review.objects.filter(user=customer).select_related('user', 'product').order_by(
+            '-created_at'
+        )[:self.overview_reviews]
+
+        return Response({
+            'customer': self.get_serializer(customer).data,
+            'stats': stats,
+            'orders': paginator.get_paginated_response(OrderSerializer(page, many=True).data).data,
+            'reviews': ReviewSerializer(reviews, many=True).data,
+        })
+
     @action(detail=True, methods=['patch'])
     def toggle_active(self, request, pk=None):
         """Activate/deactivate customer"""
@@ -183,8 +280,9 @@ class CustomerViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({'message': f'Customer {"activated" if customer.is_active else "deactivated"}'})
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Review.objects.select_related('user', 'product')
+    cache_models = (Product, CustomUser)
     serializer_class = ReviewSerializer
     permission_classes = [AdminPermission]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -192,6 +290,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
     search_fields = ['user__email', 'product__name', 'comment']
     ordering_fields = ['created_at', 'rating']
     ordering = ['-created_at']
+    cursor_ordering = ('-created_at', 'id')
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -201,31 +300,99 @@ class DashboardViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def overview(self, request):
         """Get dashboard overview statistics"""
+        orders = DailyOrderMetrics.objects.aggregate(
+            total_orders=Coalesce(Sum('order_count'), 0),
+            completed_orders=Coalesce(Sum('order_count', filter=Q(order_status='completed')), 0),
+            pending_orders=Coalesce(Sum('order_count', filter=Q(order_status='pending')), 0),
+            total_revenue=Coalesce(Sum('revenue', filter=Q(order_status='completed')), ZERO),
+        )
+        products = Product.objects.aggregate(
+            total_products=Count('id'),
+            featured_products=Count('id', filter=Q(is_featured=True)),
+        )
         stats = {
-            'total_products': Product.objects.count(),
-            'total_orders': Order.objects.count(),
+            'total_products': products['total_products'],
+            'total_orders': orders['total_orders'],
             'total_customers': CustomUser.objects.filter(is_staff=False).count(),
             'total_reviews': Review.objects.count(),
-            'completed_orders': Order.objects.filter(complete=True).count(),
-            'pending_orders': Order.objects.filter(complete=False).count(),
-            'featured_products': Product.objects.filter(is_featured=True).count(),
-            'total_revenue': sum([order.get_cart_total for order in Order.objects.filter(complete=True)]),
+            'completed_orders': orders['completed_orders'],
+            'pending_orders': orders['pending_orders'],
+            'featured_products': products['featured_products'],
+            'total_revenue': orders['total_revenue'],
         }
         return Response(stats)
 
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Everything the dashboard page shows, from a short-lived cache"""
+        return Response(cached_dashboard_summary())
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Hit/miss counters of the catalog response cache"""
+        return Response(cache_stats(['category', 'product']))
+
     @action(detail=False, methods=['get'])
     def recent_orders(self, request):
         """Get recent orders"""
-        orders = Order.objects.select_related('user').order_by('-date_ordered')[:10]
+        orders = Order.objects.select_related('user').prefetch_related(
+            'orderitem_set__product', 'shippingaddress_set'
+        ).order_by('-date_ordered')[:10]
         serializer = OrderSerializer(orders, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def revenue(self, request):
+        """Revenue, orders and average order value per ?interval=day|week|month, optionally for one ?order_type"""
+        interval = request.query_params.get('interval', 'day')
+        order_type = request.query_params.get('order_type') or None
+        periods = request.query_params.get('periods')
+        try:
+            periods = int(periods) if periods else None
+        except ValueError:
+            periods = 0
+        order_types = dict(Order.ORDER_TYPE_CHOICES)
+        if (interval not in REVENUE_INTERVALS or (order_type and order_type not in order_types)
+                or (periods is not None and not 1 <= periods <= MAX_REVENUE_PERIODS)):
+            return Response({
+                'error': f'interval must be one of {", ".join(REVENUE_INTERVALS)}, '
+                         f'order_type one of {", ".join(order_types)}, '
+                         f'and periods between 1 and {MAX_REVENUE_PERIODS}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'interval': interval,
+            'order_type': order_type,
+            'results': revenue_series(interval, periods, order_type),
+        })
+
     @action(detail=False, methods=['get'])
     def top_products(self, request):
-        """Get top selling products"""
-        # This would need OrderItem data to be accurate
-        products = Product.objects.annotate(
-            order_count=Count('orderitem')
-        ).order_by('-order_count')[:5]
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        """Best sellers over ?days=7|30|90, ranked ?rank_by=units|revenue|orders, from the sales rollup"""
+        try:
+            days = int(request.query_params.get('days', 30))
+            limit = int(request.query_params.get('limit', 5))
+        except ValueError:
+            days = limit = None
+        rank_by = request.query_params.get('rank_by', 'units')
+        if days not in SALES_WINDOWS or rank_by not in SALES_RANKINGS or not limit or not 1 <= limit <= 50:
+            return Response({
+                'error': f'days must be one of {", ".join(map(str, SALES_WINDOWS))}, '
+                         f'rank_by one of {", ".join(SALES_RANKINGS)}, and limit between 1 and 50'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        ranking = list(sales_ranking(days, rank_by)[:limit])
+        products = Product.objects.select_related('category').prefetch_related('productimage_set').in_bulk(
+            [row['product_id'] for row in ranking]
+        )
+        results = []
+        for row in ranking:
+            data = ProductSerializer(products[row['product_id']]).data
+            data['sales'] = {
+                'days': days,
+                'units': row['total_units'],
+                'revenue': row['total_revenue'],
+                'orders': row['total_orders'],
+            }
+            results.append(data)
+        return Response(results)
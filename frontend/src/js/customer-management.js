@@ -36,6 +36,16 @@ class CustomerManager {
             });
         }
 
+        // Sorting by order figures
+        const sortSelect = document.getElementById('customerSort');
+        if (sortSelect) {
+            sortSelect.addEventListener('change', (e) => {
+                this.currentFilters.ordering = e.target.value;
+                this.currentPage = 1;
+                this.loadCustomers();
+            });
+        }
+
         // Refresh button
         const refreshBtn = document.getElementById('refreshCustomers');
         if (refreshBtn) {
@@ -88,7 +98,7 @@ class CustomerManager {
                     </td>
                     <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-300">${customer.email}</td>
                     <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-300">${customer.order_count || 0}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-white font-medium">₹${(customer.total_spent || 0).toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-white font-medium">₹${parseFloat(customer.total_spent || 0).toFixed(2)}</td>
                     <td class="px-6 py-4 whitespace-nowrap">
                         <span class="px-2 py-1 text-xs rounded-full ${
                             customer.is_active ? 'bg-green-500/20 text-green-400' : 'bg-red-500/20 text-red-400'
@@ -137,7 +147,7 @@ class CustomerManager {
                         </div>
                         <div>
                             <span class="text-gray-400">Spent:</span>
-                            <span class="text-white font-medium ml-1">₹${(customer.total_spent || 0).toFixed(2)}</span>
+                            <span class="text-white font-medium ml-1">₹${parseFloat(customer.total_spent || 0).toFixed(2)}</span>
                         </div>
                     </div>
                     <div class="flex gap-2">
@@ -197,34 +207,25 @@ class CustomerManager {
         });
     }
 
-    async viewCustomerProfile(customerId) {
+    async viewCustomerProfile(customerId, page = 1) {
         try {
-            const [customerResponse, ordersResponse] = await Promise.all([
-                fetch(`${this.apiBaseUrl}/customers/${customerId}/`, {
-                    headers: {
-                        'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
-                        'Content-Type': 'application/json'
-                    }
-                }),
-                fetch(`${this.apiBaseUrl}/customers/${customerId}/orders/`, {
-                    headers: {
-                        'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
-                        'Content-Type': 'application/json'
-                    }
-                })
-            ]);
-
-            if (customerResponse.ok && ordersResponse.ok) {
-                const customer = await customerResponse.json();
-                const orders = await ordersResponse.json();
-                this.showCustomerProfileModal(customer, orders);
+            const response = await fetch(`${this.apiBaseUrl}/customers/${customerId}/overview/?page=${page}`, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
+                    'Content-Type': 'application/json'
+                }
+            });
+
+            if (response.ok) {
+                const data = await response.json();
+                this.showCustomerProfileModal(data.customer, data.orders, data.stats, page);
             }
         } catch (error) {
             console.error('Error loading customer profile:', error);
         }
     }
 
-    showCustomerProfileModal(customer, orders) {
+    showCustomerProfileModal(customer, orders, stats, page) {
         const modal = document.getElementById('customerModal');
         const modalContent = document.getElementById('customerModalContent');
         
@@ -265,10 +266,10 @@ class CustomerManager {
                         <div>
                             <h4 class="font-medium text-gray-900 mb-3">Order Summary</h4>
                             <div class="space-y-2">
-                                <p><strong>Total Orders:</strong> ${orders.length}</p>
-                                <p><strong>Total Spent:</strong> ₹${orders.reduce((sum, order) => sum + parseFloat(order.get_cart_total), 0).toFixed(2)}</p>
-                                <p><strong>Average Order:</strong> ₹${orders.length > 0 ? (orders.reduce((sum, order) => sum + parseFloat(order.get_cart_total), 0) / orders.length).toFixed(2) : '0.00'}</p>
-                                <p><strong>Last Order:</strong> ${orders.length > 0 ? new Date(orders[0].date_ordered).toLocaleDateString() : 'No orders'}</p>
+                                <p><strong>Total Orders:</strong> ${stats.total_orders}</p>
+                                <p><strong>Total Spent:</strong> ₹${parseFloat(stats.completed_revenue).toFixed(2)}</p>
+                                <p><strong>Average Order:</strong> ₹${parseFloat(stats.average_order_value).toFixed(2)}</p>
+                                <p><strong>Last Order:</strong> ${customer.last_order_at ? new Date(customer.last_order_at).toLocaleDateString() : 'No orders'}</p>
                             </div>
                         </div>
                     </div>
@@ -287,7 +288,7 @@ class CustomerManager {
                                     </tr>
                                 </thead>
                                 <tbody class="bg-white divide-y divide-gray-200">
-                                    ${orders.map(order => `
+                                    ${orders.results.map(order => `
                                         <tr>
                                             <td class="px-4 py-2 text-sm text-gray-900">#${order.id}</td>
                                             <td class="px-4 py-2 text-sm text-gray-500">${new Date(order.date_ordered).toLocaleDateString()}</td>
@@ -297,7 +298,7 @@ class CustomerManager {
                                                 <span class="px-2 py-1 text-xs rounded-full ${
                                                     order.complete ? 'bg-green-100 text-green-800' : 'bg-yellow-100 text-yellow-800'
                                                 }">
-                                                    ${order.status}
+                                                    ${order.order_status}
                                                 </span>
                                             </td>
                                         </tr>
@@ -305,6 +306,13 @@ class CustomerManager {
                                 </tbody>
                             </table>
                         </div>
+                        <div class="flex justify-between items-center mt-3 text-sm text-gray-500">
+                            <span>Page ${page} of ${Math.max(1, Math.ceil(orders.count / 20))}</span>
+                            <div class="space-x-2">
+                                ${orders.previous ? `<button onclick="customerManager.viewCustomerProfile(${customer.id}, ${page - 1})" class="px-3 py-1 border border-gray-300 rounded">Previous</button>` : ''}
+                                ${orders.next ? `<button onclick="customerManager.viewCustomerProfile(${customer.id}, ${page + 1})" class="px-3 py-1 border border-gray-300 rounded">Next</button>` : ''}
+                            </div>
+                        </div>
                     </div>
                 </div>
                 
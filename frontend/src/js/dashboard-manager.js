@@ -1,130 +1,151 @@
 class DashboardManager {
     constructor() {
         this.apiBaseUrl = '/api';
+        this.summary = null;
+        this.liveConnected = false;
+        this.liveRetryMs = 5000;
+        this.lastFullLoad = 0;
         this.init();
     }
 
     init() {
         this.loadDashboardData();
-        setInterval(() => this.loadDashboardData(), 30000);
+        // Polling is the fallback while the live stream is down; when it is up, resync every 5 minutes
+        setInterval(() => {
+            if (!this.liveConnected || Date.now() - this.lastFullLoad > 300000) {
+                this.loadDashboardData();
+            }
+        }, 30000);
+        this.connectLiveUpdates();
     }
 
     async loadDashboardData() {
         try {
-            await Promise.all([
-                this.loadCustomerStats(),
-                this.loadOrderStats(),
-                this.loadProductStats(),
-                this.loadRevenueStats(),
-                this.loadTopProducts(),
-                this.loadQuickStats()
-            ]);
-        } catch (error) {
-            console.error('Error loading dashboard data:', error);
-        }
-    }
-
-    async loadCustomerStats() {
-        try {
-            const response = await fetch(`${this.apiBaseUrl}/customers/`, {
+            const response = await fetch(`${this.apiBaseUrl}/dashboard/summary/`, {
                 headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
             });
             if (response.ok) {
-                const data = await response.json();
-                document.getElementById('totalCustomers').textContent = data.count || data.length || 0;
+                this.renderSummary(await response.json());
             }
         } catch (error) {
-            console.error('Error loading customer stats:', error);
+            console.error('Error loading dashboard data:', error);
         }
     }
 
-    async loadOrderStats() {
-        try {
-            const response = await fetch(`${this.apiBaseUrl}/orders/statistics/`, {
-                headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-            });
-            if (response.ok) {
-                const stats = await response.json();
-                document.getElementById('totalOrders').textContent = stats.total_orders || 0;
-                
-                // Today's orders - filter by today's date
-                const today = new Date().toISOString().split('T')[0];
-                const todayOrdersResponse = await fetch(`${this.apiBaseUrl}/orders/?date_ordered__date=${today}`, {
-                    headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-                });
-                if (todayOrdersResponse.ok) {
-                    const todayData = await todayOrdersResponse.json();
-                    document.querySelector('[data-metric="today-orders"]').textContent = todayData.count || 0;
-                }
-                
-                document.querySelector('[data-metric="pending"]').textContent = stats.pending_orders || 0;
-                
-                // Update revenue breakdown
-                document.getElementById('completedRevenue').textContent = `₹${parseFloat(stats.completed_revenue || 0).toFixed(2)}`;
-                document.getElementById('pendingRevenue').textContent = `₹${parseFloat(stats.pending_revenue || 0).toFixed(2)}`;
-                document.getElementById('averageOrder').textContent = `₹${parseFloat(stats.average_order_value || 0).toFixed(2)}`;
-                
-                // Update order status bars with confirmed
-                const total = stats.total_orders || 1;
-                const completedPercent = Math.round((stats.completed_orders || 0) / total * 100);
-                const confirmedPercent = Math.round((stats.confirmed_orders || 0) / total * 100);
-                const pendingPercent = Math.round((stats.pending_orders || 0) / total * 100);
-                
-                document.getElementById('completedBar').style.width = `${completedPercent}%`;
-                document.getElementById('confirmedBar').style.width = `${confirmedPercent}%`;
-                document.getElementById('pendingBar').style.width = `${pendingPercent}%`;
-                document.getElementById('completedPercent').textContent = `${completedPercent}%`;
-                document.getElementById('confirmedPercent').textContent = `${confirmedPercent}%`;
-                document.getElementById('pendingPercent').textContent = `${pendingPercent}%`;
-            }
-        } catch (error) {
-            console.error('Error loading order stats:', error);
-        }
+    renderSummary(summary) {
+        this.summary = summary;
+        this.lastFullLoad = Date.now();
+        this.renderOrderStats(summary);
+        this.renderQuickStats(summary);
+        this.renderTopProducts(summary.top_products || []);
     }
 
-    async loadProductStats() {
+    async connectLiveUpdates() {
         try {
-            const response = await fetch(`${this.apiBaseUrl}/products/`, {
-                headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
+            const response = await fetch(`${this.apiBaseUrl}/dashboard/events/`, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
+                    'Accept': 'text/event-stream'
+                }
             });
-            if (response.ok) {
-                const data = await response.json();
-                document.getElementById('totalProducts').textContent = data.count || 0;
-                
-                const lowStockCount = data.results ? data.results.filter(p => p.stock_quantity < 10).length : 0;
-                document.querySelector('[data-metric="low-stock"]').textContent = lowStockCount;
+            if ([401, 403, 501].includes(response.status)) {
+                return; // Not allowed, or not served over ASGI: stay on polling
+            }
+            if (!response.ok || !response.body) {
+                throw new Error(`Event stream responded with HTTP ${response.status}`);
+            }
+
+            this.liveConnected = true;
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                const frames = buffer.split('\n\n');
+                buffer = frames.pop();
+                frames.forEach(frame => this.handleLiveFrame(frame));
             }
         } catch (error) {
-            console.error('Error loading product stats:', error);
+            console.warn('Live dashboard updates unavailable, polling instead:', error);
         }
+        this.liveConnected = false;
+        setTimeout(() => this.connectLiveUpdates(), this.liveRetryMs);
     }
 
-    async loadRevenueStats() {
-        try {
-            const response = await fetch(`${this.apiBaseUrl}/orders/statistics/`, {
-                headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-            });
-            if (response.ok) {
-                const stats = await response.json();
-                document.getElementById('totalRevenue').textContent = `₹${parseFloat(stats.total_revenue || 0).toFixed(2)}`;
-                document.querySelector('[data-metric="today-revenue"]').textContent = `₹${parseFloat(stats.today_revenue || 0).toFixed(2)}`;
+    handleLiveFrame(frame) {
+        const dataLines = [];
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('retry:')) {
+                this.liveRetryMs = parseInt(line.slice(6), 10) || this.liveRetryMs;
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
             }
-        } catch (error) {
-            console.error('Error loading revenue stats:', error);
+        });
+        if (dataLines.length === 0) return; // keep-alive comment
+
+        const event = JSON.parse(dataLines.join('\n'));
+        if (event.type === 'snapshot') {
+            this.renderSummary(event.summary);
+        } else if (event.deltas && this.summary) {
+            this.applyDeltas(event.deltas);
+        } else {
+            this.scheduleResync();
         }
     }
 
-    async loadTopProducts() {
-        try {
-            const response = await fetch(`${this.apiBaseUrl}/products/?is_best_seller=true&page_size=5`, {
-                headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-            });
-            if (response.ok) {
-                const data = await response.json();
-                this.renderTopProducts(data.results || []);
-            }
-        } catch (error) {
-            console.error('Error loading top products:', error);
+    applyDeltas(deltas) {
+        Object.entries(deltas).forEach(([name, delta]) => {
+            this.summary[name] = parseFloat(this.summary[name] || 0) + parseFloat(delta);
+        });
+        const completed = this.summary.completed_orders || 0;
+        this.summary.average_order_value = completed ? this.summary.completed_revenue / completed : 0;
+        this.renderOrderStats(this.summary);
+    }
+
+    scheduleResync() {
+        // Several changes often arrive together, e.g. an order and its items
+        clearTimeout(this.resyncTimer);
+        this.resyncTimer = setTimeout(() => this.loadDashboardData(), 1000);
+    }
+
+    formatCurrency(value) {
+        return `₹${parseFloat(value || 0).toFixed(2)}`;
+    }
+
+    renderOrderStats(stats) {
+        document.getElementById('totalOrders').textContent = stats.total_orders || 0;
+        document.querySelector('[data-metric="today-orders"]').textContent = stats.today_orders || 0;
+        document.querySelector('[data-metric="pending"]').textContent = stats.pending_orders || 0;
+
+        document.getElementById('totalRevenue').textContent = this.formatCurrency(stats.total_revenue);
+        document.querySelector('[data-metric="today-revenue"]').textContent = this.formatCurrency(stats.today_revenue);
+        document.getElementById('completedRevenue').textContent = this.formatCurrency(stats.completed_revenue);
+        document.getElementById('pendingRevenue').textContent = this.formatCurrency(stats.pending_revenue);
+        document.getElementById('averageOrder').textContent = this.formatCurrency(stats.average_order_value);
+
+        // Update order status bars with confirmed
+        const total = stats.total_orders || 1;
+        const completedPercent = Math.round((stats.completed_orders || 0) / total * 100);
+        const confirmedPercent = Math.round((stats.confirmed_orders || 0) / total * 100);
+        const pendingPercent = Math.round((stats.pending_orders || 0) / total * 100);
+
+        document.getElementById('completedBar').style.width = `${completedPercent}%`;
+        document.getElementById('confirmedBar').style.width = `${confirmedPercent}%`;
+        document.getElementById('pendingBar').style.width = `${pendingPercent}%`;
+        document.getElementById('completedPercent').textContent = `${completedPercent}%`;
+        document.getElementById('confirmedPercent').textContent = `${confirmedPercent}%`;
+        document.getElementById('pendingPercent').textContent = `${pendingPercent}%`;
+    }
+
+    renderQuickStats(stats) {
+        document.getElementById('totalCustomers').textContent = stats.total_customers || 0;
+        document.getElementById('totalProducts').textContent = stats.total_products || 0;
+        document.getElementById('totalCategories').textContent = stats.total_categories || 0;
+        document.getElementById('totalReviews').textContent = stats.total_reviews || 0;
+        document.getElementById('totalImages').textContent = stats.total_images || 0;
+        if (stats.average_rating !== null && stats.average_rating !== undefined) {
+            document.getElementById('avgRating').textContent = `${parseFloat(stats.average_rating).toFixed(1)}★`;
         }
     }
 
@@ -138,51 +159,13 @@ class DashboardManager {
                     <div class="w-8 h-8 sm:w-10 sm:h-10 bg-[#b48cf2] bg-opacity-10 rounded-lg"></div>
                     <div>
                         <div class="text-white text-xs sm:text-sm font-medium">${product.name}</div>
-                        <div class="text-gray-500 text-xs">Stock: ${product.stock_quantity || 0}</div>
+                        <div class="text-gray-500 text-xs">${product.units_sold ? `${product.units_sold} sold in 30 days` : 'Best seller'}</div>
                     </div>
                 </div>
-                <div class="text-green-500 text-xs sm:text-sm font-semibold">₹${parseFloat(product.regular_price || 0).toFixed(2)}</div>
+                <div class="text-green-500 text-xs sm:text-sm font-semibold">${this.formatCurrency(product.sale_price || product.regular_price)}</div>
             </div>
         `).join('') || '<div class="text-gray-500 text-sm">No products found</div>';
     }
-
-    async loadQuickStats() {
-        try {
-            const [categoriesRes, reviewsRes, imagesRes] = await Promise.all([
-                fetch(`${this.apiBaseUrl}/categories/`, {
-                    headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-                }),
-                fetch(`${this.apiBaseUrl}/reviews/`, {
-                    headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-                }),
-                fetch(`${this.apiBaseUrl}/product-images/`, {
-                    headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
-                })
-            ]);
-
-            if (categoriesRes.ok) {
-                const categories = await categoriesRes.json();
-                document.getElementById('totalCategories').textContent = categories.count || 0;
-            }
-
-            if (reviewsRes.ok) {
-                const reviews = await reviewsRes.json();
-                document.getElementById('totalReviews').textContent = reviews.count || 0;
-                
-                if (reviews.results && reviews.results.length > 0) {
-                    const avgRating = reviews.results.reduce((sum, review) => sum + (review.rating || 0), 0) / reviews.results.length;
-                    document.getElementById('avgRating').textContent = `${avgRating.toFixed(1)}★`;
-                }
-            }
-
-            if (imagesRes.ok) {
-                const images = await imagesRes.json();
-                document.getElementById('totalImages').textContent = images.count || 0;
-            }
-        } catch (error) {
-            console.error('Error loading quick stats:', error);
-        }
-    }
 }
 
 document.addEventListener('DOMContentLoaded', () => {
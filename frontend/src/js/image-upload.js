@@ -15,6 +15,9 @@ async function uploadProductImage(productId, imageFile, isMain) {
         }
         
         const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error || 'Upload failed');
+        }
         return data;
     } catch (error) {
         console.error('Upload failed:', error);
@@ -22,6 +25,23 @@ async function uploadProductImage(productId, imageFile, isMain) {
     }
 }
 
+// Uploads finish in the background; poll until the image store has the file
+async function waitForImageUpload(statusUrl, { interval = 1500, timeout = 120000 } = {}) {
+    const deadline = Date.now() + timeout;
+    while (Date.now() < deadline) {
+        const response = await fetch(statusUrl);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        const data = await response.json();
+        if (data.status !== 'pending') {
+            return data;
+        }
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+    throw new Error('Timed out waiting for image upload');
+}
+
 class ImageUploader {
     constructor() {
         this.setupEventListeners();
@@ -98,17 +118,19 @@ class ImageUploader {
 
     async uploadImages(productId) {
         try {
+            const uploads = [];
             const mainImageFile = document.getElementById('mainImage')?.files[0];
             if (mainImageFile) {
-                await uploadProductImage(productId, mainImageFile, true);
+                uploads.push(await uploadProductImage(productId, mainImageFile, true));
             }
 
             const subImageFiles = document.getElementById('subImages')?.files;
             if (subImageFiles) {
                 for (const file of subImageFiles) {
-                    await uploadProductImage(productId, file, false);
+                    uploads.push(await uploadProductImage(productId, file, false));
                 }
             }
+            await this.waitForUploads(uploads);
         } catch (error) {
             console.error('Upload error:', error);
             throw error;
@@ -117,23 +139,35 @@ class ImageUploader {
 
     async uploadEditImages(productId) {
         try {
+            const uploads = [];
             const editMainImageFile = document.getElementById('editMainImage')?.files[0];
             if (editMainImageFile) {
-                await uploadProductImage(productId, editMainImageFile, true);
+                uploads.push(await uploadProductImage(productId, editMainImageFile, true));
             }
 
             const editSubImageFiles = document.getElementById('editSubImages')?.files;
             if (editSubImageFiles) {
                 for (const file of editSubImageFiles) {
-                    await uploadProductImage(productId, file, false);
+                    uploads.push(await uploadProductImage(productId, file, false));
                 }
             }
+            await this.waitForUploads(uploads);
         } catch (error) {
             console.error('Edit upload error:', error);
             throw error;
         }
     }
 
+    // Staged uploads reach the image store in the background; throw if any of them failed
+    async waitForUploads(uploads) {
+        const results = await Promise.all(uploads.map(upload => waitForImageUpload(upload.status_url)));
+        const failed = results.filter(result => result.status === 'failed');
+        if (failed.length) {
+            throw new Error(`${failed.length} of ${results.length} images failed to upload: ${failed[0].error}`);
+        }
+        return results;
+    }
+
     clearPreviews() {
         ['mainImagePreview', 'subImagesPreview', 'editMainImagePreview', 'editSubImagesPreview'].forEach(id => {
             const preview = document.getElementById(id);
@@ -45,6 +45,24 @@ class OrderManagement {
             });
         }
 
+        // Date range filters
+        [['dateFromFilter', 'date_from'], ['dateToFilter', 'date_to']].forEach(([id, param]) => {
+            const input = document.getElementById(id);
+            if (input) {
+                input.addEventListener('change', (e) => {
+                    this.currentFilters[param] = e.target.value;
+                    this.currentPage = 1;
+                    this.loadOrders();
+                });
+            }
+        });
+
+        // Export button
+        const exportBtn = document.getElementById('exportOrders');
+        if (exportBtn) {
+            exportBtn.addEventListener('click', () => this.exportOrders());
+        }
+
         // Refresh button
         const refreshBtn = document.getElementById('refreshOrders');
         if (refreshBtn) {
@@ -96,6 +114,40 @@ class OrderManagement {
         }
     }
 
+    async exportOrders() {
+        const exportBtn = document.getElementById('exportOrders');
+        try {
+            if (exportBtn) exportBtn.disabled = true;
+            const filters = Object.fromEntries(
+                Object.entries(this.currentFilters).filter(([, value]) => value)
+            );
+            const params = new URLSearchParams({ ...filters, export_format: 'csv' });
+
+            const response = await window.adminRoutes.makeAuthenticatedRequest(
+                `${this.apiBaseUrl}/orders/export/?${params}`
+            );
+            if (!response.ok) {
+                throw new Error('Failed to export orders');
+            }
+
+            const disposition = response.headers.get('Content-Disposition') || '';
+            const match = disposition.match(/filename="([^"]+)"/);
+            const url = URL.createObjectURL(await response.blob());
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = match ? match[1] : 'orders.csv';
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+            URL.revokeObjectURL(url);
+        } catch (error) {
+            console.error('Error exporting orders:', error);
+            this.showError('Failed to export orders');
+        } finally {
+            if (exportBtn) exportBtn.disabled = false;
+        }
+    }
+
     renderOrders(orders) {
         const tbody = document.getElementById('ordersTableBody');
         const cardContainer = document.getElementById('ordersCardContainer');
@@ -590,22 +642,31 @@ class OrderManagement {
         if (!confirm(`${actionText.charAt(0).toUpperCase() + actionText.slice(1)} ${orderIds.length} selected orders?`)) return;
 
         try {
-            let successCount = 0;
-            for (const orderId of orderIds) {
-                const response = await window.adminRoutes.makeAuthenticatedRequest(
-                    `${this.apiBaseUrl}/orders/${orderId}/update_status/`,
-                    {
-                        method: 'PATCH',
-                        body: JSON.stringify({ status: action === 'confirm' ? 'confirmed' : action === 'complete' ? 'completed' : 'cancelled' })
-                    }
-                );
-                if (response.ok) successCount++;
-            }
+            const response = await window.adminRoutes.makeAuthenticatedRequest(
+                `${this.apiBaseUrl}/orders/batch_status/`,
+                {
+                    method: 'POST',
+                    body: JSON.stringify({
+                        ids: orderIds.map(Number),
+                        status: action === 'confirm' ? 'confirmed' : action === 'complete' ? 'completed' : 'cancelled'
+                    })
+                }
+            );
+            const result = await response.json();
+            const doneText = { confirm: 'confirmed', complete: 'completed', cancel: 'cancelled' }[actionText];
+            const skipped = result.results.filter(item => item.outcome === 'not_allowed' || item.outcome === 'not_found');
             
             this.selectedOrders.clear();
             this.loadOrders();
             this.loadOrderStatistics();
-            this.showSuccess(`${successCount} orders ${actionText}ed successfully`);
+            if (skipped.length) {
+                this.showError(
+                    `${result.updated} orders ${doneText}. Skipped: ` +
+                    skipped.map(item => `#${item.id} (${item.previous_status || 'not found'})`).join(', ')
+                );
+            } else {
+                this.showSuccess(`${result.updated} orders ${doneText} successfully`);
+            }
         } catch (error) {
             console.error('Bulk action failed:', error);
             this.showError('Bulk action failed');
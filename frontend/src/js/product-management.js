@@ -59,6 +59,19 @@ class ProductManager {
             addProductBtn.addEventListener('click', () => this.openAddProductModal());
         }
 
+        // Catalog import
+        const importBtn = document.getElementById('importProducts');
+        const importFile = document.getElementById('importProductsFile');
+        if (importBtn && importFile) {
+            importBtn.addEventListener('click', () => importFile.click());
+            importFile.addEventListener('change', (e) => {
+                if (e.target.files.length) {
+                    this.importProducts(e.target.files[0]);
+                    e.target.value = '';
+                }
+            });
+        }
+
         // Bulk operations
         const bulkActions = document.getElementById('bulkActions');
         if (bulkActions) {
@@ -161,9 +174,12 @@ class ProductManager {
                     <input type="checkbox" class="product-checkbox absolute top-3 left-3 z-10" 
                            data-product-id="${product.id}" 
                            ${this.selectedProducts.has(product.id) ? 'checked' : ''}>
-                    <img src="${product.main_image_url || 'https://placehold.co/400x300/1a1a1f/6b7280?text=No+Image'}" 
-                         alt="${product.name}" 
-                         class="w-full h-40 sm:h-48 object-contain">
+                    <picture>
+                        ${this.renderImageSources(product.main_image_srcset)}
+                        <img src="${product.main_image_url || 'https://placehold.co/400x300/1a1a1f/6b7280?text=No+Image'}" 
+                             alt="${product.name}" loading="lazy"
+                             class="w-full h-40 sm:h-48 object-contain">
+                    </picture>
                     <div class="absolute top-3 right-3 flex gap-2">
                         ${product.is_featured ? '<span class="bg-yellow-500 text-white text-xs px-2 py-1 rounded-full">Featured</span>' : ''}
                         ${product.is_new_arrival ? '<span class="bg-blue-500 text-white text-xs px-2 py-1 rounded-full">New</span>' : ''}
@@ -202,6 +218,15 @@ class ProductManager {
         this.attachProductEventListeners();
     }
 
+    renderImageSources(srcset) {
+        // AVIF first so browsers that support it skip the larger WebP
+        const sizes = '(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw';
+        return ['avif', 'webp']
+            .filter(format => srcset && srcset[format])
+            .map(format => `<source type="image/${format}" srcset="${srcset[format]}" sizes="${sizes}">`)
+            .join('');
+    }
+
     renderCategoryFilter(categories) {
         const categoryFilter = document.getElementById('categoryFilter');
         if (!categoryFilter) return;
@@ -281,6 +306,21 @@ class ProductManager {
                 case 'bestseller':
                     updateData.is_best_seller = true;
                     break;
+                case 'activate':
+                    updateData.status = 'active';
+                    break;
+                case 'deactivate':
+                    updateData.status = 'inactive';
+                    break;
+                case 'markdown': {
+                    const percent = parseFloat(prompt('Mark down the selected products by what percent of the regular price?'));
+                    if (!(percent > 0 && percent < 100)) return;
+                    updateData.markdown_percent = percent.toFixed(2);
+                    break;
+                }
+                case 'clear_sale':
+                    updateData.sale_price = null;
+                    break;
                 case 'delete':
                     if (!confirm(`Delete ${productIds.length} selected products?`)) return;
                     await this.bulkDeleteProducts(productIds);
@@ -298,7 +338,8 @@ class ProductManager {
             if (response.ok) {
                 this.selectedProducts.clear();
                 this.loadProducts();
-                this.showSuccess(`Bulk action completed successfully`);
+                const result = await response.json();
+                this.showSuccess(result.message || 'Bulk action completed successfully');
             }
         } catch (error) {
             console.error('Bulk action failed:', error);
@@ -502,7 +543,7 @@ class ProductManager {
                         await window.imageUploader.uploadEditImages(productId);
                     }
                 } catch (imageError) {
-                    console.warn('Image upload failed:', imageError);
+                    this.showError(`Image upload failed: ${imageError.message}`);
                 }
                 
                 this.closeModal('editProductModal');
@@ -554,6 +595,40 @@ class ProductManager {
         }
     }
 
+    async importProducts(file) {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        try {
+            // No JSON Content-Type here; the browser sets the multipart boundary
+            const response = await fetch(`${this.baseURL}/api/products/import/`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+                },
+                body: formData
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error || `HTTP ${response.status}`);
+            }
+
+            this.loadProducts();
+            const failures = result.errors.slice(0, 5).map(error =>
+                `Row ${error.row}: ${Object.entries(error.errors).map(([field, messages]) => `${field} ${messages.join(' ')}`).join('; ')}`
+            );
+            const summary = `Created ${result.created}, updated ${result.updated}, failed ${result.failed}`;
+            if (result.failed) {
+                this.showError([summary, ...failures].join('\n'));
+            } else {
+                this.showSuccess(summary);
+            }
+        } catch (error) {
+            console.error('Error importing products:', error);
+            this.showError(`Import failed: ${error.message}`);
+        }
+    }
+
     showError(message) {
         // Simple error display - can be enhanced with toast notifications
         console.error(message);
@@ -656,7 +731,7 @@ class ProductManager {
                         await window.imageUploader.uploadImages(productData.id);
                     }
                 } catch (imageError) {
-                    console.warn('Image upload failed:', imageError);
+                    this.showError(`Image upload failed: ${imageError.message}`);
                 }
                 
                 this.closeModal('addProductModal');